@@ -0,0 +1,63 @@
+"""user_stats rollup
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from alembic import op
+
+revision: str = "0002"
+down_revision: str | None = "0001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_stats",
+        sa.Column("user_id", postgresql.UUID(as_uuid=False), primary_key=True),
+        sa.Column("total_workouts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_sets", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_minutes", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("timed_workouts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("timed_minutes", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()")),
+        sa.ForeignKeyConstraint(["user_id"], ["profiles.id"], ondelete="CASCADE"),
+    )
+
+    # Backfill from existing sessions
+    op.execute(
+        """
+        INSERT INTO user_stats
+            (user_id, total_workouts, total_sets, total_minutes, timed_workouts, timed_minutes)
+        SELECT
+            s.user_id,
+            count(*),
+            coalesce(sum((
+                SELECT sum(jsonb_array_length(e.value))
+                FROM jsonb_each(s.logs) AS e
+                WHERE jsonb_typeof(e.value) = 'array'
+            )), 0),
+            coalesce(sum(s.duration_minutes), 0),
+            count(*) FILTER (WHERE s.duration_minutes > 0),
+            coalesce(sum(s.duration_minutes) FILTER (WHERE s.duration_minutes > 0), 0)
+        FROM sessions AS s
+        GROUP BY s.user_id
+        """
+    )
+
+    op.execute("ALTER TABLE user_stats ENABLE ROW LEVEL SECURITY")
+    op.execute(
+        "CREATE POLICY own_user_stats ON user_stats "
+        "FOR SELECT USING (auth.uid() = user_id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP POLICY IF EXISTS own_user_stats ON user_stats")
+    op.drop_table("user_stats")
@@ -0,0 +1,29 @@
+"""sessions (user_id, finished_at) index
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "0003"
+down_revision: str | None = "0002"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Analytics windows become index range scans. The composite index also
+    # serves every user_id-only lookup, so the single-column one is dropped.
+    op.create_index(
+        "ix_sessions_user_id_finished_at", "sessions", ["user_id", "finished_at"]
+    )
+    op.drop_index("ix_sessions_user_id", "sessions")
+
+
+def downgrade() -> None:
+    op.create_index("ix_sessions_user_id", "sessions", ["user_id"])
+    op.drop_index("ix_sessions_user_id_finished_at", "sessions")
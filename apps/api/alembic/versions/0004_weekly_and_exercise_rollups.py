@@ -0,0 +1,71 @@
+"""user_weeks and user_exercise_totals rollups
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from alembic import op
+
+revision: str = "0004"
+down_revision: str | None = "0003"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_weeks",
+        sa.Column("user_id", postgresql.UUID(as_uuid=False), primary_key=True),
+        sa.Column("week_start", sa.Date(), primary_key=True),
+        sa.Column("days", sa.Integer(), nullable=False, server_default="0"),
+        sa.ForeignKeyConstraint(["user_id"], ["profiles.id"], ondelete="CASCADE"),
+    )
+
+    op.create_table(
+        "user_exercise_totals",
+        sa.Column("user_id", postgresql.UUID(as_uuid=False), primary_key=True),
+        sa.Column("exercise_id", sa.String(100), primary_key=True),
+        sa.Column("sets", sa.Integer(), nullable=False, server_default="0"),
+        sa.ForeignKeyConstraint(["user_id"], ["profiles.id"], ondelete="CASCADE"),
+    )
+
+    # Backfill from existing sessions (ISO weeks and weekdays in UTC)
+    op.execute(
+        """
+        INSERT INTO user_weeks (user_id, week_start, days)
+        SELECT
+            user_id,
+            date_trunc('week', finished_at AT TIME ZONE 'UTC')::date,
+            bit_or(1 << (extract(isodow FROM finished_at AT TIME ZONE 'UTC')::int - 1))
+        FROM sessions
+        GROUP BY 1, 2
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO user_exercise_totals (user_id, exercise_id, sets)
+        SELECT s.user_id, e.key, sum(jsonb_array_length(e.value))
+        FROM sessions AS s, jsonb_each(s.logs) AS e
+        WHERE jsonb_typeof(e.value) = 'array'
+        GROUP BY 1, 2
+        """
+    )
+
+    for table in ["user_weeks", "user_exercise_totals"]:
+        op.execute(f"ALTER TABLE {table} ENABLE ROW LEVEL SECURITY")
+        op.execute(
+            f"CREATE POLICY own_{table} ON {table} "
+            f"FOR SELECT USING (auth.uid() = user_id)"
+        )
+
+
+def downgrade() -> None:
+    for table in ["user_weeks", "user_exercise_totals"]:
+        op.execute(f"DROP POLICY IF EXISTS own_{table} ON {table}")
+    op.drop_table("user_exercise_totals")
+    op.drop_table("user_weeks")
@@ -0,0 +1,98 @@
+"""personal_records
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from alembic import op
+
+revision: str = "0005"
+down_revision: str | None = "0004"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Exponents capped at 4 digits (numeric's own range); longer ones are inf or 0 to Python too
+_NUMBER = r"'^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d{1,4})?\s*$'"
+_INT4_LIMIT = 2**31
+
+
+def _number(field: str) -> str:
+    """Parse as numeric first: a float8 cast errors on under/overflow instead of rounding.
+    CASE (unlike AND in a WHERE) guarantees the regex is checked before the cast."""
+    return f"CASE WHEN l.value->>'{field}' ~ {_NUMBER} THEN (l.value->>'{field}')::numeric END"
+
+
+def _float(column: str) -> str:
+    # Python's float arithmetic gives inf where float8 would raise "value out of range"
+    return f"CASE WHEN abs({column}) < 1e308 THEN round({column}, 320)::float ELSE 'Infinity' END"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "personal_records",
+        sa.Column("user_id", postgresql.UUID(as_uuid=False), primary_key=True),
+        sa.Column("exercise_id", sa.String(100), primary_key=True),
+        sa.Column("weight", sa.Float(), nullable=False),
+        sa.Column("reps", sa.Integer(), nullable=False),
+        sa.Column("e1rm", sa.Float(), nullable=False),
+        sa.Column("session_id", postgresql.UUID(as_uuid=False), nullable=True),
+        sa.Column("achieved_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["profiles.id"], ondelete="CASCADE"),
+    )
+
+    # Backfill with the same rules as app.modules.analytics.records: heaviest
+    # weight (first session to reach it), best reps at that weight, best Epley e1RM.
+    # Everything is computed in numeric and converted last, so no value in the
+    # JSON (1e400, reps past int4) can abort the migration with a cast error.
+    op.execute(
+        rf"""
+        WITH parsed AS (
+            SELECT
+                s.user_id, e.key AS exercise_id, s.id AS session_id, s.finished_at,
+                {_number("weight")} AS weight,
+                {_number("reps")} AS reps
+            FROM sessions AS s,
+                 jsonb_each(s.logs) AS e,
+                 jsonb_array_elements(
+                     CASE WHEN jsonb_typeof(e.value) = 'array' THEN e.value ELSE '[]' END
+                 ) AS l
+            WHERE jsonb_typeof(l.value) = 'object'
+        ), weighted AS (
+            -- Weights that overflow a Python float are skipped; reps outside int4 count as 0
+            SELECT
+                user_id, exercise_id, session_id, finished_at, weight,
+                CASE WHEN abs(trunc(reps)) < {_INT4_LIMIT} THEN trunc(reps)::int ELSE 0 END AS reps
+            FROM parsed
+            WHERE weight > 0 AND weight < 1e308
+        ), scored AS (
+            SELECT *,
+                CASE WHEN reps <= 1 THEN weight ELSE weight * (1 + reps / 30.0) END AS e1rm
+            FROM weighted
+        )
+        INSERT INTO personal_records
+            (user_id, exercise_id, weight, reps, e1rm, session_id, achieved_at)
+        SELECT DISTINCT ON (user_id, exercise_id)
+            user_id, exercise_id, {_float("weight")},
+            max(reps) OVER (PARTITION BY user_id, exercise_id, weight),
+            {_float("max(e1rm) OVER (PARTITION BY user_id, exercise_id)")},
+            session_id, finished_at
+        FROM scored
+        ORDER BY user_id, exercise_id, weight DESC, finished_at
+        """
+    )
+
+    op.execute("ALTER TABLE personal_records ENABLE ROW LEVEL SECURITY")
+    op.execute(
+        "CREATE POLICY own_personal_records ON personal_records "
+        "FOR SELECT USING (auth.uid() = user_id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP POLICY IF EXISTS own_personal_records ON personal_records")
+    op.drop_table("personal_records")
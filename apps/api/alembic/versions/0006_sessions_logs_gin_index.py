@@ -0,0 +1,23 @@
+"""GIN index on sessions.logs for per-exercise reads
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "0006"
+down_revision: str | None = "0005"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_sessions_logs", "sessions", ["logs"], postgresql_using="gin")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sessions_logs", table_name="sessions")
@@ -0,0 +1,37 @@
+"""user_data_versions
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from alembic import op
+
+revision: str = "0007"
+down_revision: str | None = "0006"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # No backfill: a missing row reads as version 0.
+    op.create_table(
+        "user_data_versions",
+        sa.Column("user_id", postgresql.UUID(as_uuid=False), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.ForeignKeyConstraint(["user_id"], ["profiles.id"], ondelete="CASCADE"),
+    )
+    op.execute("ALTER TABLE user_data_versions ENABLE ROW LEVEL SECURITY")
+    op.execute(
+        "CREATE POLICY own_user_data_versions ON user_data_versions "
+        "FOR SELECT USING (auth.uid() = user_id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP POLICY IF EXISTS own_user_data_versions ON user_data_versions")
+    op.drop_table("user_data_versions")
@@ -0,0 +1,77 @@
+"""platform aggregates and sessions.created_at
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0008"
+down_revision: str | None = "0007"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+_TABLES = ["platform_days", "platform_exercise_days", "platform_retention_weeks", "aggregate_watermarks"]
+
+
+def upgrade() -> None:
+    # Insertion time drives the aggregates' high-water mark; existing rows
+    # take their finished_at so the first refresh covers all history.
+    op.add_column("sessions", sa.Column("created_at", sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE sessions SET created_at = finished_at")
+    op.alter_column(
+        "sessions", "created_at", nullable=False, server_default=sa.text("CURRENT_TIMESTAMP")
+    )
+    op.create_index("ix_sessions_created_at", "sessions", ["created_at"])
+    op.create_index("ix_sessions_finished_at", "sessions", ["finished_at"])
+
+    op.create_table(
+        "platform_days",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("sessions", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("active_users", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("premium_active_users", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("sets", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("minutes", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_table(
+        "platform_exercise_days",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("exercise_id", sa.String(100), primary_key=True),
+        sa.Column("sets", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("users", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_table(
+        "platform_retention_weeks",
+        sa.Column("week_start", sa.Date(), primary_key=True),
+        sa.Column("plan", sa.String(20), primary_key=True),
+        sa.Column("active_users", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("retained_users", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_table(
+        "aggregate_watermarks",
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("high_water_mark", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "refreshed_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+    )
+
+    # Admin-only: RLS without policies keeps them out of reach of client roles
+    for table in _TABLES:
+        op.execute(f"ALTER TABLE {table} ENABLE ROW LEVEL SECURITY")
+
+
+def downgrade() -> None:
+    for table in reversed(_TABLES):
+        op.drop_table(table)
+    op.drop_index("ix_sessions_finished_at", table_name="sessions")
+    op.drop_index("ix_sessions_created_at", table_name="sessions")
+    op.drop_column("sessions", "created_at")
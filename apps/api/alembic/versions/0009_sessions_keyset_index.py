@@ -0,0 +1,31 @@
+"""sessions (user_id, finished_at, id) index for keyset pagination
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "0009"
+down_revision: str | None = "0008"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # GET /sessions pages walk (finished_at desc, id desc) backwards through
+    # this index; its (user_id, finished_at) prefix replaces the 0003 index.
+    op.create_index(
+        "ix_sessions_user_id_finished_at_id", "sessions", ["user_id", "finished_at", "id"]
+    )
+    op.drop_index("ix_sessions_user_id_finished_at", "sessions")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_sessions_user_id_finished_at", "sessions", ["user_id", "finished_at"]
+    )
+    op.drop_index("ix_sessions_user_id_finished_at_id", "sessions")
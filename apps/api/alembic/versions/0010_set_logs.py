@@ -0,0 +1,92 @@
+"""set_logs: one row per logged set, normalized out of sessions.logs
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from alembic import op
+
+revision: str = "0010"
+down_revision: str | None = "0009"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+_NUMBER = r"'^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$'"
+
+
+def _number(field: str) -> str:
+    """Parse as numeric first: a float8 cast errors on under/overflow instead of rounding."""
+    return f"CASE WHEN l.value->>'{field}' ~ {_NUMBER} THEN (l.value->>'{field}')::numeric END"
+
+
+def _float(column: str) -> str:
+    # Python's float() gives inf (stored as NULL) on overflow and 0.0 on underflow
+    return f"CASE WHEN abs({column}) < 1e308 THEN round({column}, 320)::float END"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "set_logs",
+        sa.Column("session_id", postgresql.UUID(as_uuid=False), primary_key=True),
+        sa.Column("exercise_id", sa.String(100), primary_key=True),
+        sa.Column("set_index", sa.Integer(), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=False), nullable=False),
+        sa.Column("weight", sa.Float(), nullable=True),
+        sa.Column("reps", sa.Float(), nullable=True),
+        sa.Column("is_pr", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["session_id"], ["sessions.id"], ondelete="CASCADE"),
+    )
+
+    # Backfill with the same parsing as app.modules.sessions.set_logs: numbers
+    # that don't parse (or overflow to infinity) are stored as NULL.
+    op.execute(
+        rf"""
+        WITH parsed AS (
+            SELECT
+                s.id AS session_id, e.key AS exercise_id, l.ordinality - 1 AS set_index,
+                s.user_id, s.finished_at,
+                {_number("weight")} AS weight,
+                {_number("reps")} AS reps,
+                coalesce(l.value->'isPR' = 'true', false) AS is_pr
+            FROM sessions AS s,
+                 jsonb_each(s.logs) AS e,
+                 jsonb_array_elements(
+                     CASE WHEN jsonb_typeof(e.value) = 'array' THEN e.value ELSE '[]' END
+                 ) WITH ORDINALITY AS l(value, ordinality)
+            WHERE jsonb_typeof(l.value) = 'object'
+        )
+        INSERT INTO set_logs
+            (session_id, exercise_id, set_index, user_id, weight, reps, is_pr, finished_at)
+        SELECT
+            session_id, exercise_id, set_index, user_id,
+            {_float("weight")},
+            {_float("reps")},
+            is_pr, finished_at
+        FROM parsed
+        """
+    )
+    op.create_index(
+        "ix_set_logs_user_id_exercise_id_finished_at",
+        "set_logs",
+        ["user_id", "exercise_id", "finished_at"],
+    )
+
+    # Per-exercise reads now use set_logs; nothing queries `logs ?` any more.
+    op.drop_index("ix_sessions_logs", table_name="sessions")
+
+    op.execute("ALTER TABLE set_logs ENABLE ROW LEVEL SECURITY")
+    op.execute(
+        "CREATE POLICY own_set_logs ON set_logs FOR SELECT USING (auth.uid() = user_id)"
+    )
+
+
+def downgrade() -> None:
+    op.create_index("ix_sessions_logs", "sessions", ["logs"], postgresql_using="gin")
+    op.execute("DROP POLICY IF EXISTS own_set_logs ON set_logs")
+    op.drop_table("set_logs")
@@ -0,0 +1,98 @@
+"""partition sessions by month on finished_at
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-17
+
+"""
+from collections.abc import Sequence
+from datetime import date, datetime, timezone
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0011"
+down_revision: str | None = "0010"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Keep in step with app.modules.sessions.partitions
+MONTHS_AHEAD = 3
+
+
+def _add_months(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _bound(month: date) -> str:
+    return f"'{month.isoformat()} 00:00:00+00'"
+
+
+def _finish(table: str, primary_key: list[str]) -> None:
+    """Constraints, indexes and RLS of `sessions`, created once `table` holds the rows."""
+    op.execute(f"ALTER TABLE {table} RENAME TO sessions")
+    op.create_primary_key("sessions_pkey", "sessions", primary_key)
+    op.create_foreign_key(
+        "sessions_user_id_fkey", "sessions", "profiles", ["user_id"], ["id"], ondelete="CASCADE"
+    )
+    op.create_foreign_key(
+        "sessions_routine_id_fkey", "sessions", "routines", ["routine_id"], ["id"], ondelete="SET NULL"
+    )
+    op.create_index(
+        "ix_sessions_user_id_finished_at_id", "sessions", ["user_id", "finished_at", "id"]
+    )
+    op.create_index("ix_sessions_finished_at", "sessions", ["finished_at"])
+    op.create_index("ix_sessions_created_at", "sessions", ["created_at"])
+    op.execute("ALTER TABLE sessions ENABLE ROW LEVEL SECURITY")
+    op.execute("CREATE POLICY own_sessions ON sessions FOR ALL USING (auth.uid() = user_id)")
+
+
+def upgrade() -> None:
+    # A unique key on a partitioned table must include the partition key, so
+    # nothing can reference sessions(id) any more: set_logs rows are removed by
+    # the application with their session and cascade from profiles instead.
+    op.drop_constraint("set_logs_session_id_fkey", "set_logs", type_="foreignkey")
+    op.create_foreign_key(
+        "set_logs_user_id_fkey", "set_logs", "profiles", ["user_id"], ["id"], ondelete="CASCADE"
+    )
+
+    op.execute(
+        "CREATE TABLE sessions_partitioned (LIKE sessions INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (finished_at)"
+    )
+    this_month = datetime.now(timezone.utc).date().replace(day=1)
+    oldest = op.get_bind().scalar(
+        sa.text("SELECT min(finished_at AT TIME ZONE 'UTC')::date FROM sessions")
+    )
+    month = min(oldest.replace(day=1), this_month) if oldest else this_month
+    partitions = ["sessions_default"]
+    while month <= _add_months(this_month, MONTHS_AHEAD):
+        name = f"sessions_p{month:%Y%m}"
+        op.execute(
+            f"CREATE TABLE {name} PARTITION OF sessions_partitioned "
+            f"FOR VALUES FROM ({_bound(month)}) TO ({_bound(_add_months(month, 1))})"
+        )
+        partitions.append(name)
+        month = _add_months(month, 1)
+    op.execute("CREATE TABLE sessions_default PARTITION OF sessions_partitioned DEFAULT")
+
+    op.execute("INSERT INTO sessions_partitioned SELECT * FROM sessions")
+    op.drop_table("sessions")
+    _finish("sessions_partitioned", ["id", "finished_at"])
+    # Partitions are reachable directly through PostgREST: no policies, no access.
+    for name in partitions:
+        op.execute(f"ALTER TABLE {name} ENABLE ROW LEVEL SECURITY")
+
+
+def downgrade() -> None:
+    op.execute("CREATE TABLE sessions_unpartitioned (LIKE sessions INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO sessions_unpartitioned SELECT * FROM sessions")
+    op.drop_table("sessions")  # and its partitions
+    _finish("sessions_unpartitioned", ["id"])
+
+    op.drop_constraint("set_logs_user_id_fkey", "set_logs", type_="foreignkey")
+    op.execute("DELETE FROM set_logs WHERE session_id NOT IN (SELECT id FROM sessions)")
+    op.create_foreign_key(
+        "set_logs_session_id_fkey", "set_logs", "sessions", ["session_id"], ["id"], ondelete="CASCADE"
+    )
@@ -0,0 +1,61 @@
+"""data_version stamps on user tables and sync_tombstones for delta sync
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-17
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from alembic import op
+
+revision: str = "0012"
+down_revision: str | None = "0011"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+_TABLES = ["routines", "sessions", "custom_exercises", "user_preferences"]
+
+
+def upgrade() -> None:
+    # Existing rows are version 0: they reach clients through a full sync.
+    for table in _TABLES:
+        op.add_column(
+            table, sa.Column("data_version", sa.BigInteger(), nullable=False, server_default="0")
+        )
+    op.create_index(
+        "ix_sessions_user_id_data_version", "sessions", ["user_id", "data_version"]
+    )
+
+    op.create_table(
+        "sync_tombstones",
+        sa.Column("user_id", postgresql.UUID(as_uuid=False), primary_key=True),
+        sa.Column("entity", sa.String(20), primary_key=True),
+        sa.Column("entity_id", sa.String(100), primary_key=True),
+        sa.Column("data_version", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "deleted_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["profiles.id"], ondelete="CASCADE"),
+    )
+    op.create_index(
+        "ix_sync_tombstones_user_id_data_version", "sync_tombstones", ["user_id", "data_version"]
+    )
+
+    op.execute("ALTER TABLE sync_tombstones ENABLE ROW LEVEL SECURITY")
+    op.execute(
+        "CREATE POLICY own_sync_tombstones ON sync_tombstones "
+        "FOR SELECT USING (auth.uid() = user_id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP POLICY IF EXISTS own_sync_tombstones ON sync_tombstones")
+    op.drop_table("sync_tombstones")
+    op.drop_index("ix_sessions_user_id_data_version", "sessions")
+    for table in _TABLES:
+        op.drop_column(table, "data_version")
@@ -0,0 +1,37 @@
+"""shared_routines: content-addressed routine snapshots for QR sharing
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-17
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from alembic import op
+
+revision: str = "0014"
+down_revision: str | None = "0013"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "shared_routines",
+        sa.Column("hash", sa.String(64), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("exercises", postgresql.ARRAY(sa.String()), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+    )
+    # Served by the API only (GET /shared/{hash}); no client policies
+    op.execute("ALTER TABLE shared_routines ENABLE ROW LEVEL SECURITY")
+
+
+def downgrade() -> None:
+    op.drop_table("shared_routines")
@@ -0,0 +1,76 @@
+"""custom_access_token_hook: plan / is_admin claims in Supabase access tokens
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-17
+
+Enable it in Supabase under Authentication → Hooks → Customize Access Token
+(`public.custom_access_token_hook`), then set JWT_PROFILE_CLAIMS=true on the
+API. Tokens for users without a profile row get no extra claims, so their
+first request still goes through get_or_create_profile.
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "0015"
+down_revision: str | None = "0014"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION public.custom_access_token_hook(event jsonb)
+        RETURNS jsonb
+        LANGUAGE plpgsql
+        STABLE
+        AS $$
+        DECLARE
+            claims jsonb := event->'claims';
+            profile record;
+        BEGIN
+            SELECT plan, is_admin INTO profile
+            FROM public.profiles
+            WHERE id = (event->>'user_id')::uuid;
+            IF FOUND THEN
+                claims := claims || jsonb_build_object('plan', profile.plan, 'is_admin', profile.is_admin);
+            END IF;
+            RETURN jsonb_set(event, '{claims}', claims);
+        END;
+        $$
+        """
+    )
+    op.execute(
+        "REVOKE EXECUTE ON FUNCTION public.custom_access_token_hook(jsonb) FROM PUBLIC"
+    )
+    # Only Supabase Auth calls the hook (the role doesn't exist outside Supabase)
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT FROM pg_roles WHERE rolname = 'supabase_auth_admin') THEN
+                GRANT USAGE ON SCHEMA public TO supabase_auth_admin;
+                GRANT EXECUTE ON FUNCTION public.custom_access_token_hook(jsonb) TO supabase_auth_admin;
+                GRANT SELECT ON public.profiles TO supabase_auth_admin;
+            END IF;
+        END
+        $$
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT FROM pg_roles WHERE rolname = 'supabase_auth_admin') THEN
+                REVOKE SELECT ON public.profiles FROM supabase_auth_admin;
+            END IF;
+        END
+        $$
+        """
+    )
+    op.execute("DROP FUNCTION IF EXISTS public.custom_access_token_hook(jsonb)")
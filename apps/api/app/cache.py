@@ -0,0 +1,202 @@
+"""
+In-process caches.
+
+`UserCache` — per-user read-through cache for the repository wrappers
+(`CachedRoutineRepository`, `CachedSessionRepository`).
+
+Entries are query results keyed by (user, query), least recently used users
+evicted first and every result expiring after the TTL. A write through any
+wrapper drops all of that user's entries — deleting a routine also unlinks
+sessions — and bumps the user's generation, so a read that raced the write
+doesn't store its now-stale result.
+
+The cache lives in the process, so writes made on another worker never reach
+`invalidate` here. Readers that pass the user's current data version
+(app.versioning, bumped by every write) drop the entries stored under an
+older one, so a cached body never lags the version its ETag is built from;
+without a version, a remote write shows up once the entry expires.
+
+`TokenCache` — claims of already verified JWTs, so the signature is checked
+once per token rather than once per request. Entries are keyed by the
+token's SHA-256 (the raw bearer token is never kept) and dropped at the
+token's `exp`, after which it is verified — and rejected — as usual.
+
+`ProfileCache` — each user's `profiles` row, so authenticated requests skip
+the profile SELECT. Plan changes from the Stripe webhook invalidate the
+entry on the worker that handles them; elsewhere (other workers, or an admin
+flag flipped in SQL) the change shows up once the entry expires.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.config import settings
+from app.models.profile import Profile
+
+
+@dataclass
+class _UserEntry:
+    generation: int = 0
+    version: int | None = None  # data version the results were loaded at
+    # query key → (monotonic expiry, rows)
+    results: dict[Hashable, tuple[float, list[dict[str, Any]]]] = field(default_factory=dict)
+
+
+class UserCache:
+    def __init__(self, ttl_seconds: float, max_users: int, max_rows: int) -> None:
+        self.ttl = ttl_seconds
+        self.max_users = max_users
+        self.max_rows = max_rows  # larger results are not cached
+        self._users: OrderedDict[str, _UserEntry] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_load(
+        self,
+        user_id: str,
+        key: Hashable,
+        load: Callable[[], Awaitable[list[dict[str, Any]]]],
+        version: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """Cached rows for `key`, or `load()`'s. Rows are column dicts; callers build fresh objects.
+
+        A `version` newer than the one the user's entries were stored at drops them
+        first; an older one (a reader that started before a write) bypasses the cache.
+        """
+        if self.max_users <= 0:
+            return await load()
+        entry = self._entry(user_id)
+        if version is not None and version != entry.version:
+            if entry.version is not None and version < entry.version:
+                self.misses += 1
+                return await load()
+            self.invalidate(user_id)
+            entry.version = version
+        cached = entry.results.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        generation = entry.generation
+        rows = await load()
+        entry = self._entry(user_id)
+        if entry.generation == generation and len(rows) <= self.max_rows:
+            entry.results[key] = (time.monotonic() + self.ttl, rows)
+        return rows
+
+    def invalidate(self, user_id: str) -> None:
+        entry = self._users.get(user_id)
+        if entry is not None:
+            entry.generation += 1
+            entry.results.clear()
+
+    def clear(self) -> None:
+        self._users.clear()
+        self.hits = self.misses = 0
+
+    def _entry(self, user_id: str) -> _UserEntry:
+        entry = self._users.get(user_id)
+        if entry is None:
+            entry = self._users[user_id] = _UserEntry()
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        else:
+            self._users.move_to_end(user_id)
+        return entry
+
+
+repository_cache = UserCache(
+    settings.repository_cache_ttl_seconds,
+    settings.repository_cache_max_users,
+    settings.repository_cache_max_rows,
+)
+
+
+class TokenCache:
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        # sha256(token) → verified claims
+        self._tokens: OrderedDict[bytes, dict[str, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        if self.max_entries <= 0:
+            return None
+        key = self._key(token)
+        claims = self._tokens.get(key)
+        if claims is None or claims["exp"] <= time.time():
+            if claims is not None:
+                del self._tokens[key]
+            self.misses += 1
+            return None
+        self._tokens.move_to_end(key)
+        self.hits += 1
+        return claims
+
+    def put(self, token: str, claims: dict[str, Any]) -> None:
+        """Remember a verified token's claims. Tokens without `exp` are not cached."""
+        exp = claims.get("exp")
+        if self.max_entries <= 0 or exp is None or exp <= time.time():
+            return
+        self._tokens[self._key(token)] = claims
+        while len(self._tokens) > self.max_entries:
+            self._tokens.popitem(last=False)
+
+    def clear(self) -> None:
+        self._tokens.clear()
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+
+token_cache = TokenCache(settings.token_cache_max_entries)
+
+
+class ProfileCache:
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        # user id → (monotonic expiry, column values)
+        self._profiles: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: str) -> Profile | None:
+        """A fresh, detached `Profile` built from the cached row, or None."""
+        cached = self._profiles.get(user_id)
+        if cached is None or cached[0] <= time.monotonic():
+            self.misses += 1
+            return None
+        self._profiles.move_to_end(user_id)
+        self.hits += 1
+        return Profile(**cached[1])
+
+    def put(self, profile: Profile) -> None:
+        if self.max_entries <= 0:
+            return
+        self._profiles[profile.id] = (time.monotonic() + self.ttl, columns_of(profile))
+        self._profiles.move_to_end(profile.id)
+        while len(self._profiles) > self.max_entries:
+            self._profiles.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        self._profiles.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._profiles.clear()
+        self.hits = self.misses = 0
+
+
+profile_cache = ProfileCache(settings.profile_cache_ttl_seconds, settings.profile_cache_max_entries)
+
+
+def columns_of(row: Any) -> dict[str, Any]:
+    """Column values of an ORM instance, to cache without sharing the instance across sessions."""
+    return {c.key: getattr(row, c.key) for c in row.__table__.columns}
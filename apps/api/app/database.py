@@ -1,10 +1,17 @@
+import asyncio
+import logging
+import time
 from collections.abc import AsyncGenerator
 
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 engine = create_async_engine(
     settings.database_url,
     echo=settings.environment == "development",
@@ -18,6 +25,24 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False,
 )
 
+# Read replica (optional) — see get_read_db
+replica_engine = (
+    create_async_engine(
+        settings.database_replica_url,
+        echo=settings.environment == "development",
+        pool_size=10,
+        max_overflow=20,
+    )
+    if settings.database_replica_url
+    else None
+)
+
+ReplicaSessionLocal = (
+    async_sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False)
+    if replica_engine is not None
+    else None
+)
+
 
 class Base(DeclarativeBase):
     pass
@@ -26,3 +51,98 @@ class Base(DeclarativeBase):
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         yield session
+
+
+# Seconds the replica is behind; 0 when it has replayed everything it received
+# (an idle primary leaves pg_last_xact_replay_timestamp() arbitrarily old).
+_REPLICA_LAG = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())"
+    " END"
+)
+
+
+class ReplicaMonitor:
+    """Whether the replica may serve reads: reachable and at most `max_lag_seconds`
+    behind. Checked at most once per `check_interval_seconds` (one check at a
+    time); a connection failure during a request marks it down until the next check."""
+
+    def __init__(
+        self,
+        sessionmaker: async_sessionmaker[AsyncSession] | None,
+        max_lag_seconds: float,
+        check_interval_seconds: float,
+        timeout: float = 2,
+    ) -> None:
+        self._sessionmaker = sessionmaker
+        self.max_lag = max_lag_seconds
+        self.check_interval = check_interval_seconds
+        self.timeout = timeout
+        self.healthy = False
+        self.lag: float | None = None
+        self._next_check = 0.0
+        self._lock = asyncio.Lock()
+
+    async def usable(self) -> bool:
+        if self._sessionmaker is None:
+            return False
+        if time.monotonic() >= self._next_check:
+            async with self._lock:
+                if time.monotonic() >= self._next_check:
+                    self.lag = await self._measure_lag()
+                    self.healthy = self.lag is not None and self.lag <= self.max_lag
+                    self._next_check = time.monotonic() + self.check_interval
+        return self.healthy
+
+    def mark_down(self) -> None:
+        self.healthy = False
+        self._next_check = time.monotonic() + self.check_interval
+
+    async def _measure_lag(self) -> float | None:
+        assert self._sessionmaker is not None
+        try:
+            async with self._sessionmaker() as session:
+                lag = await asyncio.wait_for(session.scalar(_REPLICA_LAG), self.timeout)
+        except Exception as exc:  # unreachable, timed out, not PostgreSQL, ...
+            logger.warning("Replica health check failed: %r", exc)
+            return None
+        return float(lag) if lag is not None else None
+
+
+replica_monitor = ReplicaMonitor(
+    ReplicaSessionLocal,
+    max_lag_seconds=settings.replica_max_lag_seconds,
+    check_interval_seconds=settings.replica_check_interval_seconds,
+)
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only handlers: the replica when one is configured and
+    healthy, otherwise the primary. Reads may trail writes by up to
+    `replica_max_lag_seconds`, so don't use it where a user reads back their own write."""
+    if ReplicaSessionLocal is None or not await replica_monitor.usable():
+        async with AsyncSessionLocal() as session:
+            yield session
+        return
+    async with ReplicaSessionLocal() as session:
+        try:
+            yield session
+        except (OSError, DBAPIError) as exc:
+            if isinstance(exc, OSError) or exc.connection_invalidated:
+                replica_monitor.mark_down()
+            raise
+
+
+def dialect_insert(db: AsyncSession):
+    """Return the ``insert`` construct for the session's dialect.
+
+    Both the PostgreSQL and SQLite variants support ``on_conflict_do_*``,
+    so upserts work in production and in the in-memory test database.
+    """
+    if db.bind.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert
@@ -1,38 +1,32 @@
-from collections.abc import AsyncGenerator
-from typing import Annotated
+import time
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from dataclasses import dataclass
+from typing import Annotated, Any
 
-import httpx
-from fastapi import Depends, Header, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Response, status
 from jose import JWTError, jwt
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache import profile_cache, token_cache
 from app.config import settings
-from app.database import get_db
+from app.database import dialect_insert, get_db, get_read_db
+from app.jwks import JWKSUnavailable, jwks_manager
 from app.models.profile import Profile
+from app.versioning import etag_matches, get_data_version, make_etag
 
-# ── JWKS cache (fetched once per process) ──────────────────────────────────────
-_jwks_cache: dict | None = None
 
+async def _verify_token(authorization: str = Header(default="")) -> dict[str, Any]:
+    """Extract and verify Supabase JWT (HS256 or ES256); return its claims.
 
-async def _get_jwks() -> dict:
-    global _jwks_cache
-    if _jwks_cache is None:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{settings.supabase_url}/auth/v1/.well-known/jwks.json",
-                timeout=5,
-            )
-            resp.raise_for_status()
-            _jwks_cache = resp.json()
-    return _jwks_cache
-
-
-async def _verify_jwt(authorization: str = Header(default="")) -> str:
-    """Extract and verify Supabase JWT (HS256 or ES256); return user_id (sub)."""
+    Verified tokens are cached (app.cache.TokenCache) until they expire.
+    """
     if not authorization.startswith("Bearer "):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing token")
     token = authorization.removeprefix("Bearer ")
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
     try:
         header = jwt.get_unverified_header(token)
         alg = header.get("alg", "HS256")
@@ -41,12 +35,14 @@ async def _verify_jwt(authorization: str = Header(default="")) -> str:
         if alg == "HS256":
             key: str | dict = settings.supabase_jwt_secret
         else:
-            # ES256/RS256 — find the matching JWK from Supabase JWKS endpoint
-            jwks = await _get_jwks()
-            keys = jwks.get("keys", [])
-            # Match by kid if present, otherwise use first key
-            matched = next((k for k in keys if k.get("kid") == kid), None) if kid else None
-            key = matched or (keys[0] if keys else None)
+            # ES256/RS256 — the JWK matching kid (the first key if there is none)
+            try:
+                key = await jwks_manager.get_key(kid)
+            except JWKSUnavailable as exc:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Signing keys unavailable",
+                ) from exc
             if key is None:
                 raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="No signing key found")
 
@@ -56,37 +52,109 @@ async def _verify_jwt(authorization: str = Header(default="")) -> str:
             algorithms=[alg],
             options={"verify_aud": False},
         )
-        user_id: str | None = payload.get("sub")
-        if not user_id:
+        if not payload.get("sub"):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-        return user_id
+        token_cache.put(token, payload)
+        return payload
     except JWTError as exc:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
         ) from exc
 
 
+TokenClaims = Annotated[dict[str, Any], Depends(_verify_token)]
+
+
+async def _verify_jwt(claims: TokenClaims) -> str:
+    return claims["sub"]
+
+
+async def token_subject(authorization: str) -> str | None:
+    """The verified `sub` of an Authorization header, or None (for middleware,
+    which runs outside the dependency system)."""
+    try:
+        return await _verify_jwt(await _verify_token(authorization))
+    except HTTPException:
+        return None
+
+
 CurrentUserId = Annotated[str, Depends(_verify_jwt)]
+DbSession = Annotated[AsyncSession, Depends(get_db)]
+# Replica when healthy (app.database.get_read_db): for handlers that only read
+ReadDbSession = Annotated[AsyncSession, Depends(get_read_db)]
 
 
 async def get_or_create_profile(
     user_id: CurrentUserId,
     db: Annotated[AsyncSession, Depends(get_db)],
 ) -> Profile:
+    """The caller's profile, from the per-process cache when fresh (app.cache.ProfileCache).
+
+    The first request from a new user creates the row with a single
+    INSERT ... ON CONFLICT DO NOTHING, so concurrent first requests don't race.
+    """
+    profile = profile_cache.get(user_id)
+    if profile is not None:
+        return profile
     result = await db.execute(select(Profile).where(Profile.id == user_id))
     profile = result.scalar_one_or_none()
     if profile is None:
-        profile = Profile(id=user_id)
-        db.add(profile)
+        result = await db.execute(
+            dialect_insert(db)(Profile)
+            .values(id=user_id)
+            .on_conflict_do_nothing(index_elements=[Profile.id])
+            .returning(Profile)
+        )
+        profile = result.scalar_one_or_none()
         await db.commit()
-        await db.refresh(profile)
+        if profile is None:
+            # Another request created it between our SELECT and INSERT
+            result = await db.execute(select(Profile).where(Profile.id == user_id))
+            profile = result.scalar_one()
+    profile_cache.put(profile)
     return profile
 
 
 CurrentProfile = Annotated[Profile, Depends(get_or_create_profile)]
 
 
-async def require_premium(profile: CurrentProfile) -> Profile:
+@dataclass(frozen=True)
+class CurrentUserInfo:
+    """Identity, plan and admin flag — all most routes need from the profile."""
+
+    id: str
+    plan: str
+    is_admin: bool
+
+
+def _user_from_claims(claims: dict[str, Any]) -> CurrentUserInfo | None:
+    """Plan / admin claims added by the custom access token hook (migration 0015),
+    or None when they are missing, malformed or older than jwt_claims_max_age_seconds."""
+    plan, is_admin, issued_at = claims.get("plan"), claims.get("is_admin"), claims.get("iat")
+    if plan not in ("free", "premium") or not isinstance(is_admin, bool):
+        return None
+    if not isinstance(issued_at, (int, float)):
+        return None
+    if time.time() - issued_at > settings.jwt_claims_max_age_seconds:
+        return None
+    return CurrentUserInfo(id=claims["sub"], plan=plan, is_admin=is_admin)
+
+
+async def get_current_user(claims: TokenClaims, db: DbSession) -> CurrentUserInfo:
+    """With JWT_PROFILE_CLAIMS on and fresh claims in the token, no database access;
+    otherwise the profile (cached, or read / created)."""
+    if settings.jwt_profile_claims:
+        user = _user_from_claims(claims)
+        if user is not None:
+            return user
+    profile = await get_or_create_profile(claims["sub"], db)
+    return CurrentUserInfo(id=profile.id, plan=profile.plan, is_admin=profile.is_admin)
+
+
+CurrentUser = Annotated[CurrentUserInfo, Depends(get_current_user)]
+
+
+async def require_premium(profile: CurrentUser) -> CurrentUserInfo:
     if profile.plan != "premium":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -95,7 +163,7 @@ async def require_premium(profile: CurrentProfile) -> Profile:
     return profile
 
 
-async def require_admin(profile: CurrentProfile) -> Profile:
+async def require_admin(profile: CurrentUser) -> CurrentUserInfo:
     if not profile.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -104,6 +172,35 @@ async def require_admin(profile: CurrentProfile) -> Profile:
     return profile
 
 
-PremiumProfile = Annotated[Profile, Depends(require_premium)]
-AdminProfile = Annotated[Profile, Depends(require_admin)]
-DbSession = Annotated[AsyncSession, Depends(get_db)]
+PremiumProfile = Annotated[CurrentUserInfo, Depends(require_premium)]
+AdminProfile = Annotated[CurrentUserInfo, Depends(require_admin)]
+
+
+def conditional_get(
+    *, premium: bool = False, daily: bool = False, read_only: bool = False
+) -> Callable[..., Awaitable[None]]:
+    """Dependency for read endpoints: tag the response with the user's data
+    version and short-circuit with 304 when `If-None-Match` already matches.
+
+    Runs after the profile (and premium) check, so a 304 never hides a 403.
+    `read_only` endpoints take their ReadDbSession: the tag is read from the
+    same database as the body, so a lagging replica can't pair an old body
+    with a new tag.
+    """
+    profile_dependency = require_premium if premium else get_current_user
+    db_dependency = get_read_db if read_only else get_db
+
+    async def check(
+        response: Response,
+        profile: Annotated[CurrentUserInfo, Depends(profile_dependency)],
+        db: Annotated[AsyncSession, Depends(db_dependency)],
+        if_none_match: Annotated[str | None, Header()] = None,
+    ) -> None:
+        etag = make_etag(profile.id, await get_data_version(db, profile.id), daily=daily)
+        # Per-user bodies: shared caches must not store them, browsers must revalidate
+        headers = {"ETag": etag, "Vary": "Authorization", "Cache-Control": "private, no-cache"}
+        if etag_matches(if_none_match, etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+
+    return check
@@ -0,0 +1,297 @@
+"""
+`Idempotency-Key` support for write requests.
+
+A POST/PUT/PATCH/DELETE carrying an `Idempotency-Key` header runs once: its
+response is stored under the key (scoped to the verified user, so a retry
+after a token refresh still matches) and retries within the TTL get it back,
+marked `Idempotent-Replayed: true`, without running the handler again.
+Requests without a valid token are passed through unstored (they get a 401).
+
+- a retry with a different method, path, query or body → 422
+- a retry while the first request is still running   → 409
+- 5xx responses are not stored, so the retry runs again
+
+Stores: `MemoryIdempotencyStore` (default; per-process LRU with TTL) and
+`DatabaseIdempotencyStore` (the `idempotency_keys` table, shared by all
+workers), selected by `settings.idempotency_backend`.
+"""
+import hashlib
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.database import dialect_insert
+from app.dependencies import token_subject
+from app.models.idempotency_key import IdempotencyKey
+
+_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+_MAX_KEY_LENGTH = 255
+# A reservation whose request never finished (crashed worker) frees up after this
+_LOCK_SECONDS = 60
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    fingerprint: str
+    status_code: int | None = None  # None while the first request is in flight
+    headers: list[tuple[str, str]] = field(default_factory=list)
+    body: bytes = b""
+
+
+class IdempotencyStore(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> StoredResponse | None: ...
+
+    @abstractmethod
+    async def reserve(self, key: str, fingerprint: str) -> bool:
+        """Claim an unused key before running the request; False if it is taken."""
+
+    @abstractmethod
+    async def save(self, key: str, response: StoredResponse) -> None: ...
+
+    @abstractmethod
+    async def release(self, key: str) -> None: ...
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        # key → (monotonic expiry, response), least recently used first
+        self._entries: OrderedDict[str, tuple[float, StoredResponse]] = OrderedDict()
+
+    async def get(self, key: str) -> StoredResponse | None:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        if item[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return item[1]
+
+    async def reserve(self, key: str, fingerprint: str) -> bool:
+        if await self.get(key) is not None:
+            return False
+        self._put(key, StoredResponse(fingerprint), _LOCK_SECONDS)
+        return True
+
+    async def save(self, key: str, response: StoredResponse) -> None:
+        self._put(key, response, self._ttl)
+
+    async def release(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _put(self, key: str, response: StoredResponse, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+class DatabaseIdempotencyStore(IdempotencyStore):
+    """Each call is its own short transaction, independent of the request's session."""
+
+    def __init__(self, sessions: async_sessionmaker[AsyncSession], ttl_seconds: float) -> None:
+        self._sessions = sessions
+        self._ttl = timedelta(seconds=ttl_seconds)
+
+    async def get(self, key: str) -> StoredResponse | None:
+        async with self._sessions() as db:
+            row = await db.get(IdempotencyKey, key)
+        if row is None or _as_utc(row.expires_at) <= _now():
+            return None
+        return StoredResponse(
+            row.fingerprint,
+            row.status_code,
+            [(name, value) for name, value in row.headers or []],
+            row.body or b"",
+        )
+
+    async def reserve(self, key: str, fingerprint: str) -> bool:
+        now = _now()
+        async with self._sessions() as db:
+            stmt = dialect_insert(db)(IdempotencyKey).values(
+                key=key, fingerprint=fingerprint, expires_at=now + timedelta(seconds=_LOCK_SECONDS)
+            )
+            # Only an expired entry may be taken over
+            claimed = await db.scalar(
+                stmt.on_conflict_do_update(
+                    index_elements=[IdempotencyKey.key],
+                    set_={
+                        "fingerprint": stmt.excluded.fingerprint,
+                        "status_code": None,
+                        "headers": None,
+                        "body": None,
+                        "expires_at": stmt.excluded.expires_at,
+                    },
+                    where=IdempotencyKey.expires_at <= now,
+                ).returning(IdempotencyKey.key)
+            )
+            await db.commit()
+        return claimed is not None
+
+    async def save(self, key: str, response: StoredResponse) -> None:
+        now = _now()
+        async with self._sessions() as db:
+            await db.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.key == key)
+                .values(
+                    status_code=response.status_code,
+                    headers=[list(h) for h in response.headers],
+                    body=response.body,
+                    expires_at=now + self._ttl,
+                )
+            )
+            # Range scan on ix_idempotency_keys_expires_at
+            await db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= now))
+            await db.commit()
+
+    async def release(self, key: str) -> None:
+        async with self._sessions() as db:
+            await db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key))
+            await db.commit()
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(d: datetime) -> datetime:
+    # Naive timestamps (SQLite) are UTC
+    return d if d.tzinfo is not None else d.replace(tzinfo=timezone.utc)
+
+
+def store_from_settings() -> IdempotencyStore:
+    if settings.idempotency_backend == "database":
+        from app.database import AsyncSessionLocal
+
+        return DatabaseIdempotencyStore(AsyncSessionLocal, settings.idempotency_ttl_seconds)
+    return MemoryIdempotencyStore(settings.idempotency_ttl_seconds, settings.idempotency_max_entries)
+
+
+def _digest(*parts: str | bytes) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        data = part.encode() if isinstance(part, str) else part
+        h.update(len(data).to_bytes(8, "big"))
+        h.update(data)
+    return h.hexdigest()
+
+
+class IdempotencyMiddleware:
+    def __init__(self, app: ASGIApp, store: IdempotencyStore | None = None) -> None:
+        self.app = app
+        self.store = store or store_from_settings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in _METHODS:
+            return await self.app(scope, receive, send)
+        headers = Headers(scope=scope)
+        idempotency_key = headers.get("idempotency-key")
+        if idempotency_key is None:
+            return await self.app(scope, receive, send)
+        if not idempotency_key or len(idempotency_key) > _MAX_KEY_LENGTH:
+            return await _error(400, "Invalid Idempotency-Key")(scope, receive, send)
+
+        user_id = await token_subject(headers.get("authorization", ""))
+        if user_id is None:
+            return await self.app(scope, receive, send)
+
+        body = await _read_body(receive)
+        key = _digest(user_id, idempotency_key)
+        fingerprint = _digest(scope["method"], scope["path"], scope["query_string"], body)
+
+        stored = await self.store.get(key)
+        if stored is None and not await self.store.reserve(key, fingerprint):
+            stored = await self.store.get(key)
+        if stored is not None:
+            if stored.fingerprint != fingerprint:
+                return await _error(
+                    422, "Idempotency-Key was already used for a different request"
+                )(scope, receive, send)
+            if stored.status_code is None:
+                return await _error(
+                    409, "A request with this Idempotency-Key is still in progress"
+                )(scope, receive, send)
+            return await _replay(send, stored)
+
+        response: dict = {"status": 500, "headers": [], "body": []}
+
+        async def capture(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = [
+                    (name.decode("latin-1"), value.decode("latin-1"))
+                    for name, value in message.get("headers", [])
+                ]
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, _once(body, receive), capture)
+        except BaseException:
+            await self.store.release(key)
+            raise
+        if response["status"] >= 500:
+            await self.store.release(key)
+        else:
+            await self.store.save(
+                key,
+                StoredResponse(
+                    fingerprint, response["status"], response["headers"], b"".join(response["body"])
+                ),
+            )
+
+
+def _once(body: bytes, receive: Receive) -> Receive:
+    """Hand the buffered body to the app once, then defer to the server (disconnects)."""
+    sent = False
+
+    async def replay() -> Message:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replay
+
+
+async def _read_body(receive: Receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+def _error(status_code: int, detail: str) -> JSONResponse:
+    return JSONResponse({"detail": detail}, status_code=status_code)
+
+
+async def _replay(send: Send, stored: StoredResponse) -> None:
+    headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in stored.headers]
+    await send(
+        {
+            "type": "http.response.start",
+            "status": stored.status_code,
+            "headers": headers + [(b"idempotent-replayed", b"true")],
+        }
+    )
+    await send({"type": "http.response.body", "body": stored.body})
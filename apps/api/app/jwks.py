@@ -0,0 +1,130 @@
+"""
+Supabase JWKS (signing keys for ES256 / RS256 access tokens).
+
+`JWKSManager` keeps the key set in memory for `ttl_seconds`. Past the TTL the
+cached keys are still served while a refresh runs in the background, so a
+slow or failing JWKS endpoint never blocks authenticated requests once keys
+have been loaded. A token signed with an unknown `kid` (a key rotation)
+triggers an immediate refresh, at most once per `min_refresh_seconds`, so a
+flood of forged kids cannot hammer the endpoint.
+
+A failed fetch (network error, non-2xx, a body that isn't `{"keys": [{...}]}`) is logged and the
+last good key set stays in use. Only when there has never been one does
+`get_key` raise `JWKSUnavailable` — retried at most once per
+`min_refresh_seconds` — which the auth dependency turns into a 503.
+
+Concurrent fetches are collapsed into one in-flight request (a cold start
+under load makes a single call), and every fetch goes through one shared
+`httpx.AsyncClient` — closed by `aclose()` at shutdown.
+"""
+import asyncio
+import logging
+import time
+from typing import Any
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSUnavailable(Exception):
+    """No key set has been fetched yet, and the endpoint is failing."""
+
+
+class JWKSManager:
+    def __init__(
+        self,
+        url: str,
+        ttl_seconds: float,
+        min_refresh_seconds: float,
+        timeout: float = 5,
+    ) -> None:
+        self.url = url
+        self.ttl = ttl_seconds
+        self.min_refresh = min_refresh_seconds
+        self.timeout = timeout
+        self.fetches = 0
+        self._keys: list[dict[str, Any]] | None = None
+        self._fetched_at = 0.0
+        self._attempted_at = float("-inf")
+        self._inflight: asyncio.Future[None] | None = None
+        self._client: httpx.AsyncClient | None = None
+
+    async def get_key(self, kid: str | None) -> dict[str, Any] | None:
+        """The JWK for `kid` (the first key for tokens without one), or None.
+
+        Raises JWKSUnavailable while no key set could be loaded.
+        """
+        if self._keys is None:
+            # Join a fetch in flight; after a failed one, retry only once per interval
+            if self._inflight is not None or time.monotonic() - self._attempted_at >= self.min_refresh:
+                await self._try_refresh()
+            if self._keys is None:
+                raise JWKSUnavailable(self.url)
+        else:
+            now = time.monotonic()
+            if now - self._fetched_at >= self.ttl and now - self._attempted_at >= self.min_refresh:
+                self._start_fetch()
+
+        key = self._find(kid)
+        if key is None and kid is not None and time.monotonic() - self._attempted_at >= self.min_refresh:
+            await self._try_refresh()
+            key = self._find(kid)
+        return key
+
+    async def refresh(self) -> None:
+        """Fetch the key set, joining the fetch already in flight if there is one."""
+        # Shielded: a cancelled request must not cancel the fetch other requests await
+        await asyncio.shield(self._start_fetch())
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _find(self, kid: str | None) -> dict[str, Any] | None:
+        keys = self._keys or []
+        if kid is None:
+            return keys[0] if keys else None
+        return next((k for k in keys if k.get("kid") == kid), None)
+
+    async def _try_refresh(self) -> None:
+        try:
+            await self.refresh()
+        except (httpx.HTTPError, ValueError):
+            pass  # logged by _fetch_done; the last good keys (if any) stay in use
+
+    def _start_fetch(self) -> asyncio.Future[None]:
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._fetch())
+            self._inflight.add_done_callback(self._fetch_done)
+        return self._inflight
+
+    def _fetch_done(self, future: asyncio.Future[None]) -> None:
+        self._inflight = None
+        if not future.cancelled() and future.exception() is not None:
+            # Callers awaiting the fetch get the error; stale keys keep being served
+            logger.warning("JWKS refresh from %s failed: %r", self.url, future.exception())
+
+    async def _fetch(self) -> None:
+        self._attempted_at = time.monotonic()
+        self.fetches += 1
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        resp = await self._client.get(self.url)
+        resp.raise_for_status()
+        body = resp.json()
+        keys = body.get("keys") if isinstance(body, dict) else None
+        if not isinstance(keys, list) or not all(isinstance(k, dict) for k in keys):
+            raise ValueError("JWKS response is not a key set")
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+
+
+jwks_manager = JWKSManager(
+    f"{settings.supabase_url}/auth/v1/.well-known/jwks.json",
+    ttl_seconds=settings.jwks_ttl_seconds,
+    min_refresh_seconds=settings.jwks_min_refresh_seconds,
+)
@@ -1,7 +1,13 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
+from app.idempotency import IdempotencyMiddleware
+from app.jwks import jwks_manager
+from app.maintenance import start_jobs
 from app.modules.admin.router import router as admin_router
 from app.modules.analytics.router import router as analytics_router
 from app.modules.auth.router import router as auth_router
@@ -9,9 +15,20 @@ from app.modules.config.router import router as config_router
 from app.modules.exercises.router import router as exercises_router
 from app.modules.preferences.router import router as preferences_router
 from app.modules.routines.router import router as routines_router
+from app.modules.routines.router import shared_router
 from app.modules.sessions.router import router as sessions_router
 from app.modules.profile.router import router as profile_router
 from app.modules.stripe.router import router as stripe_router
+from app.modules.sync.router import router as sync_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    jobs = start_jobs()
+    yield
+    for job in jobs:
+        job.cancel()
+    await jwks_manager.aclose()
 
 
 def create_app() -> FastAPI:
@@ -21,19 +38,24 @@ def create_app() -> FastAPI:
         description="Backend for GymTracker v2 — routines, sessions, analytics, premium features.",
         docs_url="/docs",
         redoc_url="/redoc",
+        lifespan=lifespan,
     )
 
+    # Added first so it runs inside CORS: replays and its errors get CORS headers too
+    app.add_middleware(IdempotencyMiddleware)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.allowed_origins,
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag", "Idempotent-Replayed"],
     )
 
     # --- routers ---
     app.include_router(auth_router)
     app.include_router(routines_router)
+    app.include_router(shared_router)
     app.include_router(sessions_router)
     app.include_router(exercises_router)
     app.include_router(preferences_router)
@@ -42,6 +64,7 @@ def create_app() -> FastAPI:
     app.include_router(config_router)
     app.include_router(profile_router)
     app.include_router(stripe_router)
+    app.include_router(sync_router)
 
     @app.get("/health", tags=["health"])
     async def health() -> dict:
@@ -0,0 +1,64 @@
+"""
+Periodic background jobs, started by the app lifespan (app.main).
+
+- platform aggregates — incremental refresh every `aggregates_refresh_interval_seconds`
+- sessions partitions — the months ahead created every `partitions_interval_seconds`
+
+Every worker runs the loops. Both jobs serialize on an advisory lock and are
+cheap when there is nothing to do, so a second worker's run right behind the
+first costs little. The first runs happen at startup. A machine that scales
+to zero runs nothing while stopped: partitions are also created by start.sh
+on every boot, but for the aggregates schedule the CLI as well, e.g. a Fly
+scheduled machine running `python -m app.modules.admin.aggregates`.
+
+Full rescans (`--full`) are CLI-only — never run from a request or this loop.
+"""
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+async def run_every(interval: float, job: Callable[[], Awaitable[object]], name: str) -> None:
+    """Run `job` now and then every `interval` seconds; a failure is logged, not fatal."""
+    while True:
+        try:
+            await job()
+        except Exception:
+            logger.exception("Periodic job %s failed", name)
+        await asyncio.sleep(interval)
+
+
+async def refresh_aggregates() -> None:
+    from app.database import AsyncSessionLocal
+    from app.modules.admin.aggregates import refresh_platform_aggregates
+
+    async with AsyncSessionLocal() as db:
+        days = await refresh_platform_aggregates(db)
+    logger.info("Refreshed platform aggregates for %d day(s)", days)
+
+
+async def ensure_session_partitions() -> None:
+    from app.database import AsyncSessionLocal
+    from app.modules.sessions.partitions import ensure_partitions
+
+    async with AsyncSessionLocal() as db:
+        created = await ensure_partitions(db)
+    if created:
+        logger.info("Created sessions partitions %s", " ".join(created))
+
+
+def start_jobs() -> list[asyncio.Task[None]]:
+    """Schedule the enabled jobs; the caller cancels the returned tasks on shutdown."""
+    jobs: list[tuple[float, Callable[[], Awaitable[object]], str]] = [
+        (settings.aggregates_refresh_interval_seconds, refresh_aggregates, "aggregates"),
+        (settings.partitions_interval_seconds, ensure_session_partitions, "partitions"),
+    ]
+    return [
+        asyncio.create_task(run_every(interval, job, name))
+        for interval, job, name in jobs
+        if interval > 0
+    ]
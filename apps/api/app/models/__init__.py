@@ -1,15 +1,41 @@
+from app.models.aggregate_watermark import AggregateWatermark
 from app.models.app_config import AppConfig
+from app.models.data_version import UserDataVersion
 from app.models.exercise import CustomExercise
+from app.models.idempotency_key import IdempotencyKey
+from app.models.personal_record import PersonalRecord
+from app.models.platform_day import PlatformDay
+from app.models.platform_exercise_day import PlatformExerciseDay
+from app.models.platform_retention_week import PlatformRetentionWeek
 from app.models.preference import UserPreference
 from app.models.profile import Profile
 from app.models.routine import Routine
 from app.models.session import Session
+from app.models.set_log import SetLog
+from app.models.shared_routine import SharedRoutine
+from app.models.sync_tombstone import SyncTombstone
+from app.models.user_exercise_total import UserExerciseTotal
+from app.models.user_stats import UserStats
+from app.models.user_week import UserWeek
 
 __all__ = [
     "Profile",
     "Routine",
     "Session",
+    "SetLog",
     "CustomExercise",
     "UserPreference",
     "AppConfig",
+    "UserStats",
+    "UserWeek",
+    "UserExerciseTotal",
+    "PersonalRecord",
+    "UserDataVersion",
+    "PlatformDay",
+    "PlatformExerciseDay",
+    "PlatformRetentionWeek",
+    "AggregateWatermark",
+    "SyncTombstone",
+    "IdempotencyKey",
+    "SharedRoutine",
 ]
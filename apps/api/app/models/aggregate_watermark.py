@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, String, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class AggregateWatermark(Base):
+    """How far (by `sessions.created_at`) a materialized aggregate has been refreshed."""
+
+    __tablename__ = "aggregate_watermarks"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    high_water_mark: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    refreshed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=text("CURRENT_TIMESTAMP"),
+        onupdate=text("CURRENT_TIMESTAMP"),
+    )
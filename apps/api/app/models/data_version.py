@@ -0,0 +1,14 @@
+from sqlalchemy import BigInteger, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class UserDataVersion(Base):
+    """Monotonic per-user counter, bumped in the same transaction as every data write."""
+
+    __tablename__ = "user_data_versions"
+
+    user_id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, default=0, server_default=text("0"))
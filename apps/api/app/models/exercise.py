@@ -1,4 +1,4 @@
-from sqlalchemy import String
+from sqlalchemy import BigInteger, String, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -12,3 +12,5 @@ class CustomExercise(Base):
     user_id: Mapped[str] = mapped_column(UUID(as_uuid=False), nullable=False, index=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     muscle: Mapped[str] = mapped_column(String(50), nullable=False)
+    # User data version of the last write (see app.versioning)
+    data_version: Mapped[int] = mapped_column(BigInteger, default=0, server_default=text("0"))
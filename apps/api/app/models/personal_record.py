@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class PersonalRecord(Base):
+    """Best logged set per exercise per user, maintained on every session write."""
+
+    __tablename__ = "personal_records"
+
+    user_id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True)
+    exercise_id: Mapped[str] = mapped_column(String(100), primary_key=True)
+    weight: Mapped[float] = mapped_column(Float, nullable=False)
+    reps: Mapped[int] = mapped_column(Integer, nullable=False)  # best reps at `weight`
+    e1rm: Mapped[float] = mapped_column(Float, nullable=False)  # best estimated 1RM (Epley)
+    # Session in which `weight` was first reached
+    session_id: Mapped[str | None] = mapped_column(UUID(as_uuid=False), nullable=True)
+    achieved_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
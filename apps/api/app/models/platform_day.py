@@ -0,0 +1,19 @@
+from datetime import date
+
+from sqlalchemy import Date, Integer, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class PlatformDay(Base):
+    """Platform-wide totals per UTC day, refreshed by `admin.aggregates`."""
+
+    __tablename__ = "platform_days"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    sessions: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
+    active_users: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
+    premium_active_users: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
+    sets: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
+    minutes: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
@@ -0,0 +1,17 @@
+from datetime import date
+
+from sqlalchemy import Date, Integer, String, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class PlatformExerciseDay(Base):
+    """Sets and distinct users per exercise per UTC day, refreshed by `admin.aggregates`."""
+
+    __tablename__ = "platform_exercise_days"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    exercise_id: Mapped[str] = mapped_column(String(100), primary_key=True)
+    sets: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
+    users: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
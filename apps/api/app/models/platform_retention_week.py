@@ -0,0 +1,17 @@
+from datetime import date
+
+from sqlalchemy import Date, Integer, String, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class PlatformRetentionWeek(Base):
+    """Weekly active users per plan and how many were also active the week before."""
+
+    __tablename__ = "platform_retention_weeks"
+
+    week_start: Mapped[date] = mapped_column(Date, primary_key=True)  # Monday
+    plan: Mapped[str] = mapped_column(String(20), primary_key=True)
+    active_users: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
+    retained_users: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
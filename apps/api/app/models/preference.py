@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, String, text
+from sqlalchemy import BigInteger, Integer, String, text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -21,3 +21,5 @@ class UserPreference(Base):
             "workoutView": {"video": True, "image": False, "anatomy": False},
         },
     )
+    # User data version of the last write (see app.versioning)
+    data_version: Mapped[int] = mapped_column(BigInteger, default=0, server_default=text("0"))
@@ -1,7 +1,7 @@
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import DateTime, Integer, String, text
+from sqlalchemy import BigInteger, DateTime, Integer, String, text
 from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -26,3 +26,5 @@ class Routine(Base):
         server_default=text("CURRENT_TIMESTAMP"),
         onupdate=text("CURRENT_TIMESTAMP"),
     )
+    # User data version of the last write (see app.versioning)
+    data_version: Mapped[int] = mapped_column(BigInteger, default=0, server_default=text("0"))
@@ -1,7 +1,7 @@
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import DateTime, Integer, String
+from sqlalchemy import BigInteger, DateTime, Index, Integer, String, text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -9,17 +9,34 @@ from app.database import Base
 
 
 class Session(Base):
+    # In PostgreSQL the table is range-partitioned by month on finished_at, with
+    # (id, finished_at) as its primary key (see app.modules.sessions.partitions).
     __tablename__ = "sessions"
+    __table_args__ = (
+        # Also serves the (finished_at desc, id desc) keyset pagination
+        Index("ix_sessions_user_id_finished_at_id", "user_id", "finished_at", "id"),
+        # Day-range scans and the high-water mark of the platform aggregates
+        Index("ix_sessions_finished_at", "finished_at"),
+        Index("ix_sessions_created_at", "created_at"),
+        # Delta sync: sessions written after a client's last version
+        Index("ix_sessions_user_id_data_version", "user_id", "data_version"),
+    )
 
     id: Mapped[str] = mapped_column(
         UUID(as_uuid=False),
         primary_key=True,
         default=lambda: str(uuid4()),
     )
-    user_id: Mapped[str] = mapped_column(UUID(as_uuid=False), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(UUID(as_uuid=False), nullable=False)
     routine_id: Mapped[str | None] = mapped_column(UUID(as_uuid=False), nullable=True)
     routine_name: Mapped[str] = mapped_column(String(255), nullable=False)
     started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     finished_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     duration_minutes: Mapped[int] = mapped_column(Integer, nullable=False)
     logs: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+    # Insertion time (unlike finished_at, which clients may backdate)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=text("CURRENT_TIMESTAMP")
+    )
+    # User data version of the last write (see app.versioning)
+    data_version: Mapped[int] = mapped_column(BigInteger, default=0, server_default=text("0"))
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, Float, Index, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class SetLog(Base):
+    """One logged set, normalized out of `Session.logs` and written with its session."""
+
+    __tablename__ = "set_logs"
+    __table_args__ = (
+        # Per-exercise history: one range scan per (user, exercise)
+        Index("ix_set_logs_user_id_exercise_id_finished_at", "user_id", "exercise_id", "finished_at"),
+    )
+
+    session_id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True)
+    exercise_id: Mapped[str] = mapped_column(String(100), primary_key=True)
+    set_index: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[str] = mapped_column(UUID(as_uuid=False), nullable=False)
+    # Parsed from the logged strings; None when the value is not a finite number
+    weight: Mapped[float | None] = mapped_column(Float, nullable=True)
+    reps: Mapped[float | None] = mapped_column(Float, nullable=True)
+    is_pr: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    # Copy of the session's finished_at, so history reads never touch `sessions`
+    finished_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
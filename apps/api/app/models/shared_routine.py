@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, String, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class SharedRoutine(Base):
+    """Immutable routine snapshot, addressed by the SHA-256 of its canonical
+    content (see app.modules.routines.sharing). Identical routines shared by
+    different users are stored once; no owner is recorded."""
+
+    __tablename__ = "shared_routines"
+
+    hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    exercises: Mapped[list[str]] = mapped_column(ARRAY(String), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=text("CURRENT_TIMESTAMP")
+    )
@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Index, String, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class SyncTombstone(Base):
+    """A deleted routine, session or custom exercise, for clients' delta sync."""
+
+    __tablename__ = "sync_tombstones"
+    __table_args__ = (Index("ix_sync_tombstones_user_id_data_version", "user_id", "data_version"),)
+
+    user_id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True)
+    entity: Mapped[str] = mapped_column(String(20), primary_key=True)  # routine | session | exercise
+    entity_id: Mapped[str] = mapped_column(String(100), primary_key=True)
+    # User data version of the delete
+    data_version: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=text("CURRENT_TIMESTAMP")
+    )
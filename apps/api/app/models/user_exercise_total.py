@@ -0,0 +1,15 @@
+from sqlalchemy import Integer, String, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class UserExerciseTotal(Base):
+    """Logged sets per exercise per user, maintained on every session write."""
+
+    __tablename__ = "user_exercise_totals"
+
+    user_id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True)
+    exercise_id: Mapped[str] = mapped_column(String(100), primary_key=True)
+    sets: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class UserStats(Base):
+    """Per-user rollup of session totals, maintained on every session write."""
+
+    __tablename__ = "user_stats"
+
+    user_id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True)
+    total_workouts: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
+    total_sets: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
+    total_minutes: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
+    # Only sessions with duration > 0 count towards the average duration.
+    timed_workouts: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
+    timed_minutes: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=text("CURRENT_TIMESTAMP"),
+        onupdate=text("CURRENT_TIMESTAMP"),
+    )
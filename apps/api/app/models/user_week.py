@@ -0,0 +1,18 @@
+from datetime import date
+
+from sqlalchemy import Date, Integer, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class UserWeek(Base):
+    """Distinct training days per ISO week (UTC), maintained on every session write."""
+
+    __tablename__ = "user_weeks"
+
+    user_id: Mapped[str] = mapped_column(UUID(as_uuid=False), primary_key=True)
+    week_start: Mapped[date] = mapped_column(Date, primary_key=True)  # Monday
+    # Bit i set ⇔ at least one session finished on weekday i (0 = Monday).
+    days: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
@@ -0,0 +1,192 @@
+"""
+Platform-wide materialized aggregates for the admin dashboard.
+
+- `platform_days`            — sessions, active users (all / premium), sets, minutes per UTC day
+- `platform_exercise_days`   — sets and distinct users per exercise per UTC day
+- `platform_retention_weeks` — weekly active users per plan, and how many of
+                               them were also active the previous week
+
+`refresh_platform_aggregates` is incremental: sessions inserted since the
+stored high-water mark (`sessions.created_at`) mark their days dirty, and only
+those days (and the weeks containing them, plus the following week) are
+recomputed, each through an index range scan. Recomputing whole days keeps
+distinct-user counts exact and makes re-processing idempotent, so each run
+re-reads a short overlap to catch transactions that committed out of order.
+Deleted sessions are only reflected after a `--full` refresh.
+
+Each API worker runs the incremental refresh periodically (app.maintenance);
+admins can trigger one via POST /admin/analytics/refresh. `--full` rescans
+every session, so it is only available from the CLI (ideally off-peak):
+
+    python -m app.modules.admin.aggregates [--full]
+"""
+import argparse
+import asyncio
+from collections import Counter
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import delete, func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.database import dialect_insert
+from app.models.aggregate_watermark import AggregateWatermark
+from app.models.platform_day import PlatformDay
+from app.models.platform_exercise_day import PlatformExerciseDay
+from app.models.platform_retention_week import PlatformRetentionWeek
+from app.models.profile import Profile
+from app.models.session import Session
+from app.models.user_week import UserWeek
+from app.modules.analytics.rollup import utc_date, week_start
+
+WATERMARK = "platform"
+# Re-read window behind the high-water mark for late-committing transactions
+_OVERLAP = timedelta(minutes=10)
+_LOCK_KEY = 0x676D5F706C6174  # pg_advisory_xact_lock key: one refresh at a time
+
+
+def _day_bounds(day: date) -> tuple[datetime, datetime]:
+    start = datetime.combine(day, time(), tzinfo=timezone.utc)
+    return start, start + timedelta(days=1)
+
+
+async def refresh_platform_aggregates(db: AsyncSession, full: bool = False) -> int:
+    """Recompute the days touched since the last run. Returns the number of days refreshed."""
+    if db.bind.dialect.name == "postgresql":
+        await db.execute(select(func.pg_advisory_xact_lock(_LOCK_KEY)))
+
+    mark = await db.get(AggregateWatermark, WATERMARK)
+    query = select(Session.created_at, Session.finished_at)
+    if not full and mark is not None and mark.high_water_mark is not None:
+        query = query.where(Session.created_at > mark.high_water_mark - _OVERLAP)
+    elif full:
+        for table in (PlatformDay, PlatformExerciseDay, PlatformRetentionWeek):
+            await db.execute(delete(table))
+
+    days: set[date] = set()
+    high_water_mark = mark.high_water_mark if mark is not None else None
+    rows = await db.stream(query.execution_options(yield_per=1000))
+    async for row in rows:
+        days.add(utc_date(row.finished_at))
+        if high_water_mark is None or row.created_at > high_water_mark:
+            high_water_mark = row.created_at
+
+    for day in sorted(days):
+        await _refresh_day(db, day)
+
+    this_week = week_start(datetime.now(timezone.utc).date())
+    weeks = {week_start(d) for d in days}
+    # A week's retention depends on the week before it
+    weeks |= {w + timedelta(weeks=1) for w in weeks if w < this_week}
+    for week in sorted(weeks):
+        await _refresh_retention_week(db, week)
+
+    stmt = dialect_insert(db)(AggregateWatermark).values(
+        name=WATERMARK, high_water_mark=high_water_mark
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[AggregateWatermark.name],
+            set_={"high_water_mark": stmt.excluded.high_water_mark, "refreshed_at": func.now()},
+        )
+    )
+    await db.commit()
+    return len(days)
+
+
+async def _refresh_day(db: AsyncSession, day: date) -> None:
+    start, end = _day_bounds(day)
+    # Range scan on ix_sessions_finished_at
+    result = await db.stream(
+        select(Session.user_id, Session.duration_minutes, Session.logs, Profile.plan)
+        .outerjoin(Profile, Profile.id == Session.user_id)
+        .where(Session.finished_at >= start, Session.finished_at < end)
+        .execution_options(yield_per=1000)
+    )
+    sessions = sets = minutes = 0
+    users: set[str] = set()
+    premium: set[str] = set()
+    exercise_sets: Counter[str] = Counter()
+    exercise_users: dict[str, set[str]] = {}
+    async for row in result:
+        sessions += 1
+        minutes += row.duration_minutes
+        users.add(row.user_id)
+        if row.plan == "premium":
+            premium.add(row.user_id)
+        for exercise_id, logs in (row.logs or {}).items():
+            n = len(logs) if isinstance(logs, list) else 0
+            sets += n
+            exercise_sets[exercise_id] += n
+            exercise_users.setdefault(exercise_id, set()).add(row.user_id)
+
+    await db.execute(delete(PlatformDay).where(PlatformDay.day == day))
+    await db.execute(delete(PlatformExerciseDay).where(PlatformExerciseDay.day == day))
+    if not sessions:
+        return
+    db.add(
+        PlatformDay(
+            day=day,
+            sessions=sessions,
+            active_users=len(users),
+            premium_active_users=len(premium),
+            sets=sets,
+            minutes=minutes,
+        )
+    )
+    db.add_all(
+        PlatformExerciseDay(
+            day=day, exercise_id=exercise_id, sets=n, users=len(exercise_users[exercise_id])
+        )
+        for exercise_id, n in exercise_sets.items()
+    )
+    await db.flush()
+
+
+async def _refresh_retention_week(db: AsyncSession, week: date) -> None:
+    """Active users per (current) plan from the `user_weeks` rollup."""
+    previous = aliased(UserWeek)
+    plan = func.coalesce(Profile.plan, literal_column("'free'"))
+    result = await db.execute(
+        select(
+            plan.label("plan"),
+            func.count().label("active_users"),
+            func.count(previous.user_id).label("retained_users"),
+        )
+        .select_from(UserWeek)
+        .outerjoin(Profile, Profile.id == UserWeek.user_id)
+        .outerjoin(
+            previous,
+            (previous.user_id == UserWeek.user_id)
+            & (previous.week_start == week - timedelta(weeks=1)),
+        )
+        .where(UserWeek.week_start == week)
+        .group_by(plan)
+    )
+    await db.execute(delete(PlatformRetentionWeek).where(PlatformRetentionWeek.week_start == week))
+    db.add_all(
+        PlatformRetentionWeek(
+            week_start=week,
+            plan=r.plan,
+            active_users=r.active_users,
+            retained_users=r.retained_users,
+        )
+        for r in result.all()
+    )
+    await db.flush()
+
+
+async def _main() -> None:
+    from app.database import AsyncSessionLocal
+
+    parser = argparse.ArgumentParser(description="Refresh platform-wide admin aggregates.")
+    parser.add_argument("--full", action="store_true", help="recompute every day from scratch")
+    args = parser.parse_args()
+
+    async with AsyncSessionLocal() as db:
+        count = await refresh_platform_aggregates(db, full=args.full)
+    print(f"[aggregates] refreshed {count} day(s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -1,12 +1,21 @@
-from fastapi import APIRouter, HTTPException, status
+from datetime import date, datetime, timedelta, timezone
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Query, status
 from pydantic import BaseModel
 from sqlalchemy import func, select
 
-from app.dependencies import AdminProfile, DbSession
+from app.dependencies import AdminProfile, DbSession, ReadDbSession
+from app.models.aggregate_watermark import AggregateWatermark
 from app.models.app_config import AppConfig
 from app.models.exercise import CustomExercise
+from app.models.platform_day import PlatformDay
+from app.models.platform_exercise_day import PlatformExerciseDay
+from app.models.platform_retention_week import PlatformRetentionWeek
 from app.models.profile import Profile
 from app.models.session import Session
+from app.modules.admin.aggregates import WATERMARK, refresh_platform_aggregates
+from app.modules.exercises.catalog import CATALOG
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -16,7 +25,7 @@ class ConfigUpdate(BaseModel):
 
 
 @router.get("/config")
-async def get_all_config(profile: AdminProfile, db: DbSession) -> list[dict]:
+async def get_all_config(profile: AdminProfile, db: ReadDbSession) -> list[dict]:
     result = await db.execute(select(AppConfig))
     return [{"key": c.key, "value": c.value} for c in result.scalars().all()]
 
@@ -37,13 +46,12 @@ async def update_config(
 
 
 @router.get("/users")
-async def list_users(profile: AdminProfile, db: DbSession) -> dict:
+async def list_users(profile: AdminProfile, db: ReadDbSession) -> dict:
     result = await db.execute(select(Profile))
     profiles = list(result.scalars().all())
     free_count = sum(1 for p in profiles if p.plan == "free")
     premium_count = sum(1 for p in profiles if p.plan == "premium")
 
-    from datetime import date, timedelta
     today_start = date.today().isoformat()
     sessions_today_result = await db.execute(
         select(func.count()).where(Session.finished_at >= today_start)
@@ -59,7 +67,7 @@ async def list_users(profile: AdminProfile, db: DbSession) -> dict:
 
 
 @router.get("/custom-exercises")
-async def list_custom_exercises(profile: AdminProfile, db: DbSession) -> list[dict]:
+async def list_custom_exercises(profile: AdminProfile, db: ReadDbSession) -> list[dict]:
     """
     Returns all user-created custom exercises grouped by name + muscle,
     with a count of how many distinct users added each combination.
@@ -78,3 +86,110 @@ async def list_custom_exercises(profile: AdminProfile, db: DbSession) -> list[di
         {"name": r.name, "muscle": r.muscle, "user_count": r.user_count}
         for r in result.all()
     ]
+
+
+# ── Platform analytics (reads only the materialized aggregates) ────────────────
+
+
+def _days(from_: date | None, to: date | None, default_days: int = 30) -> tuple[date, date]:
+    to = to or datetime.now(timezone.utc).date()
+    return from_ or to - timedelta(days=default_days - 1), to
+
+
+FromDay = Annotated[date | None, Query(alias="from")]
+
+
+@router.get("/analytics/daily")
+async def platform_daily(
+    profile: AdminProfile, db: ReadDbSession, from_: FromDay = None, to: date | None = None
+) -> list[dict]:
+    """Sessions, daily active users (all / premium), sets and minutes per UTC day."""
+    start, end = _days(from_, to)
+    result = await db.execute(
+        select(PlatformDay)
+        .where(PlatformDay.day >= start, PlatformDay.day <= end)
+        .order_by(PlatformDay.day)
+    )
+    return [
+        {
+            "day": d.day,
+            "sessions": d.sessions,
+            "active_users": d.active_users,
+            "premium_active_users": d.premium_active_users,
+            "sets": d.sets,
+            "minutes": d.minutes,
+        }
+        for d in result.scalars().all()
+    ]
+
+
+@router.get("/analytics/exercises")
+async def platform_top_exercises(
+    profile: AdminProfile,
+    db: ReadDbSession,
+    from_: FromDay = None,
+    to: date | None = None,
+    limit: Annotated[int, Query(ge=1, le=200)] = 20,
+) -> list[dict]:
+    """Most-trained exercises by sets in the period (`user_days`: sum of daily distinct users)."""
+    start, end = _days(from_, to)
+    sets = func.sum(PlatformExerciseDay.sets)
+    result = await db.execute(
+        select(
+            PlatformExerciseDay.exercise_id,
+            sets.label("sets"),
+            func.sum(PlatformExerciseDay.users).label("user_days"),
+        )
+        .where(PlatformExerciseDay.day >= start, PlatformExerciseDay.day <= end)
+        .group_by(PlatformExerciseDay.exercise_id)
+        .order_by(sets.desc(), PlatformExerciseDay.exercise_id)
+        .limit(limit)
+    )
+    return [
+        {
+            "exercise_id": r.exercise_id,
+            "name": entry.name if (entry := CATALOG.get(r.exercise_id)) else None,
+            "sets": r.sets,
+            "user_days": r.user_days,
+        }
+        for r in result.all()
+    ]
+
+
+@router.get("/analytics/retention")
+async def platform_retention(
+    profile: AdminProfile, db: ReadDbSession, weeks: Annotated[int, Query(ge=1, le=104)] = 12
+) -> list[dict]:
+    """Week-over-week retention per plan (users active in a week who were active the week before)."""
+    since = datetime.now(timezone.utc).date() - timedelta(weeks=weeks)
+    result = await db.execute(
+        select(PlatformRetentionWeek)
+        .where(PlatformRetentionWeek.week_start > since)
+        .order_by(PlatformRetentionWeek.week_start, PlatformRetentionWeek.plan)
+    )
+    return [
+        {
+            "week_start": w.week_start,
+            "plan": w.plan,
+            "active_users": w.active_users,
+            "retained_users": w.retained_users,
+            "retention": round(w.retained_users / w.active_users, 4) if w.active_users else 0.0,
+        }
+        for w in result.scalars().all()
+    ]
+
+
+@router.get("/analytics/status")
+async def platform_aggregates_status(profile: AdminProfile, db: ReadDbSession) -> dict:
+    mark = await db.get(AggregateWatermark, WATERMARK)
+    return {
+        "high_water_mark": mark.high_water_mark if mark else None,
+        "refreshed_at": mark.refreshed_at if mark else None,
+    }
+
+
+@router.post("/analytics/refresh")
+async def refresh_platform_analytics(profile: AdminProfile, db: DbSession) -> dict:
+    """Incremental refresh now (it also runs periodically, see app.maintenance).
+    Full rescans are CLI-only: python -m app.modules.admin.aggregates --full"""
+    return {"days_refreshed": await refresh_platform_aggregates(db)}
@@ -0,0 +1,152 @@
+"""
+Columnar analytics engine for session logs.
+
+A user's sessions are flattened once into per-set columns (session index,
+exercise code, weight, reps); volume, sets per session, sets per exercise and
+weekly frequency are then group-bys over those columns. Muscle split maps the
+per-exercise counts through the exercise catalog.
+
+PostgreSQL aggregates in the database (`queries`); this is the path for other
+dialects (SQLite in tests and local runs), so it stays dependency-free. Call
+it through `run_in_threadpool` — it is CPU-bound.
+"""
+import math
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from app.modules.analytics.rollup import Totals, utc_date
+from app.modules.exercises.catalog import CatalogEntry
+
+
+@dataclass
+class SetColumns:
+    """Flattened set logs plus the per-session columns they index into.
+
+    `weight` / `reps` are float columns, NaN when not numeric.
+    """
+
+    finished_at: list[datetime] = field(default_factory=list)
+    duration: list[int] = field(default_factory=list)
+    session_idx: list[int] = field(default_factory=list)
+    exercise: list[int] = field(default_factory=list)
+    weight: list[float] = field(default_factory=list)
+    reps: list[float] = field(default_factory=list)
+    exercise_ids: list[str] = field(default_factory=list)
+
+    @property
+    def n_sessions(self) -> int:
+        return len(self.finished_at)
+
+
+def _to_float(v: object) -> float:
+    try:
+        return float(v)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _floats(raw: list) -> list[float]:
+    try:
+        return list(map(float, raw))
+    except (TypeError, ValueError):
+        return [_to_float(v) for v in raw]
+
+
+def flatten(sessions: Sequence) -> SetColumns:
+    """Single pass over every set; all later work is on the columns."""
+    cols = SetColumns()
+    weights: list = []
+    reps: list = []
+    add_session, add_exercise = cols.session_idx.append, cols.exercise.append
+    add_weight, add_reps = weights.append, reps.append
+    exercise_codes: dict[str, int] = {}
+    for i, s in enumerate(sessions):
+        cols.finished_at.append(s.finished_at)
+        cols.duration.append(s.duration_minutes)
+        for exercise_id, sets in (s.logs or {}).items():
+            code = exercise_codes.setdefault(exercise_id, len(exercise_codes))
+            for log in sets:
+                add_session(i)
+                add_exercise(code)
+                add_weight(log.get("weight"))
+                add_reps(log.get("reps"))
+
+    cols.weight = _floats(weights)
+    cols.reps = _floats(reps)
+    cols.exercise_ids = list(exercise_codes)
+    return cols
+
+
+def _week_key(d: datetime) -> str:
+    iso = utc_date(d).isocalendar()
+    return f"{iso.year}-W{iso.week:02d}"
+
+
+def muscle_split(
+    exercise_sets: Iterable[tuple[str, int]], index: Mapping[str, CatalogEntry]
+) -> list[dict]:
+    """Sets per primary muscle from sets per exercise — the chart's `{muscle, sets}`
+    rows — each with an extra `secondary_sets` count. Muscles only ever worked as
+    a secondary muscle get no row, so clients see the same rows as before.
+
+    Exercises missing from the index (e.g. a deleted custom exercise) are skipped.
+    """
+    primary: dict[str, int] = {}
+    secondary: dict[str, int] = {}
+    for exercise_id, n in exercise_sets:
+        entry = index.get(exercise_id)
+        if entry is None or n <= 0:
+            continue
+        primary[entry.muscle] = primary.get(entry.muscle, 0) + n
+        for muscle in entry.secondary:
+            secondary[muscle] = secondary.get(muscle, 0) + n
+    split = [
+        {"muscle": m, "sets": n, "secondary_sets": secondary.get(m, 0)} for m, n in primary.items()
+    ]
+    return sorted(split, key=lambda r: (-r["sets"], r["muscle"]))
+
+
+def charts(cols: SetColumns, index: Mapping[str, CatalogEntry]) -> dict:
+    """The five `/analytics` chart datasets."""
+    volume, sets, exercise_sets = _groupbys(cols)
+
+    freq: dict[str, int] = {}
+    for d in cols.finished_at:
+        week = _week_key(d)
+        freq[week] = freq.get(week, 0) + 1
+
+    return {
+        "volume": [{"date": d, "volume": v} for d, v in zip(cols.finished_at, volume)],
+        "duration": [{"date": d, "minutes": m} for d, m in zip(cols.finished_at, cols.duration)],
+        "sets": [{"date": d, "sets": n} for d, n in zip(cols.finished_at, sets)],
+        "muscle_split": muscle_split(zip(cols.exercise_ids, exercise_sets), index),
+        "frequency": [{"week": k, "count": v} for k, v in sorted(freq.items())],
+    }
+
+
+def totals(cols: SetColumns) -> Totals:
+    """`user_stats`-shaped totals over the flattened sessions."""
+    timed = [m for m in cols.duration if m > 0]
+    return Totals(
+        total_workouts=cols.n_sessions,
+        total_sets=len(cols.session_idx),
+        total_minutes=sum(cols.duration),
+        timed_workouts=len(timed),
+        timed_minutes=sum(timed),
+    )
+
+
+def _groupbys(cols: SetColumns) -> tuple[list[float], list[int], list[int]]:
+    volume = [0.0] * cols.n_sessions
+    sets = [0] * cols.n_sessions
+    exercise_sets = [0] * len(cols.exercise_ids)
+    for i, e, w, r in zip(cols.session_idx, cols.exercise, cols.weight, cols.reps):
+        product = w * r
+        if math.isfinite(product):  # unparseable (NaN) or overflowing sets add nothing
+            volume[i] += product
+        sets[i] += 1
+        exercise_sets[e] += 1
+    # A session total past the float range counts as 0, like queries._as_float
+    volume = [v if math.isfinite(v) else 0.0 for v in volume]
+    return volume, sets, exercise_sets
@@ -0,0 +1,77 @@
+"""
+Per-exercise progression series: one point per session in which the exercise
+was logged (top-set weight, volume, best estimated 1RM), downsampled with
+largest-triangle-three-buckets so long histories keep a fixed payload size.
+"""
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TypeVar
+
+from app.modules.analytics.records import estimated_1rm
+
+T = TypeVar("T")
+
+
+@dataclass
+class ExercisePoint:
+    date: datetime
+    session_id: str
+    top_weight: float
+    volume: float
+    e1rm: float
+
+    def add(self, weight: float | None, reps: float | None) -> None:
+        if weight is None:
+            return
+        if reps is not None:
+            self.volume += weight * reps
+        if weight > 0:
+            self.top_weight = max(self.top_weight, weight)
+            self.e1rm = max(self.e1rm, estimated_1rm(weight, int(reps or 0)))
+
+
+def exercise_points(sets: Iterable) -> list[ExercisePoint]:
+    """`sets` are `set_logs` rows of one exercise, grouped by session in date order."""
+    points: list[ExercisePoint] = []
+    for s in sets:
+        if not points or points[-1].session_id != s.session_id:
+            points.append(ExercisePoint(s.finished_at, s.session_id, 0.0, 0.0, 0.0))
+        points[-1].add(s.weight, s.reps)
+    return points
+
+
+def lttb(
+    data: Sequence[T], threshold: int, x: Callable[[T], float], y: Callable[[T], float]
+) -> list[T]:
+    """Largest-triangle-three-buckets: keep `threshold` points that preserve the shape of y(x).
+
+    The first and last points are always kept; each bucket in between contributes
+    the point forming the largest triangle with the previously kept point and the
+    average of the next bucket.
+    """
+    n = len(data)
+    if threshold >= n or threshold < 3:
+        return list(data)
+
+    xs = [x(d) for d in data]
+    ys = [y(d) for d in data]
+    every = (n - 2) / (threshold - 2)
+    sampled = [data[0]]
+    a = 0
+    for i in range(threshold - 2):
+        start, end = int((i + 1) * every) + 1, min(int((i + 2) * every) + 1, n)
+        avg_x = sum(xs[start:end]) / (end - start)
+        avg_y = sum(ys[start:end]) / (end - start)
+
+        best, best_area = -1, -1.0
+        for j in range(int(i * every) + 1, int((i + 1) * every) + 1):
+            area = abs(
+                (xs[a] - avg_x) * (ys[j] - ys[a]) - (xs[a] - xs[j]) * (avg_y - ys[a])
+            )
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append(data[best])
+        a = best
+    sampled.append(data[-1])
+    return sampled
@@ -0,0 +1,183 @@
+"""
+PostgreSQL-side analytics aggregations.
+
+`Session.logs` is expanded with `jsonb_each` / `jsonb_array_elements` and
+grouped in the database, so only chart-ready rows cross the wire instead of
+every session's full JSONB payload.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import (
+    Float,
+    Integer,
+    Numeric,
+    Select,
+    and_,
+    case,
+    cast,
+    column,
+    func,
+    literal,
+    select,
+    true,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.session import Session
+
+# Mirrors Python's float() for the strings the clients actually send. Exponents
+# are capped at 4 digits so the numeric cast can't overflow either.
+_NUMERIC = r"^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d{1,4})?\s*$"
+# float8 arithmetic raises "value out of range" past this; such values count as 0.
+# Bound as numeric: a float8 parameter would make PostgreSQL compare as float8.
+_FLOAT_LIMIT = literal(Decimal("1e308"), Numeric)
+
+
+@dataclass(frozen=True)
+class Window:
+    """Optional `finished_at` bounds (inclusive) for an analytics query."""
+
+    start: datetime | None = None
+    end: datetime | None = None
+
+    @property
+    def bounded(self) -> bool:
+        return self.start is not None or self.end is not None
+
+    def apply(self, query: Select) -> Select:
+        # Range scan on ix_sessions_user_id_finished_at_id
+        if self.start is not None:
+            query = query.where(Session.finished_at >= self.start)
+        if self.end is not None:
+            query = query.where(Session.finished_at <= self.end)
+        return query
+
+
+ALL_TIME = Window()
+
+
+def _set_logs():
+    """(exercise, set_log) table-valued expansions of `Session.logs`."""
+    exercise = func.jsonb_each(Session.logs).table_valued(
+        column("key"), column("value", JSONB)
+    ).alias("exercise")
+    sets = case(
+        (func.jsonb_typeof(exercise.c.value) == "array", exercise.c.value),
+        else_=literal("[]", JSONB),
+    )
+    set_log = func.jsonb_array_elements(sets).table_valued(
+        column("value", JSONB)
+    ).alias("set_log")
+    return exercise, set_log
+
+
+def _volume(set_log):
+    """Per-set weight × reps as numeric: 0 when unparseable or out of float range
+    (as in engine._groupbys). CASE, unlike AND, checks the regex before the casts."""
+    weight = set_log.c.value["weight"].astext
+    reps = set_log.c.value["reps"].astext
+    product = cast(weight, Numeric) * cast(reps, Numeric)
+    return case(
+        (
+            and_(weight.regexp_match(_NUMERIC), reps.regexp_match(_NUMERIC)),
+            case((func.abs(product) < _FLOAT_LIMIT, product), else_=0),
+        ),
+        else_=0,
+    )
+
+
+def _as_float(value):
+    """numeric → float8, 0 past the float range (rounded first: tiny values underflow)."""
+    return case((func.abs(value) < _FLOAT_LIMIT, cast(func.round(value, 320), Float)), else_=0.0)
+
+
+def _per_session():
+    exercise, set_log = _set_logs()
+    return (
+        select(
+            func.count().label("sets"),
+            func.coalesce(func.sum(_volume(set_log)), 0).label("volume"),  # numeric
+        )
+        .select_from(exercise)
+        .join(set_log, true())
+        .lateral("per_session")
+    )
+
+
+async def session_points(
+    db: AsyncSession, user_id: str, window: Window = ALL_TIME
+) -> list:
+    """One row per session: finished_at, duration_minutes, sets, volume."""
+    per_session = _per_session()
+    result = await db.execute(
+        window.apply(
+            select(
+                Session.finished_at,
+                Session.duration_minutes,
+                per_session.c.sets,
+                _as_float(per_session.c.volume).label("volume"),
+            )
+            .join(per_session, true())
+            .where(Session.user_id == user_id)
+        ).order_by(Session.finished_at)
+    )
+    return list(result.all())
+
+
+async def window_totals(db: AsyncSession, user_id: str, window: Window) -> dict[str, int]:
+    """`user_stats`-shaped totals for the sessions inside `window`."""
+    per_session = _per_session()
+    timed = Session.duration_minutes > 0
+    result = await db.execute(
+        window.apply(
+            select(
+                func.count().label("total_workouts"),
+                cast(func.coalesce(func.sum(per_session.c.sets), 0), Integer).label("total_sets"),
+                func.coalesce(func.sum(Session.duration_minutes), 0).label("total_minutes"),
+                func.count().filter(timed).label("timed_workouts"),
+                func.coalesce(
+                    func.sum(Session.duration_minutes).filter(timed), 0
+                ).label("timed_minutes"),
+            )
+            .join(per_session, true())
+            .where(Session.user_id == user_id)
+        )
+    )
+    return dict(result.one()._mapping)
+
+
+async def exercise_sets(db: AsyncSession, user_id: str, window: Window = ALL_TIME) -> list:
+    """(exercise_id, sets) across the user's sessions."""
+    exercise, _ = _set_logs()
+    sets = case(
+        (func.jsonb_typeof(exercise.c.value) == "array", func.jsonb_array_length(exercise.c.value)),
+        else_=0,
+    )
+    result = await db.execute(
+        window.apply(
+            select(exercise.c.key.label("exercise_id"), cast(func.sum(sets), Integer).label("sets"))
+            .select_from(Session)
+            .join(exercise, true())
+            .where(Session.user_id == user_id)
+        ).group_by(exercise.c.key)
+    )
+    return list(result.all())
+
+
+async def weekly_frequency(
+    db: AsyncSession, user_id: str, window: Window = ALL_TIME
+) -> list:
+    """(ISO week, session count), oldest week first."""
+    week = func.to_char(func.timezone("UTC", Session.finished_at), 'IYYY-"W"IW')
+    result = await db.execute(
+        window.apply(
+            select(week.label("week"), func.count().label("count"))
+            .where(Session.user_id == user_id)
+        )
+        .group_by(week)
+        .order_by(week)
+    )
+    return list(result.all())
@@ -0,0 +1,200 @@
+"""
+Personal records per exercise: best weight, best reps at that weight and best
+estimated 1RM (Epley), with the session in which the weight was first reached.
+
+A weight PR is only beaten by a strictly heavier set, the same rule as the
+clients' `checkPR`. Maintained through `rollup.record_sessions` /
+`rollup.forget_sessions`; deleting a session that held (part of) a record
+recomputes that exercise from the remaining history.
+"""
+import math
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Protocol
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import dialect_insert
+from app.models.personal_record import PersonalRecord
+from app.models.set_log import SetLog
+
+
+class _SessionLike(Protocol):
+    id: str
+    finished_at: datetime
+    logs: dict
+
+
+def estimated_1rm(weight: float, reps: int) -> float:
+    return weight if reps <= 1 else weight * (1 + reps / 30)
+
+
+@dataclass
+class Best:
+    weight: float
+    reps: int
+    e1rm: float
+    session_id: str | None
+    achieved_at: datetime
+
+    def __post_init__(self) -> None:
+        # Naive timestamps (SQLite) are UTC, as everywhere else in the API.
+        if self.achieved_at.tzinfo is None:
+            self.achieved_at = self.achieved_at.replace(tzinfo=timezone.utc)
+
+    def merge(self, other: "Best") -> None:
+        if other.weight > self.weight:
+            self.weight, self.reps = other.weight, other.reps
+            self.session_id, self.achieved_at = other.session_id, other.achieved_at
+        elif other.weight == self.weight:
+            self.reps = max(self.reps, other.reps)
+            if other.achieved_at < self.achieved_at:
+                self.session_id, self.achieved_at = other.session_id, other.achieved_at
+        self.e1rm = max(self.e1rm, other.e1rm)
+
+    def values(self) -> dict:
+        return {
+            "weight": self.weight,
+            "reps": self.reps,
+            "e1rm": self.e1rm,
+            "session_id": self.session_id,
+            "achieved_at": self.achieved_at,
+        }
+
+
+def parse_number(v: object) -> float | None:
+    try:
+        f = float(v)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return None
+    return f if math.isfinite(f) else None
+
+
+# personal_records.reps is an int4 column
+_REPS_LIMIT = 2**31
+
+
+def parse_reps(v: object) -> int:
+    """Whole reps; 0 when unparseable or outside the column's range."""
+    f = parse_number(v)
+    return int(f) if f is not None and abs(f) < _REPS_LIMIT else 0
+
+
+def exercise_best(sets: list, session_id: str | None, finished_at: datetime) -> Best | None:
+    """Best set of one exercise within one session (None if no weighted sets)."""
+    best: Best | None = None
+    for log in sets or []:
+        weight = parse_number(log.get("weight"))
+        if weight is None or weight <= 0:
+            continue
+        reps = parse_reps(log.get("reps"))
+        candidate = Best(weight, reps, estimated_1rm(weight, reps), session_id, finished_at)
+        if best is None:
+            best = candidate
+        else:
+            best.merge(candidate)
+    return best
+
+
+def _fold(bests: dict[str, Best], exercise_id: str, best: Best | None) -> None:
+    if best is None:
+        return
+    if exercise_id in bests:
+        bests[exercise_id].merge(best)
+    else:
+        bests[exercise_id] = best
+
+
+def _bests(sessions: Iterable[_SessionLike]) -> dict[str, Best]:
+    bests: dict[str, Best] = {}
+    for s in sessions:
+        for exercise_id, sets in (s.logs or {}).items():
+            _fold(bests, exercise_id, exercise_best(sets, s.id, s.finished_at))
+    return bests
+
+
+async def _load(db: AsyncSession, user_id: str, exercise_ids: Iterable[str]) -> dict[str, Best]:
+    result = await db.execute(
+        select(PersonalRecord).where(
+            PersonalRecord.user_id == user_id,
+            PersonalRecord.exercise_id.in_(list(exercise_ids)),
+        )
+    )
+    return {
+        pr.exercise_id: Best(pr.weight, pr.reps, pr.e1rm, pr.session_id, pr.achieved_at)
+        for pr in result.scalars().all()
+    }
+
+
+async def _save(db: AsyncSession, user_id: str, bests: dict[str, Best]) -> None:
+    if not bests:
+        return
+    stmt = dialect_insert(db)(PersonalRecord).values(
+        [{"user_id": user_id, "exercise_id": ex, **b.values()} for ex, b in bests.items()]
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[PersonalRecord.user_id, PersonalRecord.exercise_id],
+            set_={col: getattr(stmt.excluded, col) for col in Best.__dataclass_fields__},
+        )
+    )
+
+
+async def record_prs(db: AsyncSession, user_id: str, sessions: Iterable[_SessionLike]) -> None:
+    """Fold newly inserted sessions into the user's records (caller commits)."""
+    incoming = _bests(sessions)
+    if not incoming:
+        return
+    current = await _load(db, user_id, incoming)
+    for exercise_id, best in incoming.items():
+        _fold(current, exercise_id, best)
+    await _save(db, user_id, {ex: current[ex] for ex in incoming})
+
+
+async def forget_prs(db: AsyncSession, user_id: str, sessions: Iterable[_SessionLike]) -> None:
+    """Recompute records the already-deleted sessions contributed to (caller commits)."""
+    removed = _bests(sessions)
+    if not removed:
+        return
+    current = await _load(db, user_id, removed)
+    stale = [
+        exercise_id
+        for exercise_id, best in removed.items()
+        if exercise_id in current
+        and (
+            best.weight >= current[exercise_id].weight
+            or best.e1rm >= current[exercise_id].e1rm
+        )
+    ]
+    if stale:
+        await recompute_prs(db, user_id, stale)
+
+
+async def recompute_prs(db: AsyncSession, user_id: str, exercise_ids: list[str]) -> None:
+    """Rebuild the given exercises' records from the user's remaining sets."""
+    # Range scans on ix_set_logs_user_id_exercise_id_finished_at
+    result = await db.execute(
+        select(
+            SetLog.exercise_id, SetLog.session_id, SetLog.finished_at, SetLog.weight, SetLog.reps
+        ).where(
+            SetLog.user_id == user_id,
+            SetLog.exercise_id.in_(exercise_ids),
+            SetLog.weight > 0,
+        )
+    )
+    bests: dict[str, Best] = {}
+    for row in result.all():
+        reps = parse_reps(row.reps)
+        best = Best(row.weight, reps, estimated_1rm(row.weight, reps), row.session_id, row.finished_at)
+        _fold(bests, row.exercise_id, best)
+
+    gone = [ex for ex in exercise_ids if ex not in bests]
+    if gone:
+        await db.execute(
+            delete(PersonalRecord).where(
+                PersonalRecord.user_id == user_id, PersonalRecord.exercise_id.in_(gone)
+            )
+        )
+    await _save(db, user_id, bests)
@@ -0,0 +1,261 @@
+"""
+Derived per-user analytics tables, kept in step with the sessions table.
+
+- `user_stats`           — lifetime totals (workouts, sets, minutes)
+- `user_weeks`           — distinct training days per ISO week (UTC)
+- `user_exercise_totals` — logged sets per exercise
+- `personal_records`     — best sets per exercise (see `records`)
+- `set_logs`             — one row per logged set (see `sessions.set_logs`)
+
+Session writes call `record_sessions` / `forget_sessions` before committing,
+so the rollups are updated in the same transaction as the rows they summarise.
+
+Rebuild everything (or one user) from the sessions table:
+
+    python -m app.modules.analytics.rollup [--user-id <uuid>]
+"""
+import argparse
+import asyncio
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Protocol
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import dialect_insert
+from app.models.personal_record import PersonalRecord
+from app.models.session import Session
+from app.models.set_log import SetLog
+from app.models.user_exercise_total import UserExerciseTotal
+from app.models.user_stats import UserStats
+from app.models.user_week import UserWeek
+from app.modules.analytics.records import forget_prs, record_prs
+from app.modules.sessions.set_logs import delete_set_logs, write_set_logs
+
+
+class _SessionLike(Protocol):
+    id: str
+    finished_at: datetime
+    duration_minutes: int
+    logs: dict
+
+
+@dataclass
+class Totals:
+    total_workouts: int = 0
+    total_sets: int = 0
+    total_minutes: int = 0
+    timed_workouts: int = 0
+    timed_minutes: int = 0
+
+    def add(self, session: _SessionLike) -> None:
+        self.total_workouts += 1
+        self.total_sets += sum(len(sets) for sets in (session.logs or {}).values())
+        self.total_minutes += session.duration_minutes
+        if session.duration_minutes > 0:
+            self.timed_workouts += 1
+            self.timed_minutes += session.duration_minutes
+
+    def values(self, sign: int = 1) -> dict[str, int]:
+        return {k: sign * v for k, v in vars(self).items()}
+
+
+def tally(sessions: Iterable[_SessionLike]) -> Totals:
+    totals = Totals()
+    for s in sessions:
+        totals.add(s)
+    return totals
+
+
+def utc_date(finished_at: datetime) -> date:
+    if finished_at.tzinfo is not None:
+        finished_at = finished_at.astimezone(timezone.utc)
+    return finished_at.date()
+
+
+def week_start(day: date) -> date:
+    """Monday of the ISO week containing `day`."""
+    return day - timedelta(days=day.weekday())
+
+
+def _week_masks(sessions: Iterable[_SessionLike]) -> dict[date, int]:
+    masks: dict[date, int] = {}
+    for s in sessions:
+        day = utc_date(s.finished_at)
+        week = week_start(day)
+        masks[week] = masks.get(week, 0) | (1 << day.weekday())
+    return masks
+
+
+def _exercise_sets(sessions: Iterable[_SessionLike]) -> Counter[str]:
+    counts: Counter[str] = Counter()
+    for s in sessions:
+        for exercise_id, sets in (s.logs or {}).items():
+            counts[exercise_id] += len(sets)
+    return counts
+
+
+async def record_sessions(
+    db: AsyncSession, user_id: str, sessions: Iterable[_SessionLike]
+) -> None:
+    """Add newly inserted (flushed) sessions to the user's rollups (caller commits)."""
+    sessions = list(sessions)
+    if not sessions:
+        return
+    insert = dialect_insert(db)
+    await write_set_logs(db, user_id, sessions)
+
+    totals = tally(sessions)
+    stmt = insert(UserStats).values(user_id=user_id, **totals.values())
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[UserStats.user_id],
+            set_={
+                **{
+                    col: getattr(UserStats, col) + getattr(stmt.excluded, col)
+                    for col in totals.values()
+                },
+                "updated_at": func.now(),
+            },
+        )
+    )
+
+    stmt = insert(UserWeek).values(
+        [
+            {"user_id": user_id, "week_start": week, "days": mask}
+            for week, mask in _week_masks(sessions).items()
+        ]
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[UserWeek.user_id, UserWeek.week_start],
+            set_={"days": UserWeek.days.op("|")(stmt.excluded.days)},
+        )
+    )
+
+    exercise_sets = _exercise_sets(sessions)
+    if exercise_sets:
+        stmt = insert(UserExerciseTotal).values(
+            [
+                {"user_id": user_id, "exercise_id": exercise_id, "sets": sets}
+                for exercise_id, sets in exercise_sets.items()
+            ]
+        )
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[UserExerciseTotal.user_id, UserExerciseTotal.exercise_id],
+                set_={"sets": UserExerciseTotal.sets + stmt.excluded.sets},
+            )
+        )
+
+    await record_prs(db, user_id, sessions)
+
+
+async def forget_sessions(
+    db: AsyncSession, user_id: str, sessions: Iterable[_SessionLike]
+) -> None:
+    """Subtract already-deleted sessions from the user's rollups (caller commits)."""
+    sessions = list(sessions)
+    if not sessions:
+        return
+    await delete_set_logs(db, [s.id for s in sessions])
+
+    totals = tally(sessions)
+    await db.execute(
+        update(UserStats)
+        .where(UserStats.user_id == user_id)
+        .values(
+            **{
+                col: getattr(UserStats, col) + delta
+                for col, delta in totals.values(sign=-1).items()
+            },
+            updated_at=func.now(),
+        )
+    )
+
+    # Another session may share the deleted one's day, so the affected weeks
+    # are recomputed from what is left (an index range scan per week).
+    for week in _week_masks(sessions):
+        await _refresh_week(db, user_id, week)
+
+    for exercise_id, sets in _exercise_sets(sessions).items():
+        await db.execute(
+            update(UserExerciseTotal)
+            .where(
+                UserExerciseTotal.user_id == user_id,
+                UserExerciseTotal.exercise_id == exercise_id,
+            )
+            .values(sets=UserExerciseTotal.sets - sets)
+        )
+
+    await forget_prs(db, user_id, sessions)
+
+
+async def _refresh_week(db: AsyncSession, user_id: str, week: date) -> None:
+    start = datetime.combine(week, time(), tzinfo=timezone.utc)
+    result = await db.execute(
+        select(Session.finished_at).where(
+            Session.user_id == user_id,
+            Session.finished_at >= start,
+            Session.finished_at < start + timedelta(weeks=1),
+        )
+    )
+    mask = _week_masks(result.all()).get(week, 0)
+    key = (UserWeek.user_id == user_id, UserWeek.week_start == week)
+    if mask:
+        await db.execute(update(UserWeek).where(*key).values(days=mask))
+    else:
+        await db.execute(delete(UserWeek).where(*key))
+
+
+async def rebuild_rollups(db: AsyncSession, user_id: str | None = None) -> int:
+    """Recompute all rollups from the sessions table. Returns the number of users rebuilt."""
+    for table in (UserStats, UserWeek, UserExerciseTotal, PersonalRecord, SetLog):
+        wipe = delete(table)
+        if user_id is not None:
+            wipe = wipe.where(table.user_id == user_id)
+        await db.execute(wipe)
+
+    query = select(
+        Session.id, Session.user_id, Session.finished_at, Session.duration_minutes, Session.logs
+    ).order_by(Session.user_id, Session.finished_at)
+    if user_id is not None:
+        query = query.where(Session.user_id == user_id)
+
+    # Sessions arrive grouped by user, so only one user's history is held at a time.
+    users = 0
+    current: str | None = None
+    pending: list = []
+    rows = await db.stream(query.execution_options(yield_per=500))
+    async for row in rows:
+        if row.user_id != current:
+            if pending:
+                await record_sessions(db, current, pending)  # type: ignore[arg-type]
+                users += 1
+            current, pending = row.user_id, []
+        pending.append(row)
+    if pending:
+        await record_sessions(db, current, pending)  # type: ignore[arg-type]
+        users += 1
+
+    await db.commit()
+    return users
+
+
+async def _main() -> None:
+    from app.database import AsyncSessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild per-user analytics rollups.")
+    parser.add_argument("--user-id", default=None, help="only rebuild this user")
+    args = parser.parse_args()
+
+    async with AsyncSessionLocal() as db:
+        count = await rebuild_rollups(db, args.user_id)
+    print(f"[rollup] rebuilt rollups for {count} user(s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -1,115 +1,249 @@
 """
 Analytics endpoints.
 
-- GET /analytics/basic  — free: total workouts, sets, avg duration, streak
-- GET /analytics        — premium: all 5 chart datasets + stats
+- GET /analytics/prs    — free: personal record per exercise (`personal_records`)
+- GET /analytics/prs/{exercise_id} — free: one exercise's record, 404 if none
+- GET /analytics/basic  — free: total workouts, sets, avg duration, total minutes
+                          (single read of the `user_stats` rollup)
+- GET /analytics        — premium: all 5 chart datasets + stats, plus streak,
+                          favourite exercise and this week's goal progress
+                          (aggregated in PostgreSQL; columnar `engine` for other dialects)
+- GET /analytics/exercises/{exercise_id} — premium: per-session top weight, volume
+                          and e1RM for one exercise, downsampled to `max_points`
+
+All but the PR endpoints accept `range` (1W/1M/6M/1Y) or explicit `from`/`to` bounds on
+`finished_at`; windowed stats are computed from the window instead of the rollup.
+`range` starts at UTC midnight, so responses only change with the data or the
+date and carry a weak ETag (see `conditional_get`).
 """
-from fastapi import APIRouter
+from datetime import datetime, time, timedelta, timezone
+from typing import Annotated, Literal
 
-from app.dependencies import CurrentProfile, DbSession, PremiumProfile
-from app.models.session import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from starlette.concurrency import run_in_threadpool
+
+from app.dependencies import CurrentUser, PremiumProfile, ReadDbSession, conditional_get
+from app.models.personal_record import PersonalRecord
 from app.models.preference import UserPreference
+from app.models.session import Session
+from app.models.user_exercise_total import UserExerciseTotal
+from app.models.user_stats import UserStats
+from app.models.user_week import UserWeek
+from app.modules.analytics import engine, progression, queries
+from app.modules.analytics.queries import Window
+from app.modules.analytics.rollup import Totals, week_start
+from app.modules.analytics.schemas import PersonalRecordRead
+from app.modules.exercises.catalog import exercise_index
+from app.modules.sessions.set_logs import PostgresSetLogRepository
 from sqlalchemy import select
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
+ChartRange = Literal["1W", "1M", "6M", "1Y"]
+_RANGE_DAYS: dict[str, int] = {"1W": 7, "1M": 30, "6M": 180, "1Y": 365}
+_STREAK_WEEKS = 52
+ProgressionMetric = Literal["top_weight", "volume", "e1rm"]
+
+
+def _window(
+    range_: Annotated[ChartRange | None, Query(alias="range")] = None,
+    from_: Annotated[datetime | None, Query(alias="from")] = None,
+    to: datetime | None = None,
+) -> Window:
+    """Explicit `from` wins over `range`; naive datetimes are taken as UTC."""
+    if from_ is None and range_ is not None:
+        start = datetime.now(timezone.utc).date() - timedelta(days=_RANGE_DAYS[range_])
+        from_ = datetime.combine(start, time(), tzinfo=timezone.utc)
+    window = Window(start=_as_utc(from_), end=_as_utc(to))
+    if window.start is not None and window.end is not None and window.start > window.end:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="`from` must not be after `to`"
+        )
+    return window
+
+
+AnalyticsWindow = Annotated[Window, Depends(_window)]
+
 
-async def _fetch_sessions(user_id: str, db) -> list[Session]:
+def _as_utc(d: datetime | None) -> datetime | None:
+    if d is not None and d.tzinfo is None:
+        return d.replace(tzinfo=timezone.utc)
+    return d
+
+
+async def _fetch_sessions(user_id: str, db, window: Window = queries.ALL_TIME) -> list[Session]:
     result = await db.execute(
-        select(Session).where(Session.user_id == user_id).order_by(Session.finished_at)
+        window.apply(select(Session).where(Session.user_id == user_id)).order_by(
+            Session.finished_at
+        )
     )
     return list(result.scalars().all())
 
 
-@router.get("/basic")
-async def basic_analytics(profile: CurrentProfile, db: DbSession) -> dict:
-    sessions = await _fetch_sessions(profile.id, db)
-    total_sets = sum(
-        sum(len(sets) for sets in s.logs.values()) for s in sessions
-    )
-    durations = [s.duration_minutes for s in sessions if s.duration_minutes > 0]
-    avg_dur = round(sum(durations) / len(durations)) if durations else 0
+async def _totals(user_id: str, db, window: Window) -> Totals:
+    if not window.bounded:
+        stats = await db.get(UserStats, user_id)
+        if stats is None:
+            return Totals()
+        return Totals(**{col: getattr(stats, col) for col in Totals().values()})
+    if db.bind.dialect.name == "postgresql":
+        return Totals(**await queries.window_totals(db, user_id, window))
+    sessions = await _fetch_sessions(user_id, db, window)
+    return await run_in_threadpool(lambda: engine.totals(engine.flatten(sessions)))
+
+
+def _stats(totals: Totals) -> dict:
+    avg_dur = round(totals.timed_minutes / totals.timed_workouts) if totals.timed_workouts else 0
 
     return {
-        "total_workouts": len(sessions),
-        "total_sets": total_sets,
+        "total_workouts": totals.total_workouts,
+        "total_sets": totals.total_sets,
         "avg_duration": avg_dur,
-        "total_minutes": sum(s.duration_minutes for s in sessions),
+        "total_minutes": totals.total_minutes,
+    }
+
+
+@router.get("/basic", dependencies=[Depends(conditional_get(daily=True, read_only=True))])
+async def basic_analytics(
+    profile: CurrentUser, db: ReadDbSession, window: AnalyticsWindow
+) -> dict:
+    return _stats(await _totals(profile.id, db, window))
+
+
+@router.get(
+    "/prs",
+    response_model=list[PersonalRecordRead],
+    dependencies=[Depends(conditional_get(read_only=True))],
+)
+async def list_personal_records(profile: CurrentUser, db: ReadDbSession) -> list[PersonalRecordRead]:
+    result = await db.execute(
+        select(PersonalRecord)
+        .where(PersonalRecord.user_id == profile.id)
+        .order_by(PersonalRecord.exercise_id)
+    )
+    return list(result.scalars().all())  # type: ignore[arg-type]
+
+
+@router.get(
+    "/prs/{exercise_id}",
+    response_model=PersonalRecordRead,
+    dependencies=[Depends(conditional_get(read_only=True))],
+)
+async def get_personal_record(
+    exercise_id: str, profile: CurrentUser, db: ReadDbSession
+) -> PersonalRecordRead:
+    record = await db.get(PersonalRecord, (profile.id, exercise_id))
+    if record is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No record for this exercise")
+    return record  # type: ignore[return-value]
+
+
+@router.get(
+    "", dependencies=[Depends(conditional_get(premium=True, daily=True, read_only=True))]
+)
+async def full_analytics(
+    profile: PremiumProfile, db: ReadDbSession, window: AnalyticsWindow
+) -> dict:
+    index = await exercise_index(db, profile.id)
+    if db.bind.dialect.name == "postgresql":
+        charts = await _sql_charts(profile.id, db, window, index)
+        totals = await _totals(profile.id, db, window)
+    else:
+        sessions = await _fetch_sessions(profile.id, db, window)
+        cols = await run_in_threadpool(engine.flatten, sessions)
+        charts = await run_in_threadpool(engine.charts, cols, index)
+        totals = engine.totals(cols) if window.bounded else await _totals(profile.id, db, window)
+
+    return {"stats": {**_stats(totals), **await _goal_progress(profile.id, db)}, "charts": charts}
+
+
+@router.get(
+    "/exercises/{exercise_id}",
+    dependencies=[Depends(conditional_get(premium=True, daily=True, read_only=True))],
+)
+async def exercise_progression(
+    exercise_id: str,
+    profile: PremiumProfile,
+    db: ReadDbSession,
+    window: AnalyticsWindow,
+    max_points: Annotated[int, Query(ge=3, le=5000)] = 500,
+    metric: ProgressionMetric = "e1rm",
+) -> dict:
+    """`metric` is the series whose shape the downsampling preserves."""
+    sets = await PostgresSetLogRepository(db).exercise_history(
+        profile.id, exercise_id, window.start, window.end
+    )
+    points = progression.exercise_points(sets)
+    sampled = progression.lttb(
+        points,
+        max_points,
+        x=lambda p: p.date.timestamp(),
+        y=lambda p: getattr(p, metric),
+    )
+    return {
+        "exercise_id": exercise_id,
+        "total_points": len(points),
+        "points": [vars(p) for p in sampled],
     }
 
 
-@router.get("")
-async def full_analytics(profile: PremiumProfile, db: DbSession) -> dict:
-    sessions = await _fetch_sessions(profile.id, db)
-
-    # Volume data: {date, volume}
-    volume = [
-        {
-            "date": s.finished_at,
-            "volume": sum(
-                float(log["weight"]) * float(log["reps"])
-                for sets in s.logs.values()
-                for log in sets
-                if _is_numeric(log.get("weight")) and _is_numeric(log.get("reps"))
-            ),
-        }
-        for s in sessions
-    ]
-
-    # Duration data
-    duration = [{"date": s.finished_at, "minutes": s.duration_minutes} for s in sessions]
-
-    # Sets data
-    sets_data = [
-        {
-            "date": s.finished_at,
-            "sets": sum(len(v) for v in s.logs.values()),
-        }
-        for s in sessions
-    ]
-
-    # Muscle split
-    muscle_counts: dict[str, int] = {}
-    for s in sessions:
-        for sets in s.logs.values():
-            for log in sets:
-                muscle = log.get("muscle")
-                if muscle:
-                    muscle_counts[muscle] = muscle_counts.get(muscle, 0) + 1
-
-    # Frequency (sessions per week)
-    freq: dict[str, int] = {}
-    for s in sessions:
-        from datetime import date
-        d = date.fromisoformat(s.finished_at[:10])
-        iso = d.isocalendar()
-        week_key = f"{iso.year}-W{iso.week:02d}"
-        freq[week_key] = freq.get(week_key, 0) + 1
-
-    total_sets = sum(sum(len(v) for v in s.logs.values()) for s in sessions)
-    durations = [s.duration_minutes for s in sessions if s.duration_minutes > 0]
-    avg_dur = round(sum(durations) / len(durations)) if durations else 0
+async def _goal_progress(user_id: str, db) -> dict:
+    """Streak, favourite exercise and this week's training days from the rollups."""
+    weekly_goal = await db.scalar(
+        select(UserPreference.weekly_goal).where(UserPreference.user_id == user_id)
+    )
+    if weekly_goal is None:  # no preferences row yet: the column default
+        weekly_goal = 4
+    this_week = week_start(datetime.now(timezone.utc).date())
+
+    result = await db.execute(
+        select(UserWeek.week_start, UserWeek.days).where(
+            UserWeek.user_id == user_id,
+            UserWeek.week_start > this_week - timedelta(weeks=_STREAK_WEEKS),
+        )
+    )
+    days = {r.week_start: r.days.bit_count() for r in result.all()}
+
+    # Consecutive weeks meeting the goal; the current week may still be in progress.
+    streak = 0
+    for i in range(_STREAK_WEEKS):
+        if days.get(this_week - timedelta(weeks=i), 0) >= weekly_goal:
+            streak += 1
+        elif i > 0:
+            break
+
+    fav_exercise_id = await db.scalar(
+        select(UserExerciseTotal.exercise_id)
+        .where(UserExerciseTotal.user_id == user_id, UserExerciseTotal.sets > 0)
+        .order_by(UserExerciseTotal.sets.desc(), UserExerciseTotal.exercise_id)
+        .limit(1)
+    )
 
     return {
-        "stats": {
-            "total_workouts": len(sessions),
-            "total_sets": total_sets,
-            "avg_duration": avg_dur,
-            "total_minutes": sum(s.duration_minutes for s in sessions),
-        },
-        "charts": {
-            "volume": volume,
-            "duration": duration,
-            "sets": sets_data,
-            "muscle_split": [{"muscle": k, "sets": v} for k, v in muscle_counts.items()],
-            "frequency": [{"week": k, "count": v} for k, v in sorted(freq.items())],
-        },
+        "streak": streak,
+        "fav_exercise_id": fav_exercise_id,
+        "this_week_unique_days": days.get(this_week, 0),
+        "weekly_goal": weekly_goal,
     }
 
 
-def _is_numeric(v: object) -> bool:
-    try:
-        float(v)  # type: ignore[arg-type]
-        return True
-    except (TypeError, ValueError):
-        return False
+async def _sql_charts(user_id: str, db, window: Window, index) -> dict:
+    points = await queries.session_points(db, user_id, window)
+    if window.bounded:
+        exercise_sets = await queries.exercise_sets(db, user_id, window)
+    else:
+        result = await db.execute(
+            select(UserExerciseTotal.exercise_id, UserExerciseTotal.sets).where(
+                UserExerciseTotal.user_id == user_id
+            )
+        )
+        exercise_sets = result.all()
+    return {
+        "volume": [{"date": p.finished_at, "volume": p.volume} for p in points],
+        "duration": [{"date": p.finished_at, "minutes": p.duration_minutes} for p in points],
+        "sets": [{"date": p.finished_at, "sets": p.sets} for p in points],
+        "muscle_split": engine.muscle_split(exercise_sets, index),
+        "frequency": [
+            {"week": r.week, "count": r.count} for r in await queries.weekly_frequency(db, user_id, window)
+        ],
+    }
@@ -0,0 +1,14 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class PersonalRecordRead(BaseModel):
+    exercise_id: str
+    weight: float
+    reps: int
+    e1rm: float
+    session_id: str | None
+    achieved_at: datetime
+
+    model_config = {"from_attributes": True}
@@ -1,14 +1,19 @@
 """
 Auth module — handles anonymous → registered migration.
 """
+from datetime import datetime
+
 from fastapi import APIRouter
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
-from app.dependencies import CurrentProfile, DbSession
+from app.cache import repository_cache
+from app.dependencies import CurrentUser, DbSession
 from app.models.exercise import CustomExercise
 from app.models.preference import UserPreference
 from app.models.routine import Routine
 from app.models.session import Session
+from app.modules.analytics.rollup import record_sessions
+from app.versioning import bump_data_version
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -19,17 +24,46 @@ class SetLogItem(BaseModel):
     isPR: bool | None = None
 
 
+# localStorage shapes (packages/shared/src/types), camelCase as the client stores them
+
+
+class MigrateRoutine(BaseModel):
+    name: str = Field(default="", max_length=255)
+    exercises: list[str] = Field(default_factory=list)
+
+
+class MigrateSession(BaseModel):
+    date: datetime
+    routineName: str = Field(default="", max_length=255)
+    duration: int = Field(default=0, ge=0)
+    logs: dict[str, list[SetLogItem]] = Field(default_factory=dict)
+
+
+class MigrateExercise(BaseModel):
+    id: str | None = Field(default=None, max_length=100)
+    name: str = Field(default="", max_length=255)
+    muscle: str = Field(default="", max_length=50)
+
+
+class MigratePreferences(BaseModel):
+    weeklyGoal: int = Field(default=4, ge=1, le=7)
+    lang: str = Field(default="es", pattern="^(es|en|fr)$")
+    restTimerDefault: int = 90
+    theme: str = "dark"
+    exerciseButtons: dict = Field(default_factory=dict)
+
+
 class MigratePayload(BaseModel):
-    routines: list[dict]
-    sessions: list[dict]
-    custom_exercises: list[dict]
-    preferences: dict | None = None
+    routines: list[MigrateRoutine]
+    sessions: list[MigrateSession]
+    custom_exercises: list[MigrateExercise]
+    preferences: MigratePreferences | None = None
 
 
 @router.post("/migrate")
 async def migrate_anonymous_data(
     body: MigratePayload,
-    profile: CurrentProfile,
+    profile: CurrentUser,
     db: DbSession,
 ) -> dict:
     """
@@ -40,12 +74,15 @@ async def migrate_anonymous_data(
     routines_added = 0
     sessions_added = 0
     exercises_added = 0
+    new_sessions: list[Session] = []
+    version = await bump_data_version(db, profile.id)
 
     for r in body.routines:
         routine = Routine(
             user_id=profile.id,
-            name=r.get("name", ""),
-            exercises=r.get("exercises", []),
+            name=r.name,
+            exercises=r.exercises,
+            data_version=version,
         )
         db.add(routine)
         routines_added += 1
@@ -53,21 +90,24 @@ async def migrate_anonymous_data(
     for s in body.sessions:
         session = Session(
             user_id=profile.id,
-            routine_name=s.get("routineName", ""),
-            started_at=s.get("date", ""),
-            finished_at=s.get("date", ""),
-            duration_minutes=s.get("duration", 0),
-            logs=s.get("logs", {}),
+            routine_name=s.routineName,
+            started_at=s.date,
+            finished_at=s.date,
+            duration_minutes=s.duration,
+            logs={k: [item.model_dump(exclude_none=True) for item in v] for k, v in s.logs.items()},
+            data_version=version,
         )
         db.add(session)
+        new_sessions.append(session)
         sessions_added += 1
 
     for e in body.custom_exercises:
         ex = CustomExercise(
-            id=e.get("id", f"custom_{id(e)}"),
+            id=e.id or f"custom_{id(e)}",
             user_id=profile.id,
-            name=e.get("name", ""),
-            muscle=e.get("muscle", ""),
+            name=e.name,
+            muscle=e.muscle,
+            data_version=version,
         )
         db.add(ex)
         exercises_added += 1
@@ -75,15 +115,19 @@ async def migrate_anonymous_data(
     if body.preferences:
         prefs = UserPreference(
             user_id=profile.id,
-            weekly_goal=body.preferences.get("weeklyGoal", 4),
-            lang=body.preferences.get("lang", "es"),
-            rest_timer_default=body.preferences.get("restTimerDefault", 90),
-            theme=body.preferences.get("theme", "dark"),
-            exercise_buttons=body.preferences.get("exerciseButtons", {}),
+            weekly_goal=body.preferences.weeklyGoal,
+            lang=body.preferences.lang,
+            rest_timer_default=body.preferences.restTimerDefault,
+            theme=body.preferences.theme,
+            exercise_buttons=body.preferences.exerciseButtons,
+            data_version=version,
         )
         db.add(prefs)
 
+    await db.flush()
+    await record_sessions(db, profile.id, new_sessions)
     await db.commit()
+    repository_cache.invalidate(profile.id)
 
     return {
         "migrated": {
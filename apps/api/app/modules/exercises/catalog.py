@@ -0,0 +1,113 @@
+"""
+Built-in exercise catalog, mirrored from `packages/shared/src/constants/exercises.ts`.
+
+The API image only contains `apps/api`, so the catalog ships as `catalog.json`
+and is loaded once at import into a read-only id → entry index. Regenerate it
+after editing the TypeScript catalog:
+
+    python -m app.modules.exercises.catalog ../../packages/shared/src/constants/exercises.ts
+
+`exercise_index` merges the catalog with a user's `CustomExercise` rows; the
+per-user part is cached and keyed on the user's data version, so exercise
+writes on any worker invalidate it.
+"""
+import json
+import re
+import sys
+from collections import ChainMap, OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.exercise import CustomExercise
+from app.versioning import get_data_version
+
+_CATALOG_PATH = Path(__file__).with_name("catalog.json")
+_CACHE_SIZE = 1024
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    id: str
+    name: str
+    muscle: str
+    secondary: tuple[str, ...] = ()
+
+
+def _load(path: Path = _CATALOG_PATH) -> Mapping[str, CatalogEntry]:
+    entries = json.loads(path.read_text())
+    return MappingProxyType(
+        {e["id"]: CatalogEntry(e["id"], e["name"], e["muscle"], tuple(e["secondary"])) for e in entries}
+    )
+
+
+CATALOG: Mapping[str, CatalogEntry] = _load()
+
+# user_id → (data version, custom exercises), least recently used first
+_custom_cache: OrderedDict[str, tuple[int, Mapping[str, CatalogEntry]]] = OrderedDict()
+
+
+async def exercise_index(db: AsyncSession, user_id: str) -> Mapping[str, CatalogEntry]:
+    """The catalog plus the user's custom exercises (custom ids take precedence)."""
+    version = await get_data_version(db, user_id)
+    cached = _custom_cache.get(user_id)
+    if cached is not None and cached[0] == version:
+        _custom_cache.move_to_end(user_id)
+        custom = cached[1]
+    else:
+        result = await db.execute(
+            select(CustomExercise.id, CustomExercise.name, CustomExercise.muscle).where(
+                CustomExercise.user_id == user_id
+            )
+        )
+        custom = MappingProxyType({r.id: CatalogEntry(r.id, r.name, r.muscle) for r in result.all()})
+        _custom_cache[user_id] = (version, custom)
+        _custom_cache.move_to_end(user_id)
+        while len(_custom_cache) > _CACHE_SIZE:
+            _custom_cache.popitem(last=False)
+    return ChainMap(custom, CATALOG)  # type: ignore[arg-type]
+
+
+def clear_exercise_cache() -> None:
+    _custom_cache.clear()
+
+
+# ── Generation from the TypeScript source ─────────────────────────────────────
+
+_TS_ENTRY = re.compile(
+    r"\{\s*id:\s*'(?P<id>[^']+)',\s*name:\s*(?P<q>['\"])(?P<name>.*?)(?P=q),\s*"
+    r"muscle:\s*'(?P<muscle>[^']+)'\s*\}"
+)
+_TS_SECONDARY = re.compile(r"(\w+):\s*'([^']*)'")
+
+
+def parse_ts(source: str) -> list[dict]:
+    """Extract `EXERCISE_CATALOG` and `SECONDARY_MUSCLES` from exercises.ts."""
+    catalog_src, _, secondary_src = source.partition("SECONDARY_MUSCLES")
+    secondary = {
+        ex: [m for m in muscles.split(",") if m] for ex, muscles in _TS_SECONDARY.findall(secondary_src)
+    }
+    return [
+        {
+            "id": m["id"],
+            "name": m["name"],
+            "muscle": m["muscle"],
+            "secondary": secondary.get(m["id"], []),
+        }
+        for m in _TS_ENTRY.finditer(catalog_src)
+    ]
+
+
+def _main() -> None:
+    entries = parse_ts(Path(sys.argv[1]).read_text())
+    lines = ",\n".join(json.dumps(e, ensure_ascii=False) for e in entries)
+    _CATALOG_PATH.write_text(f"[\n{lines}\n]\n")
+    print(f"[catalog] wrote {len(entries)} exercises to {_CATALOG_PATH}")
+
+
+if __name__ == "__main__":
+    _main()
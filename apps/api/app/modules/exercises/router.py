@@ -1,15 +1,18 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
 
-from app.dependencies import CurrentProfile, DbSession
+from app.dependencies import CurrentUser, DbSession, conditional_get
 from app.models.exercise import CustomExercise
 from app.modules.exercises.schemas import ExerciseCreate, ExerciseRead, ExerciseUpdate
+from app.versioning import bump_data_version, record_tombstones
 from sqlalchemy import delete, select
 
 router = APIRouter(prefix="/exercises", tags=["exercises"])
 
 
-@router.get("", response_model=list[ExerciseRead])
-async def list_exercises(profile: CurrentProfile, db: DbSession) -> list[ExerciseRead]:
+@router.get(
+    "", response_model=list[ExerciseRead], dependencies=[Depends(conditional_get())]
+)
+async def list_exercises(profile: CurrentUser, db: DbSession) -> list[ExerciseRead]:
     result = await db.execute(
         select(CustomExercise).where(CustomExercise.user_id == profile.id)
     )
@@ -18,9 +21,10 @@ async def list_exercises(profile: CurrentProfile, db: DbSession) -> list[Exercis
 
 @router.post("", response_model=ExerciseRead, status_code=201)
 async def create_exercise(
-    body: ExerciseCreate, profile: CurrentProfile, db: DbSession
+    body: ExerciseCreate, profile: CurrentUser, db: DbSession
 ) -> ExerciseRead:
     ex = CustomExercise(id=body.id, user_id=profile.id, name=body.name, muscle=body.muscle)
+    ex.data_version = await bump_data_version(db, profile.id)
     db.add(ex)
     await db.commit()
     await db.refresh(ex)
@@ -29,7 +33,7 @@ async def create_exercise(
 
 @router.put("/{exercise_id}", response_model=ExerciseRead)
 async def update_exercise(
-    exercise_id: str, body: ExerciseUpdate, profile: CurrentProfile, db: DbSession
+    exercise_id: str, body: ExerciseUpdate, profile: CurrentUser, db: DbSession
 ) -> ExerciseRead:
     result = await db.execute(
         select(CustomExercise).where(
@@ -43,6 +47,7 @@ async def update_exercise(
         ex.name = body.name
     if body.muscle is not None:
         ex.muscle = body.muscle
+    ex.data_version = await bump_data_version(db, profile.id)
     await db.commit()
     await db.refresh(ex)
     return ex  # type: ignore[return-value]
@@ -50,13 +55,16 @@ async def update_exercise(
 
 @router.delete("/{exercise_id}", status_code=204)
 async def delete_exercise(
-    exercise_id: str, profile: CurrentProfile, db: DbSession
+    exercise_id: str, profile: CurrentUser, db: DbSession
 ) -> None:
     result = await db.execute(
         delete(CustomExercise).where(
             CustomExercise.id == exercise_id, CustomExercise.user_id == profile.id
         )
     )
+    if result.rowcount > 0:
+        version = await bump_data_version(db, profile.id)
+        await record_tombstones(db, profile.id, "exercise", [exercise_id], version)
     await db.commit()
     if result.rowcount == 0:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exercise not found")
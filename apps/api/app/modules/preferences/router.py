@@ -1,15 +1,18 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
 
-from app.dependencies import CurrentProfile, DbSession
+from app.dependencies import CurrentUser, DbSession, conditional_get
 from app.models.preference import UserPreference
 from app.modules.preferences.schemas import PreferencesRead, PreferencesUpdate
+from app.versioning import bump_data_version
 from sqlalchemy import select
 
 router = APIRouter(prefix="/preferences", tags=["preferences"])
 
 
-@router.get("", response_model=PreferencesRead)
-async def get_preferences(profile: CurrentProfile, db: DbSession) -> PreferencesRead:
+@router.get(
+    "", response_model=PreferencesRead, dependencies=[Depends(conditional_get())]
+)
+async def get_preferences(profile: CurrentUser, db: DbSession) -> PreferencesRead:
     result = await db.execute(
         select(UserPreference).where(UserPreference.user_id == profile.id)
     )
@@ -24,7 +27,7 @@ async def get_preferences(profile: CurrentProfile, db: DbSession) -> Preferences
 
 @router.put("", response_model=PreferencesRead)
 async def update_preferences(
-    body: PreferencesUpdate, profile: CurrentProfile, db: DbSession
+    body: PreferencesUpdate, profile: CurrentUser, db: DbSession
 ) -> PreferencesRead:
     result = await db.execute(
         select(UserPreference).where(UserPreference.user_id == profile.id)
@@ -57,6 +60,7 @@ async def update_preferences(
             current["workoutView"] = body.exercise_buttons.workoutView
         prefs.exercise_buttons = current
 
+    prefs.data_version = await bump_data_version(db, profile.id)
     await db.commit()
     await db.refresh(prefs)
     return prefs  # type: ignore[return-value]
@@ -1,10 +1,10 @@
 from fastapi import APIRouter
 
-from app.dependencies import CurrentProfile
+from app.dependencies import CurrentUser
 
 router = APIRouter(prefix="/profile", tags=["profile"])
 
 
 @router.get("")
-async def get_profile(profile: CurrentProfile) -> dict:
+async def get_profile(profile: CurrentUser) -> dict:
     return {"plan": profile.plan, "is_admin": profile.is_admin}
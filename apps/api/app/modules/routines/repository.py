@@ -1,9 +1,15 @@
 from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+from uuid import uuid4
 
-from sqlalchemy import delete, select
+from sqlalchemy import Integer, case, column, delete, func, select, update, values
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache import UserCache, columns_of, repository_cache
 from app.models.routine import Routine
+from app.models.session import Session
+from app.versioning import bump_data_version, record_tombstones
 
 
 class RoutineRepository(ABC):
@@ -27,6 +33,9 @@ class RoutineRepository(ABC):
     @abstractmethod
     async def delete(self, routine_id: str, user_id: str) -> bool: ...
 
+    @abstractmethod
+    async def reorder(self, user_id: str, routine_ids: "list[str]") -> bool: ...
+
 
 class PostgresRoutineRepository(RoutineRepository):
     def __init__(self, db: AsyncSession) -> None:
@@ -55,21 +64,171 @@ class PostgresRoutineRepository(RoutineRepository):
         return len(result.scalars().all())
 
     async def create(self, routine: Routine) -> Routine:
+        routine.data_version = await bump_data_version(self._db, routine.user_id)
         self._db.add(routine)
         await self._db.commit()
         await self._db.refresh(routine)
         return routine
 
     async def update(self, routine: Routine) -> Routine:
+        routine.data_version = await bump_data_version(self._db, routine.user_id)
         await self._db.commit()
         await self._db.refresh(routine)
         return routine
 
     async def delete(self, routine_id: str, user_id: str) -> bool:
+        version = await bump_data_version(self._db, user_id)
+        # Unlink the routine's sessions here rather than through the FK's
+        # ON DELETE SET NULL, so the change is stamped for delta sync.
+        await self._db.execute(
+            update(Session)
+            .where(Session.user_id == user_id, Session.routine_id == routine_id)
+            .values(routine_id=None, data_version=version)
+        )
         result = await self._db.execute(
             delete(Routine).where(
                 Routine.id == routine_id, Routine.user_id == user_id
             )
         )
+        if result.rowcount == 0:
+            await self._db.rollback()
+            return False
+        await record_tombstones(self._db, user_id, "routine", [routine_id], version)
+        await self._db.commit()
+        return True
+
+    async def reorder(self, user_id: str, routine_ids: "list[str]") -> bool:
+        """Set `position` to each routine's index in `routine_ids` in one UPDATE.
+        False (and nothing changed) unless the user owns every routine."""
+        version = await bump_data_version(self._db, user_id)
+        stamp = {"data_version": version, "updated_at": func.now()}
+        if self._db.bind.dialect.name == "postgresql":
+            order = values(
+                column("id", Routine.id.type), column("position", Integer), name="new_order"
+            ).data([(routine_id, i) for i, routine_id in enumerate(routine_ids)])
+            stmt = (
+                update(Routine)
+                .where(Routine.id == order.c.id, Routine.user_id == user_id)
+                .values(position=order.c.position, **stamp)
+            )
+        else:
+            stmt = (
+                update(Routine)
+                .where(Routine.id.in_(routine_ids), Routine.user_id == user_id)
+                .values(
+                    position=case(
+                        *((Routine.id == routine_id, i) for i, routine_id in enumerate(routine_ids))
+                    ),
+                    **stamp,
+                )
+            )
+        result = await self._db.execute(stmt.execution_options(synchronize_session=False))
+        if result.rowcount != len(routine_ids):
+            await self._db.rollback()
+            return False
         await self._db.commit()
-        return result.rowcount > 0
+        return True
+
+
+class CachedRoutineRepository(RoutineRepository):
+    """Read-through cache around any backend: `list` and `count` are served
+    from the per-user cache, writes go to the backend and invalidate it. With
+    `version`, entries are also dropped once the user's data version moves (a
+    write made through another worker). `get` is not cached — its result is
+    what the service mutates and saves."""
+
+    def __init__(
+        self,
+        backend: RoutineRepository,
+        cache: UserCache = repository_cache,
+        version: Callable[[str], Awaitable[int]] | None = None,
+    ) -> None:
+        self._backend = backend
+        self._cache = cache
+        # The user's data version (app.versioning): keys the cache across workers
+        self._version = version
+
+    async def list(self, user_id: str) -> list[Routine]:
+        async def load() -> list[dict]:
+            return [columns_of(r) for r in await self._backend.list(user_id)]
+
+        version = await self._version(user_id) if self._version else None
+        rows = await self._cache.get_or_load(user_id, "routines", load, version)
+        return [Routine(**row) for row in rows]
+
+    async def get(self, routine_id: str, user_id: str) -> Routine | None:
+        return await self._backend.get(routine_id, user_id)
+
+    async def count(self, user_id: str) -> int:
+        return len(await self.list(user_id))
+
+    async def create(self, routine: Routine) -> Routine:
+        try:
+            return await self._backend.create(routine)
+        finally:
+            self._cache.invalidate(routine.user_id)
+
+    async def update(self, routine: Routine) -> Routine:
+        try:
+            return await self._backend.update(routine)
+        finally:
+            self._cache.invalidate(routine.user_id)
+
+    async def delete(self, routine_id: str, user_id: str) -> bool:
+        try:
+            return await self._backend.delete(routine_id, user_id)
+        finally:
+            self._cache.invalidate(user_id)
+
+    async def reorder(self, user_id: str, routine_ids: "list[str]") -> bool:
+        try:
+            return await self._backend.reorder(user_id, routine_ids)
+        finally:
+            self._cache.invalidate(user_id)
+
+
+class InMemoryRoutineRepository(RoutineRepository):
+    """Dict-backed storage for tests and single-node experiments (nothing persists)."""
+
+    def __init__(self) -> None:
+        self._routines: dict[str, Routine] = {}
+
+    async def list(self, user_id: str) -> list[Routine]:
+        return sorted(
+            (r for r in self._routines.values() if r.user_id == user_id),
+            key=lambda r: (r.position, r.created_at),
+        )
+
+    async def get(self, routine_id: str, user_id: str) -> Routine | None:
+        routine = self._routines.get(routine_id)
+        return routine if routine is not None and routine.user_id == user_id else None
+
+    async def count(self, user_id: str) -> int:
+        return len(await self.list(user_id))
+
+    async def create(self, routine: Routine) -> Routine:
+        now = datetime.now(timezone.utc)
+        routine.id = routine.id or str(uuid4())
+        routine.position = routine.position or 0
+        routine.created_at = routine.updated_at = now
+        self._routines[routine.id] = routine
+        return routine
+
+    async def update(self, routine: Routine) -> Routine:
+        routine.updated_at = datetime.now(timezone.utc)
+        self._routines[routine.id] = routine
+        return routine
+
+    async def delete(self, routine_id: str, user_id: str) -> bool:
+        if await self.get(routine_id, user_id) is None:
+            return False
+        del self._routines[routine_id]
+        return True
+
+    async def reorder(self, user_id: str, routine_ids: "list[str]") -> bool:
+        routines = [await self.get(routine_id, user_id) for routine_id in routine_ids]
+        if any(r is None for r in routines):
+            return False
+        for position, routine in enumerate(routines):
+            routine.position = position  # type: ignore[union-attr]
+        return True
@@ -1,23 +1,41 @@
+from functools import partial
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.dependencies import CurrentProfile, DbSession
-from app.modules.routines.repository import PostgresRoutineRepository
-from app.modules.routines.schemas import RoutineCreate, RoutineRead, RoutineUpdate
+from app.dependencies import CurrentUser, DbSession, conditional_get
+from app.modules.routines.repository import CachedRoutineRepository, PostgresRoutineRepository
+from app.modules.routines.schemas import (
+    RoutineCreate,
+    RoutineOrder,
+    RoutineRead,
+    RoutineShare,
+    RoutineUpdate,
+    SharedRoutineRead,
+)
 from app.modules.routines.service import RoutineService
+from app.modules.routines.sharing import get_shared_routine, share_routine
+from app.versioning import etag_matches, get_data_version
 
 router = APIRouter(prefix="/routines", tags=["routines"])
+shared_router = APIRouter(prefix="/shared", tags=["routines"])
+
+# Snapshots never change, so any cache may keep them for a year
+_IMMUTABLE = "public, max-age=31536000, immutable"
 
 
 def _get_service(db: DbSession) -> RoutineService:
-    return RoutineService(PostgresRoutineRepository(db))
+    return RoutineService(
+        CachedRoutineRepository(PostgresRoutineRepository(db), version=partial(get_data_version, db))
+    )
 
 
-@router.get("", response_model=list[RoutineRead])
+@router.get(
+    "", response_model=list[RoutineRead], dependencies=[Depends(conditional_get())]
+)
 async def list_routines(
-    profile: CurrentProfile,
+    profile: CurrentUser,
     service: RoutineService = Depends(_get_service),
 ) -> list[RoutineRead]:
     return await service.list_routines(profile.id)  # type: ignore[return-value]
@@ -26,18 +44,28 @@ async def list_routines(
 @router.post("", response_model=RoutineRead, status_code=201)
 async def create_routine(
     body: RoutineCreate,
-    profile: CurrentProfile,
+    profile: CurrentUser,
     service: RoutineService = Depends(_get_service),
 ) -> RoutineRead:
     routine = await service.create_routine(profile.id, body, profile.plan == "premium")
     return routine  # type: ignore[return-value]
 
 
+@router.put("/order", status_code=204)
+async def reorder_routines(
+    body: RoutineOrder,
+    profile: CurrentUser,
+    service: RoutineService = Depends(_get_service),
+) -> None:
+    """Drag-and-drop reorder: positions follow the order of `routine_ids`."""
+    await service.reorder_routines(profile.id, [str(rid) for rid in body.routine_ids])
+
+
 @router.put("/{routine_id}", response_model=RoutineRead)
 async def update_routine(
     routine_id: str,
     body: RoutineUpdate,
-    profile: CurrentProfile,
+    profile: CurrentUser,
     service: RoutineService = Depends(_get_service),
 ) -> RoutineRead:
     return await service.update_routine(routine_id, profile.id, body)  # type: ignore[return-value]
@@ -46,7 +74,46 @@ async def update_routine(
 @router.delete("/{routine_id}", status_code=204)
 async def delete_routine(
     routine_id: str,
-    profile: CurrentProfile,
+    profile: CurrentUser,
     service: RoutineService = Depends(_get_service),
 ) -> None:
     await service.delete_routine(routine_id, profile.id)
+
+
+@router.post("/{routine_id}/share", response_model=RoutineShare)
+async def share(
+    routine_id: str,
+    response: Response,
+    profile: CurrentUser,
+    db: DbSession,
+    service: RoutineService = Depends(_get_service),
+) -> RoutineShare:
+    """Snapshot the routine for QR sharing. 201 for a new snapshot, 200 when
+    identical content was already shared (by anyone)."""
+    routine = await service.get_routine(routine_id, profile.id)
+    digest, created = await share_routine(db, routine)
+    response.status_code = status.HTTP_201_CREATED if created else status.HTTP_200_OK
+    return RoutineShare(hash=digest, path=f"{shared_router.prefix}/{digest}")
+
+
+@shared_router.get("/{digest}", response_model=SharedRoutineRead)
+async def get_shared(
+    response: Response,
+    db: DbSession,
+    digest: Annotated[str, Path(pattern="^[0-9a-f]{64}$")],
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> SharedRoutineRead:
+    """Public: no auth, so HTTP caches and CDNs can serve repeat imports."""
+    # Looked up first: `If-None-Match: *` (or a guessed tag) only matches a snapshot that exists
+    snapshot = await get_shared_routine(db, digest)
+    if snapshot is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Shared routine not found")
+    etag = f'"{digest}"'
+    if etag_matches(if_none_match, etag):
+        raise HTTPException(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": _IMMUTABLE},
+        )
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = _IMMUTABLE
+    return snapshot  # type: ignore[return-value]
@@ -1,6 +1,7 @@
 from datetime import datetime
+from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 class RoutineCreate(BaseModel):
@@ -24,3 +25,30 @@ class RoutineRead(BaseModel):
     updated_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class RoutineOrder(BaseModel):
+    # Routine ids in their new order; positions become 0..n-1. Typed as UUIDs so
+    # a malformed id is a 422 here rather than a cast error in the UPDATE.
+    routine_ids: list[UUID] = Field(..., min_length=1, max_length=500)
+
+    @field_validator("routine_ids")
+    @classmethod
+    def _unique(cls, v: list[UUID]) -> list[UUID]:
+        if len(set(v)) != len(v):
+            raise ValueError("routine ids must be unique")
+        return v
+
+
+class RoutineShare(BaseModel):
+    hash: str
+    # Path of the public snapshot, for the QR code
+    path: str
+
+
+class SharedRoutineRead(BaseModel):
+    hash: str
+    name: str
+    exercises: list[str]
+
+    model_config = {"from_attributes": True}
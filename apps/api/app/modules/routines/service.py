@@ -53,3 +53,7 @@ class RoutineService:
         deleted = await self._repo.delete(routine_id, user_id)
         if not deleted:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Routine not found")
+
+    async def reorder_routines(self, user_id: str, routine_ids: list[str]) -> None:
+        if not await self._repo.reorder(user_id, routine_ids):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Routine not found")
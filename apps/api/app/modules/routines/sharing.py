@@ -0,0 +1,50 @@
+"""
+Content-addressed routine snapshots for QR share / import.
+
+A snapshot is keyed by the SHA-256 of its canonical JSON (sorted keys, no
+whitespace, UTF-8), so sharing the same routine twice — or two users sharing
+identical routines — yields the same hash and a single row. Snapshots are
+never updated: editing a routine and sharing it again produces a new hash,
+which is what lets GET /shared/{hash} be cached forever.
+"""
+import hashlib
+import json
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import dialect_insert
+from app.models.routine import Routine
+from app.models.shared_routine import SharedRoutine
+
+# Bump if the canonical form changes, so old and new hashes never collide
+SNAPSHOT_VERSION = 1
+
+
+def content_hash(name: str, exercises: list[str]) -> str:
+    canonical = json.dumps(
+        {"v": SNAPSHOT_VERSION, "name": name, "exercises": exercises},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+async def share_routine(db: AsyncSession, routine: Routine) -> tuple[str, bool]:
+    """Snapshot `routine`; returns (hash, whether this call created the snapshot)."""
+    digest = content_hash(routine.name, list(routine.exercises))
+    result = await db.execute(
+        dialect_insert(db)(SharedRoutine)
+        .values(hash=digest, name=routine.name, exercises=list(routine.exercises))
+        .on_conflict_do_nothing(index_elements=[SharedRoutine.hash])
+        .returning(SharedRoutine.hash)
+    )
+    created = result.scalar_one_or_none() is not None
+    await db.commit()
+    return digest, created
+
+
+async def get_shared_routine(db: AsyncSession, digest: str) -> SharedRoutine | None:
+    result = await db.execute(select(SharedRoutine).where(SharedRoutine.hash == digest))
+    return result.scalar_one_or_none()
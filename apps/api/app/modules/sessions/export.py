@@ -0,0 +1,94 @@
+"""
+Full-history export for GET /sessions/export.
+
+Sessions are read through a server-side cursor (`AsyncSession.stream` with
+`yield_per`) and encoded one partition at a time, so memory stays bounded by
+the partition size whatever the length of the user's history.
+
+- ndjson — one `SessionRead` JSON object per line
+- csv    — one row per logged set; sessions without sets get a single row with
+           empty set columns
+"""
+import csv
+import io
+from collections.abc import AsyncIterator
+from typing import Literal
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.session import Session
+from app.modules.sessions.schemas import SessionRead
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES: dict[str, str] = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+CSV_COLUMNS = [
+    "session_id",
+    "routine_id",
+    "routine_name",
+    "started_at",
+    "finished_at",
+    "duration_minutes",
+    "exercise_id",
+    "set_index",
+    "weight",
+    "reps",
+    "is_pr",
+]
+_BATCH = 500
+
+
+async def export_sessions(db: AsyncSession, user_id: str, fmt: ExportFormat) -> AsyncIterator[bytes]:
+    """Encoded chunks of the user's sessions, oldest first. Closes `db` when done."""
+    encode = _ndjson if fmt == "ndjson" else _csv
+    try:
+        if fmt == "csv":
+            yield (",".join(CSV_COLUMNS) + "\r\n").encode()
+        result = await db.stream(
+            select(
+                Session.id,
+                Session.routine_id,
+                Session.routine_name,
+                Session.started_at,
+                Session.finished_at,
+                Session.duration_minutes,
+                Session.logs,
+            )
+            .where(Session.user_id == user_id)
+            .order_by(Session.finished_at, Session.id)  # ix_sessions_user_id_finished_at_id
+            .execution_options(yield_per=_BATCH)
+        )
+        async for rows in result.partitions():
+            yield encode(rows)
+    finally:
+        # The response outlives the request's dependencies, so the stream owns the session.
+        await db.close()
+
+
+def _ndjson(rows) -> bytes:
+    return b"".join(
+        SessionRead.model_validate(row, from_attributes=True).model_dump_json().encode() + b"\n"
+        for row in rows
+    )
+
+
+def _csv(rows) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        session = [
+            row.id,
+            row.routine_id or "",
+            row.routine_name,
+            row.started_at.isoformat(),
+            row.finished_at.isoformat(),
+            row.duration_minutes,
+        ]
+        sets = [
+            [exercise_id, i, log.get("weight", ""), log.get("reps", ""), bool(log.get("isPR"))]
+            for exercise_id, logs in (row.logs or {}).items()
+            for i, log in enumerate(logs)
+        ]
+        writer.writerows([session + s for s in sets] or [session + [""] * 5])
+    return buffer.getvalue().encode()
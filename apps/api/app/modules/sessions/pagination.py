@@ -0,0 +1,32 @@
+"""
+Opaque keyset cursors for GET /sessions, ordered by (finished_at desc, id desc).
+"""
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+
+from fastapi import HTTPException, status
+
+
+@dataclass(frozen=True)
+class SessionCursor:
+    """Position after the last row of a page."""
+
+    finished_at: datetime
+    id: str
+
+    def encode(self) -> str:
+        raw = json.dumps([self.finished_at.isoformat(), self.id]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "SessionCursor":
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            finished_at, session_id = json.loads(raw)
+            return cls(datetime.fromisoformat(finished_at), str(session_id))
+        except (ValueError, TypeError) as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            ) from exc
@@ -0,0 +1,140 @@
+"""
+Monthly range partitions of `sessions` on `finished_at` (PostgreSQL only).
+
+Migration 0011 splits the table into one `sessions_pYYYYMM` partition per UTC
+month, from the oldest session to `MONTHS_AHEAD` months ahead, plus
+`sessions_default` for anything outside them (sessions backdated before the
+first month, or dated past the last one). Queries bounded on `finished_at` —
+analytics windows, the platform aggregates' day refreshes — are pruned to the
+matching partitions; the others use each partition's copy of the indexes.
+
+`ensure_partitions` keeps the months ahead created, moving any rows the default
+partition already holds for them. It runs at deploy (start.sh, after the
+migrations) and daily in each worker (app.maintenance).
+
+`detach_partitions` archives whole months before a cutoff: the detached tables
+keep their rows (dump them with `pg_dump -t`, then drop them, or re-attach
+them). Archiving is not deleting, so by design the lifetime rollups
+(`user_stats`, `user_weeks`, `user_exercise_totals`), personal records and
+`set_logs` keep counting those sessions. History lists and exports stop
+returning them, and a rollup rebuild (app.modules.analytics.rollup) would drop
+them from the totals too. Detaching is a manual step:
+
+    python -m app.modules.sessions.partitions [--ahead N] [--detach-before YYYY-MM]
+"""
+import argparse
+import asyncio
+from datetime import date, datetime, timezone
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+MONTHS_AHEAD = 3
+DEFAULT_PARTITION = "sessions_default"
+_LOCK_KEY = 0x676D5F70617274  # pg_advisory_xact_lock key: one maintenance run at a time
+
+
+def add_months(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"sessions_p{month:%Y%m}"
+
+
+def partition_month(name: str) -> date | None:
+    if not name.startswith("sessions_p") or not name[10:].isdigit():
+        return None
+    return date(int(name[10:14]), int(name[14:16]), 1)
+
+
+def _bound(month: date) -> str:
+    return f"'{month.isoformat()} 00:00:00+00'"
+
+
+async def _partitions(db: AsyncSession) -> set[str]:
+    result = await db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits AS i JOIN pg_class AS c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'sessions'::regclass"
+        )
+    )
+    return set(result.scalars().all())
+
+
+async def ensure_partitions(
+    db: AsyncSession, ahead: int = MONTHS_AHEAD, today: date | None = None
+) -> list[str]:
+    """Create the partitions for this month and the next `ahead`. Returns the new partitions."""
+    if db.bind.dialect.name != "postgresql":
+        return []
+    await db.execute(select(func.pg_advisory_xact_lock(_LOCK_KEY)))
+
+    this_month = (today or datetime.now(timezone.utc).date()).replace(day=1)
+    existing = await _partitions(db)
+    created: list[str] = []
+    for month in (add_months(this_month, i) for i in range(ahead + 1)):
+        name = partition_name(month)
+        if name in existing:
+            continue
+        start, end = _bound(month), _bound(add_months(month, 1))
+        # Attaching scans the default partition for rows in the new range, so they move first.
+        await db.execute(text(f"CREATE TABLE {name} (LIKE sessions INCLUDING DEFAULTS)"))
+        await db.execute(
+            text(
+                f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+                f"WHERE finished_at >= {start} AND finished_at < {end} RETURNING *) "
+                f"INSERT INTO {name} SELECT * FROM moved"
+            )
+        )
+        await db.execute(text(f"ALTER TABLE {name} ENABLE ROW LEVEL SECURITY"))
+        await db.execute(
+            text(f"ALTER TABLE sessions ATTACH PARTITION {name} FOR VALUES FROM ({start}) TO ({end})")
+        )
+        created.append(name)
+    await db.commit()
+    return created
+
+
+async def detach_partitions(db: AsyncSession, before: date) -> list[str]:
+    """Detach the monthly partitions that end on or before `before`. Returns their names."""
+    if db.bind.dialect.name != "postgresql":
+        return []
+    await db.execute(select(func.pg_advisory_xact_lock(_LOCK_KEY)))
+
+    cutoff = before.replace(day=1)
+    detached = sorted(
+        name
+        for name in await _partitions(db)
+        if (month := partition_month(name)) is not None and add_months(month, 1) <= cutoff
+    )
+    for name in detached:
+        await db.execute(text(f"ALTER TABLE sessions DETACH PARTITION {name}"))
+    await db.commit()
+    return detached
+
+
+async def _main() -> None:
+    from app.database import AsyncSessionLocal
+
+    parser = argparse.ArgumentParser(description="Maintain the monthly partitions of sessions.")
+    parser.add_argument("--ahead", type=int, default=MONTHS_AHEAD, help="months to create ahead")
+    parser.add_argument(
+        "--detach-before",
+        type=lambda s: datetime.strptime(s, "%Y-%m").date(),
+        default=None,
+        help="detach the months before YYYY-MM",
+    )
+    args = parser.parse_args()
+
+    async with AsyncSessionLocal() as db:
+        created = await ensure_partitions(db, args.ahead)
+        print(f"[partitions] created {len(created)} partition(s) {' '.join(created)}")
+        if args.detach_before is not None:
+            detached = await detach_partitions(db, args.detach_before)
+            print(f"[partitions] detached {len(detached)} partition(s) {' '.join(detached)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -1,18 +1,31 @@
 from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
 
-from sqlalchemy import delete, select
+from sqlalchemy import delete, insert, literal, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache import UserCache, columns_of, repository_cache
+from app.models.routine import Routine
 from app.models.session import Session
+from app.modules.analytics.rollup import forget_sessions, record_sessions
+from app.modules.sessions.pagination import SessionCursor
+from app.versioning import bump_data_version, record_tombstones
 
 
 class SessionRepository(ABC):
     @abstractmethod
-    async def list(self, user_id: str) -> list[Session]: ...
+    async def list(
+        self, user_id: str, limit: int | None = None, after: SessionCursor | None = None
+    ) -> list[Session]: ...
 
     @abstractmethod
     async def create(self, session: Session) -> Session: ...
 
+    @abstractmethod
+    async def create_many(self, user_id: str, sessions: "list[Session]") -> "list[Session]": ...
+
     @abstractmethod
     async def delete(self, session_id: str, user_id: str) -> bool: ...
 
@@ -21,25 +34,174 @@ class PostgresSessionRepository(SessionRepository):
     def __init__(self, db: AsyncSession) -> None:
         self._db = db
 
-    async def list(self, user_id: str) -> list[Session]:
-        result = await self._db.execute(
+    async def list(
+        self, user_id: str, limit: int | None = None, after: SessionCursor | None = None
+    ) -> list[Session]:
+        # Keyset walk over ix_sessions_user_id_finished_at_id
+        query = (
             select(Session)
             .where(Session.user_id == user_id)
-            .order_by(Session.finished_at.desc())
+            .order_by(Session.finished_at.desc(), Session.id.desc())
+            .limit(limit)
         )
+        if after is not None:
+            query = query.where(
+                tuple_(Session.finished_at, Session.id)
+                < tuple_(
+                    literal(after.finished_at, Session.finished_at.type),
+                    literal(after.id, Session.id.type),
+                )
+            )
+        result = await self._db.execute(query)
         return list(result.scalars().all())
 
     async def create(self, session: Session) -> Session:
+        await self._drop_unknown_routines(session.user_id, [session])
+        session.data_version = await bump_data_version(self._db, session.user_id)
         self._db.add(session)
+        await self._db.flush()
+        await record_sessions(self._db, session.user_id, [session])
         await self._db.commit()
         await self._db.refresh(session)
         return session
 
-    async def delete(self, session_id: str, user_id: str) -> bool:
+    async def create_many(self, user_id: str, sessions: "list[Session]") -> "list[Session]":
+        """One multi-row INSERT and one bulk rollup update, in a single transaction."""
+        if not sessions:
+            return []
+        await self._drop_unknown_routines(user_id, sessions)
+        version = await bump_data_version(self._db, user_id)
+        for session in sessions:
+            session.id = session.id or str(uuid4())
+            session.user_id = user_id
+            session.data_version = version
+        columns = [c.key for c in Session.__table__.columns if c.key != "created_at"]
+        await self._db.execute(
+            insert(Session).values([{c: getattr(s, c) for c in columns} for s in sessions])
+        )
+        await record_sessions(self._db, user_id, sessions)
+        await self._db.commit()
+        return sessions
+
+    async def _drop_unknown_routines(self, user_id: str, sessions: "list[Session]") -> None:
+        """Unlink sessions whose routine is not one of the user's (deleted since the
+        session was queued offline, a local-only id, garbage): the foreign key would
+        reject the whole insert, and `routine_name` still labels the session."""
+        wanted: dict[str, str] = {}
+        for session in sessions:
+            if session.routine_id is None:
+                continue
+            try:
+                wanted[session.routine_id] = str(UUID(session.routine_id))
+            except ValueError:
+                session.routine_id = None
+        if not wanted:
+            return
         result = await self._db.execute(
-            delete(Session).where(
-                Session.id == session_id, Session.user_id == user_id
+            select(Routine.id).where(
+                Routine.user_id == user_id, Routine.id.in_(set(wanted.values()))
             )
         )
+        known = {str(UUID(str(rid))) for rid in result.scalars()}
+        for session in sessions:
+            if session.routine_id is not None and wanted[session.routine_id] not in known:
+                session.routine_id = None
+
+    async def delete(self, session_id: str, user_id: str) -> bool:
+        result = await self._db.execute(
+            delete(Session)
+            .where(Session.id == session_id, Session.user_id == user_id)
+            .returning(Session.id, Session.finished_at, Session.duration_minutes, Session.logs)
+        )
+        removed = result.all()
+        await forget_sessions(self._db, user_id, removed)
+        if removed:
+            version = await bump_data_version(self._db, user_id)
+            await record_tombstones(self._db, user_id, "session", [r.id for r in removed], version)
         await self._db.commit()
-        return result.rowcount > 0
+        return len(removed) > 0
+
+
+class CachedSessionRepository(SessionRepository):
+    """Read-through cache around any backend: `list` pages are served from the
+    per-user cache, writes go to the backend and invalidate it. With `version`,
+    entries are also dropped once the user's data version moves (a write made
+    through another worker)."""
+
+    def __init__(
+        self,
+        backend: SessionRepository,
+        cache: UserCache = repository_cache,
+        version: Callable[[str], Awaitable[int]] | None = None,
+    ) -> None:
+        self._backend = backend
+        self._cache = cache
+        # The user's data version (app.versioning): keys the cache across workers
+        self._version = version
+
+    async def list(
+        self, user_id: str, limit: int | None = None, after: SessionCursor | None = None
+    ) -> list[Session]:
+        async def load() -> list[dict]:
+            return [columns_of(s) for s in await self._backend.list(user_id, limit, after)]
+
+        version = await self._version(user_id) if self._version else None
+        rows = await self._cache.get_or_load(user_id, ("sessions", limit, after), load, version)
+        return [Session(**row) for row in rows]
+
+    async def create(self, session: Session) -> Session:
+        try:
+            return await self._backend.create(session)
+        finally:
+            self._cache.invalidate(session.user_id)
+
+    async def create_many(self, user_id: str, sessions: "list[Session]") -> "list[Session]":
+        try:
+            return await self._backend.create_many(user_id, sessions)
+        finally:
+            self._cache.invalidate(user_id)
+
+    async def delete(self, session_id: str, user_id: str) -> bool:
+        try:
+            return await self._backend.delete(session_id, user_id)
+        finally:
+            self._cache.invalidate(user_id)
+
+
+class InMemorySessionRepository(SessionRepository):
+    """Dict-backed storage for tests and single-node experiments (nothing persists,
+    and the analytics rollups are not maintained)."""
+
+    def __init__(self) -> None:
+        self._sessions: dict[str, Session] = {}
+
+    async def list(
+        self, user_id: str, limit: int | None = None, after: SessionCursor | None = None
+    ) -> list[Session]:
+        sessions = sorted(
+            (s for s in self._sessions.values() if s.user_id == user_id),
+            key=lambda s: (s.finished_at, s.id),
+            reverse=True,
+        )
+        if after is not None:
+            sessions = [s for s in sessions if (s.finished_at, s.id) < (after.finished_at, after.id)]
+        return sessions[:limit] if limit is not None else sessions
+
+    async def create(self, session: Session) -> Session:
+        return (await self.create_many(session.user_id, [session]))[0]
+
+    async def create_many(self, user_id: str, sessions: "list[Session]") -> "list[Session]":
+        now = datetime.now(timezone.utc)
+        for session in sessions:
+            session.id = session.id or str(uuid4())
+            session.user_id = user_id
+            session.created_at = now
+            self._sessions[session.id] = session
+        return sessions
+
+    async def delete(self, session_id: str, user_id: str) -> bool:
+        session = self._sessions.get(session_id)
+        if session is None or session.user_id != user_id:
+            return False
+        del self._sessions[session_id]
+        return True
@@ -1,41 +1,120 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from functools import partial
+from typing import Annotated
 
-from app.dependencies import CurrentProfile, DbSession
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+
+from app.dependencies import CurrentUser, DbSession, ReadDbSession, conditional_get
 from app.models.session import Session
-from app.modules.sessions.repository import PostgresSessionRepository
-from app.modules.sessions.schemas import SessionCreate, SessionRead
+from app.modules.sessions.export import MEDIA_TYPES, ExportFormat, export_sessions
+from app.modules.sessions.pagination import SessionCursor
+from app.modules.sessions.repository import (
+    CachedSessionRepository,
+    PostgresSessionRepository,
+    SessionRepository,
+)
+from app.modules.sessions.schemas import (
+    SessionBatch,
+    SessionBatchItem,
+    SessionBatchResult,
+    SessionCreate,
+    SessionPage,
+    SessionRead,
+)
+from app.versioning import get_data_version
 
 router = APIRouter(prefix="/sessions", tags=["sessions"])
 
 
-@router.get("", response_model=list[SessionRead])
-async def list_sessions(profile: CurrentProfile, db: DbSession) -> list[SessionRead]:
-    repo = PostgresSessionRepository(db)
-    return await repo.list(profile.id)  # type: ignore[return-value]
+def _repository(db: DbSession) -> SessionRepository:
+    return CachedSessionRepository(
+        PostgresSessionRepository(db), version=partial(get_data_version, db)
+    )
+
+
+@router.get("", response_model=SessionPage, dependencies=[Depends(conditional_get())])
+async def list_sessions(
+    profile: CurrentUser,
+    db: DbSession,
+    limit: Annotated[int, Query(ge=1, le=200)] = 50,
+    cursor: str | None = None,
+) -> SessionPage:
+    """Newest first, `limit` per page; follow `next_cursor` for older sessions."""
+    repo = _repository(db)
+    after = SessionCursor.decode(cursor) if cursor else None
+    sessions = await repo.list(profile.id, limit + 1, after)
+    next_cursor = None
+    if len(sessions) > limit:
+        sessions = sessions[:limit]
+        last = sessions[-1]
+        next_cursor = SessionCursor(last.finished_at, last.id).encode()
+    return SessionPage(
+        items=[SessionRead.model_validate(s) for s in sessions], next_cursor=next_cursor
+    )
+
+
+@router.get("/export")
+async def export_session_history(
+    profile: CurrentUser, db: ReadDbSession, format: ExportFormat = "ndjson"
+) -> StreamingResponse:
+    """The user's full history, streamed: NDJSON sessions or CSV with one row per set."""
+    return StreamingResponse(
+        export_sessions(db, profile.id, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="sessions.{format}"'},
+    )
 
 
 @router.post("", response_model=SessionRead, status_code=201)
 async def create_session(
-    body: SessionCreate, profile: CurrentProfile, db: DbSession
+    body: SessionCreate, profile: CurrentUser, db: DbSession
 ) -> SessionRead:
-    repo = PostgresSessionRepository(db)
-    session = Session(
-        user_id=profile.id,
-        routine_id=body.routine_id,
-        routine_name=body.routine_name,
-        started_at=body.started_at,
-        finished_at=body.finished_at,
-        duration_minutes=body.duration_minutes,
-        logs={k: [s.model_dump(exclude_none=True) for s in v] for k, v in body.logs.items()},
-    )
-    return await repo.create(session)  # type: ignore[return-value]
+    repo = _repository(db)
+    return await repo.create(_to_model(body, profile.id))  # type: ignore[return-value]
+
+
+@router.post("/batch", response_model=SessionBatchResult)
+async def create_sessions_batch(
+    body: SessionBatch, profile: CurrentUser, db: DbSession
+) -> SessionBatchResult:
+    """Ingest offline-queued sessions in one transaction, with a result per item."""
+    results: list[SessionBatchItem] = []
+    valid: list[tuple[int, Session]] = []
+    for i, raw in enumerate(body.sessions):
+        try:
+            valid.append((i, _to_model(SessionCreate.model_validate(raw), profile.id)))
+        except ValidationError as exc:
+            errors = exc.errors(include_url=False, include_context=False, include_input=False)
+            results.append(SessionBatchItem(index=i, status=422, errors=errors))
+
+    repo = _repository(db)
+    created = await repo.create_many(profile.id, [s for _, s in valid])
+    results += [
+        SessionBatchItem(index=i, status=201, session=SessionRead.model_validate(s))
+        for (i, _), s in zip(valid, created)
+    ]
+    results.sort(key=lambda r: r.index)
+    return SessionBatchResult(created=len(created), results=results)
 
 
 @router.delete("/{session_id}", status_code=204)
 async def delete_session(
-    session_id: str, profile: CurrentProfile, db: DbSession
+    session_id: str, profile: CurrentUser, db: DbSession
 ) -> None:
-    repo = PostgresSessionRepository(db)
+    repo = _repository(db)
     deleted = await repo.delete(session_id, profile.id)
     if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+
+
+def _to_model(body: SessionCreate, user_id: str) -> Session:
+    return Session(
+        user_id=user_id,
+        routine_id=body.routine_id,
+        routine_name=body.routine_name,
+        started_at=body.started_at,
+        finished_at=body.finished_at,
+        duration_minutes=body.duration_minutes,
+        logs={k: [s.model_dump(exclude_none=True) for s in v] for k, v in body.logs.items()},
+    )
@@ -28,3 +28,25 @@ class SessionRead(BaseModel):
     logs: dict[str, list[SetLogItem]]
 
     model_config = {"from_attributes": True}
+
+
+class SessionBatch(BaseModel):
+    # Items are validated one by one so a bad item doesn't reject the batch.
+    sessions: list[dict] = Field(..., min_length=1, max_length=100)
+
+
+class SessionBatchItem(BaseModel):
+    index: int
+    status: int  # 201 created, 422 invalid
+    session: SessionRead | None = None
+    errors: list[dict] | None = None
+
+
+class SessionPage(BaseModel):
+    items: list[SessionRead]
+    next_cursor: str | None = None  # pass back as `cursor`; None on the last page
+
+
+class SessionBatchResult(BaseModel):
+    created: int
+    results: list[SessionBatchItem]
@@ -0,0 +1,94 @@
+"""
+`set_logs`: one row per logged set, normalized out of `Session.logs`.
+
+Rows are written and removed by `rollup.record_sessions` / `rollup.forget_sessions`,
+so they stay in the same transaction as the sessions they come from. Per-exercise
+reads (progression series, PR recomputation) are index range scans on
+(user_id, exercise_id, finished_at) instead of decoding the JSONB logs of every
+session in the user's history.
+"""
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Sequence
+from datetime import datetime
+from typing import Protocol
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.set_log import SetLog
+from app.modules.analytics.records import parse_number
+
+# 8 bind parameters per row keeps each INSERT well under the driver limits
+_CHUNK = 1000
+
+
+class _SessionLike(Protocol):
+    id: str
+    finished_at: datetime
+    logs: dict
+
+
+def set_log_rows(user_id: str, sessions: Iterable[_SessionLike]) -> list[dict]:
+    return [
+        {
+            "session_id": s.id,
+            "user_id": user_id,
+            "exercise_id": exercise_id,
+            "set_index": i,
+            "weight": parse_number(log.get("weight")),
+            "reps": parse_number(log.get("reps")),
+            "is_pr": bool(log.get("isPR")),
+            "finished_at": s.finished_at,
+        }
+        for s in sessions
+        for exercise_id, sets in (s.logs or {}).items()
+        if isinstance(sets, list)
+        for i, log in enumerate(sets)
+        if isinstance(log, dict)
+    ]
+
+
+async def write_set_logs(db: AsyncSession, user_id: str, sessions: Iterable[_SessionLike]) -> None:
+    """Insert the sets of newly inserted (flushed) sessions (caller commits)."""
+    rows = set_log_rows(user_id, sessions)
+    for i in range(0, len(rows), _CHUNK):
+        await db.execute(insert(SetLog).values(rows[i : i + _CHUNK]))
+
+
+async def delete_set_logs(db: AsyncSession, session_ids: Sequence[str]) -> None:
+    if session_ids:
+        await db.execute(delete(SetLog).where(SetLog.session_id.in_(session_ids)))
+
+
+class SetLogRepository(ABC):
+    @abstractmethod
+    async def exercise_history(
+        self,
+        user_id: str,
+        exercise_id: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> list[SetLog]: ...
+
+
+class PostgresSetLogRepository(SetLogRepository):
+    def __init__(self, db: AsyncSession) -> None:
+        self._db = db
+
+    async def exercise_history(
+        self,
+        user_id: str,
+        exercise_id: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> list[SetLog]:
+        """One exercise's sets within inclusive `finished_at` bounds, grouped by session in date order."""
+        query = select(SetLog).where(SetLog.user_id == user_id, SetLog.exercise_id == exercise_id)
+        if start is not None:
+            query = query.where(SetLog.finished_at >= start)
+        if end is not None:
+            query = query.where(SetLog.finished_at <= end)
+        result = await self._db.execute(
+            query.order_by(SetLog.finished_at, SetLog.session_id, SetLog.set_index)
+        )
+        return list(result.scalars().all())
@@ -8,6 +8,7 @@ from pydantic import BaseModel
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache import profile_cache
 from app.config import settings
 from app.database import get_db
 from app.dependencies import CurrentProfile
@@ -76,6 +77,7 @@ async def stripe_webhook(
             if profile:
                 profile.stripe_customer_id = customer_id
                 await db.commit()
+                profile_cache.invalidate(profile.id)
 
     return {"received": True}
 
@@ -88,3 +90,4 @@ async def _set_plan(db: AsyncSession, customer_id: str, plan: str) -> None:
     if profile:
         profile.plan = plan
         await db.commit()
+        profile_cache.invalidate(profile.id)
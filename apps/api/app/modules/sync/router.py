@@ -0,0 +1,86 @@
+"""
+Delta sync for multi-device clients.
+
+- GET /sync?since=<token> — routines, sessions, custom exercises and preferences
+  written after `token`, plus the ids deleted since then, and the next token
+
+Tokens are user data versions (see app.versioning): every write stamps its rows
+with the version it bumped to, and every delete leaves a tombstone with it.
+Without `since`, or with a token the server has not reached (e.g. after a
+restore), the response holds everything and `full` is true.
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+
+from app.dependencies import CurrentUser, DbSession, conditional_get
+from app.models.exercise import CustomExercise
+from app.models.preference import UserPreference
+from app.models.routine import Routine
+from app.models.session import Session
+from app.models.sync_tombstone import SyncTombstone
+from app.modules.sync.schemas import SyncDeleted, SyncResponse
+from app.versioning import get_data_version
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+# Tombstone entity → `deleted` field
+_DELETED_FIELDS = {"routine": "routines", "session": "sessions", "exercise": "exercises"}
+
+
+def _decode(token: str) -> int:
+    if not token.isdigit():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid sync token")
+    return int(token)
+
+
+@router.get("", response_model=SyncResponse, dependencies=[Depends(conditional_get())])
+async def sync(profile: CurrentUser, db: DbSession, since: str | None = None) -> SyncResponse:
+    """Clients apply `deleted` before the upserts: a custom exercise id can be
+    deleted and then created again."""
+    # Read first: rows written meanwhile are sent now and again next time, never missed.
+    version = await get_data_version(db, profile.id)
+    after = _decode(since) if since is not None else None
+    full = after is None or after > version
+    if full:
+        after = -1
+
+    routines = await db.execute(
+        select(Routine)
+        .where(Routine.user_id == profile.id, Routine.data_version > after)
+        .order_by(Routine.position, Routine.created_at)
+    )
+    sessions = await db.execute(
+        select(Session)
+        .where(Session.user_id == profile.id, Session.data_version > after)
+        .order_by(Session.finished_at.desc(), Session.id.desc())
+    )
+    exercises = await db.execute(
+        select(CustomExercise).where(
+            CustomExercise.user_id == profile.id, CustomExercise.data_version > after
+        )
+    )
+    preferences = await db.scalar(
+        select(UserPreference).where(
+            UserPreference.user_id == profile.id, UserPreference.data_version > after
+        )
+    )
+
+    deleted = SyncDeleted()
+    if not full:
+        tombstones = await db.execute(
+            select(SyncTombstone.entity, SyncTombstone.entity_id).where(
+                SyncTombstone.user_id == profile.id, SyncTombstone.data_version > after
+            )
+        )
+        for entity, entity_id in tombstones.all():
+            getattr(deleted, _DELETED_FIELDS[entity]).append(entity_id)
+
+    return SyncResponse(
+        token=str(version),
+        full=full,
+        routines=routines.scalars().all(),
+        sessions=sessions.scalars().all(),
+        exercises=exercises.scalars().all(),
+        preferences=preferences,
+        deleted=deleted,
+    )
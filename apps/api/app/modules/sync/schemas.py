@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+
+from app.modules.exercises.schemas import ExerciseRead
+from app.modules.preferences.schemas import PreferencesRead
+from app.modules.routines.schemas import RoutineRead
+from app.modules.sessions.schemas import SessionRead
+
+
+class SyncDeleted(BaseModel):
+    routines: list[str] = Field(default_factory=list)
+    sessions: list[str] = Field(default_factory=list)
+    exercises: list[str] = Field(default_factory=list)
+
+
+class SyncResponse(BaseModel):
+    token: str  # pass back as `since` on the next sync
+    full: bool  # true: replace local state; false: merge
+    routines: list[RoutineRead]
+    sessions: list[SessionRead]
+    exercises: list[ExerciseRead]
+    preferences: PreferencesRead | None  # None when unchanged
+    deleted: SyncDeleted
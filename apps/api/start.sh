@@ -1,6 +1,7 @@
 #!/bin/sh
 # Production startup script.
-# Runs Alembic migrations to head, then starts uvicorn.
+# Runs Alembic migrations to head, creates the upcoming sessions partitions,
+# then starts uvicorn.
 # Using 'exec' so uvicorn becomes PID 1 and receives OS signals correctly.
 set -e
 
@@ -9,5 +10,8 @@ export PYTHONPATH=/app
 echo "[start] Running database migrations..."
 alembic upgrade head
 
+echo "[start] Creating upcoming sessions partitions..."
+python -m app.modules.sessions.partitions
+
 echo "[start] Starting API server..."
 exec uvicorn app.main:app --host 0.0.0.0 --port "${PORT:-8000}" --workers "${WORKERS:-1}"
@@ -3,8 +3,8 @@ Shared pytest fixtures for the GymTracker API test suite.
 
 Strategy:
 - Each test gets its own SQLite in-memory engine → full data isolation.
-- Override `get_db` to inject the test session.
-- Override `get_or_create_profile` to skip JWT verification.
+- Override `get_db` / `get_read_db` to inject the test session.
+- Override `get_or_create_profile` / `get_current_user` to skip JWT verification.
 
 To run:
     cd apps/api
@@ -52,10 +52,12 @@ def _array_result(self, dialect, coltype):  # type: ignore[override]
 _PG_ARRAY.bind_processor = _array_bind  # type: ignore[method-assign]
 _PG_ARRAY.result_processor = _array_result  # type: ignore[method-assign]
 
-from app.database import Base, get_db  # noqa: E402
-from app.dependencies import get_or_create_profile  # noqa: E402
+from app.database import Base, get_db, get_read_db  # noqa: E402
+from app.dependencies import get_current_user, get_or_create_profile  # noqa: E402
 from app.main import app  # noqa: E402
 from app.models.profile import Profile  # noqa: F401, E402 — ensures table is registered
+from app.cache import profile_cache, repository_cache  # noqa: E402
+from app.modules.exercises.catalog import clear_exercise_cache  # noqa: E402
 
 
 class _FakeProfile:
@@ -75,6 +77,10 @@ class _FakeProfile:
 
 @pytest_asyncio.fixture()
 async def db_session():
+    # Data versions restart at 0 with every fresh database
+    clear_exercise_cache()
+    repository_cache.clear()
+    profile_cache.clear()
     engine = create_async_engine("sqlite+aiosqlite:///:memory:", echo=False)
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
@@ -98,7 +104,9 @@ def _make_client(db_session: AsyncSession, profile: _FakeProfile):
         return profile
 
     app.dependency_overrides[get_db] = _override_db
+    app.dependency_overrides[get_read_db] = _override_db
     app.dependency_overrides[get_or_create_profile] = _override_profile
+    app.dependency_overrides[get_current_user] = _override_profile
     return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
 
 
@@ -1,6 +1,10 @@
+import asyncio
+
 import pytest
 from httpx import AsyncClient
 
+from app.maintenance import run_every
+
 
 @pytest.mark.asyncio
 async def test_admin_custom_exercises_empty(admin_client: AsyncClient):
@@ -48,3 +52,83 @@ async def test_admin_custom_exercises_ordered_by_popularity(admin_client: AsyncC
 async def test_admin_custom_exercises_forbidden_for_free(client: AsyncClient):
     r = await client.get("/admin/custom-exercises")
     assert r.status_code == 403
+
+
+def _session(finished_at: str, logs: dict) -> dict:
+    return {
+        "routine_name": "Push Day",
+        "started_at": finished_at,
+        "finished_at": finished_at,
+        "duration_minutes": 30,
+        "logs": logs,
+    }
+
+
+@pytest.mark.asyncio
+async def test_platform_analytics_refresh(admin_client: AsyncClient):
+    for finished_at, logs in [
+        ("2026-03-02T10:00:00+00:00", {"bp": [{"weight": "60", "reps": "10"}] * 3}),
+        ("2026-03-02T18:00:00+00:00", {"sen": [{"weight": "100", "reps": "5"}]}),
+        ("2026-03-10T10:00:00+00:00", {"bp": [{"weight": "60", "reps": "10"}]}),
+    ]:
+        assert (await admin_client.post("/sessions", json=_session(finished_at, logs))).status_code == 201
+
+    # Nothing is visible before the aggregates are refreshed
+    params = {"from": "2026-03-01", "to": "2026-03-31"}
+    assert (await admin_client.get("/admin/analytics/daily", params=params)).json() == []
+
+    r = await admin_client.post("/admin/analytics/refresh")
+    assert r.json() == {"days_refreshed": 2}
+
+    daily = (await admin_client.get("/admin/analytics/daily", params=params)).json()
+    assert [(d["day"], d["sessions"], d["active_users"], d["sets"]) for d in daily] == [
+        ("2026-03-02", 2, 1, 4),
+        ("2026-03-10", 1, 1, 1),
+    ]
+    assert daily[0]["premium_active_users"] == 0  # the fake profile has no profiles row
+
+    top = (await admin_client.get("/admin/analytics/exercises", params=params)).json()
+    assert [(e["exercise_id"], e["name"], e["sets"], e["user_days"]) for e in top] == [
+        ("bp", "Bench Press", 4, 2),
+        ("sen", "Squat", 1, 1),
+    ]
+
+    status = (await admin_client.get("/admin/analytics/status")).json()
+    assert status["high_water_mark"] is not None
+
+    # The next run picks up sessions inserted since the high-water mark
+    await admin_client.post("/sessions", json=_session(
+        "2026-03-10T12:00:00+00:00", {"sen": [{"weight": "100", "reps": "5"}] * 2}
+    ))
+    await admin_client.post("/admin/analytics/refresh")
+    daily = (await admin_client.get("/admin/analytics/daily", params=params)).json()
+    assert [(d["day"], d["sessions"], d["sets"]) for d in daily] == [
+        ("2026-03-02", 2, 4),
+        ("2026-03-10", 2, 3),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_platform_analytics_forbidden_for_free(client: AsyncClient):
+    r = await client.get("/admin/analytics/daily")
+    assert r.status_code == 403
+    r = await client.post("/admin/analytics/refresh")
+    assert r.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_periodic_job_survives_failures():
+    runs = 0
+
+    async def job():
+        nonlocal runs
+        runs += 1
+        if runs == 1:
+            raise RuntimeError("database unavailable")
+
+    task = asyncio.create_task(run_every(0, job, "test"))
+    while runs < 3:
+        await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
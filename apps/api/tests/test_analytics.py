@@ -0,0 +1,415 @@
+from datetime import datetime, time, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.analytics.rollup import rebuild_rollups
+
+
+def _session(finished_at: str, duration: int, logs: dict) -> dict:
+    return {
+        "routine_name": "Push Day",
+        "started_at": finished_at,
+        "finished_at": finished_at,
+        "duration_minutes": duration,
+        "logs": logs,
+    }
+
+
+SESSIONS = [
+    _session("2026-03-02T10:00:00+00:00", 60, {
+        "bp": [{"weight": "60", "reps": "10"}, {"weight": "70", "reps": "8"}],
+        "jal": [{"weight": "50", "reps": "12"}],
+    }),
+    _session("2026-03-04T10:00:00+00:00", 0, {
+        "bp": [{"weight": "72.5", "reps": "6"}],
+    }),
+    _session("2026-03-11T10:00:00+00:00", 45, {
+        "sen": [{"weight": "100", "reps": "5"}, {"weight": "", "reps": "5"}],
+    }),
+]
+
+
+async def _seed(client: AsyncClient) -> list[str]:
+    ids = []
+    for payload in SESSIONS:
+        r = await client.post("/sessions", json=payload)
+        assert r.status_code == 201
+        ids.append(r.json()["id"])
+    return ids
+
+
+@pytest.mark.asyncio
+async def test_basic_analytics_empty(client: AsyncClient):
+    r = await client.get("/analytics/basic")
+    assert r.status_code == 200
+    assert r.json() == {
+        "total_workouts": 0,
+        "total_sets": 0,
+        "avg_duration": 0,
+        "total_minutes": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_basic_analytics_tracks_creates_and_deletes(client: AsyncClient):
+    ids = await _seed(client)
+
+    r = await client.get("/analytics/basic")
+    assert r.json() == {
+        "total_workouts": 3,
+        "total_sets": 6,
+        "avg_duration": 52,  # zero-length sessions are excluded from the average
+        "total_minutes": 105,
+    }
+
+    r = await client.delete(f"/sessions/{ids[0]}")
+    assert r.status_code == 204
+
+    r = await client.get("/analytics/basic")
+    assert r.json() == {
+        "total_workouts": 2,
+        "total_sets": 3,
+        "avg_duration": 45,
+        "total_minutes": 45,
+    }
+
+
+@pytest.mark.asyncio
+async def test_basic_analytics_includes_migrated_sessions(client: AsyncClient):
+    r = await client.post("/auth/migrate", json={
+        "routines": [],
+        "sessions": [
+            {"routineName": "Legs", "date": "2026-01-05T09:00:00+00:00", "duration": 30,
+             "logs": {"sen": [{"weight": "80", "reps": "5"}]}},
+        ],
+        "custom_exercises": [],
+    })
+    assert r.status_code == 200
+
+    r = await client.get("/analytics/basic")
+    assert r.json()["total_workouts"] == 1
+    assert r.json()["total_sets"] == 1
+    assert r.json()["total_minutes"] == 30
+
+
+
+@pytest.mark.asyncio
+async def test_migrate_rejects_malformed_sessions(client: AsyncClient):
+    good = {"routineName": "Legs", "date": "2026-01-05T09:00:00+00:00", "duration": 30, "logs": {}}
+    for bad in (
+        {k: v for k, v in good.items() if k != "date"},
+        {**good, "date": "last tuesday"},
+        {**good, "logs": {"sen": {"weight": "80"}}},
+        {**good, "logs": {"sen": [["80", "5"]]}},
+    ):
+        r = await client.post("/auth/migrate", json={
+            "routines": [], "sessions": [good, bad], "custom_exercises": [],
+        })
+        assert r.status_code == 422
+        assert r.json()["detail"][0]["loc"][:3] == ["body", "sessions", 1]
+
+    # Nothing from the rejected payloads was written
+    assert (await client.get("/analytics/basic")).json()["total_workouts"] == 0
+
+
+@pytest.mark.asyncio
+async def test_rebuild_matches_incremental(client: AsyncClient, db_session: AsyncSession):
+    await _seed(client)
+    before = (await client.get("/analytics/basic")).json()
+
+    assert await rebuild_rollups(db_session) == 1
+    db_session.expire_all()
+
+    assert (await client.get("/analytics/basic")).json() == before
+
+
+@pytest.mark.asyncio
+async def test_full_analytics_requires_premium(client: AsyncClient):
+    r = await client.get("/analytics")
+    assert r.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_full_analytics_charts(premium_client: AsyncClient):
+    await _seed(premium_client)
+
+    r = await premium_client.get("/analytics")
+    assert r.status_code == 200
+    data = r.json()
+    assert data["stats"]["total_workouts"] == 3
+    charts = data["charts"]
+    assert [p["volume"] for p in charts["volume"]] == [1760.0, 435.0, 500.0]
+    assert [p["sets"] for p in charts["sets"]] == [3, 1, 2]
+    assert [p["minutes"] for p in charts["duration"]] == [60, 0, 45]
+    assert charts["frequency"] == [
+        {"week": "2026-W10", "count": 2},
+        {"week": "2026-W11", "count": 1},
+    ]
+    assert charts["muscle_split"] == [
+        {"muscle": "Chest", "sets": 3, "secondary_sets": 0},
+        {"muscle": "Legs", "sets": 2, "secondary_sets": 0},
+        {"muscle": "Back", "sets": 1, "secondary_sets": 2},
+    ]  # Arms, Shoulders and Abs were only secondary: no rows
+
+
+@pytest.mark.asyncio
+async def test_chart_volume_out_of_range_sets_count_as_zero(premium_client: AsyncClient):
+    await premium_client.post("/sessions", json=_session("2026-03-02T10:00:00+00:00", 30, {"bp": [
+        {"weight": "60", "reps": "10"},
+        {"weight": "1e400", "reps": "5"},
+        {"weight": "1e200", "reps": "1e200"},
+    ]}))
+    charts = (await premium_client.get("/analytics")).json()["charts"]
+    assert [p["volume"] for p in charts["volume"]] == [600.0]
+    assert [p["sets"] for p in charts["sets"]] == [3]
+
+
+def test_sql_volume_is_range_guarded():
+    """The PostgreSQL path can't run on SQLite: check the compiled shape instead."""
+    from sqlalchemy import select, true
+    from sqlalchemy.dialects import postgresql
+
+    from app.models.session import Session
+    from app.modules.analytics import queries
+
+    per_session = queries._per_session()
+    sql = str(
+        select(Session.id, queries._as_float(per_session.c.volume))
+        .join(per_session, true())
+        .compile(dialect=postgresql.dialect())
+    )
+    # weight and reps are multiplied as numeric, and only inside the regex-guarded CASE
+    assert sql.index("~") < sql.index("AS NUMERIC)")
+    # The product and the session total are range-checked before becoming float8
+    assert sql.count("abs(") == 2
+    assert "AS FLOAT)" in sql
+
+
+@pytest.mark.asyncio
+async def test_muscle_split_uses_custom_exercises(premium_client: AsyncClient):
+    await premium_client.post(
+        "/exercises", json={"id": "custom_1", "name": "Neck Curl", "muscle": "Neck"}
+    )
+    await premium_client.post("/sessions", json=_session(
+        "2026-03-02T10:00:00+00:00", 30, {"custom_1": [{"weight": "10", "reps": "10"}] * 2}
+    ))
+
+    split = (await premium_client.get("/analytics")).json()["charts"]["muscle_split"]
+    assert split == [{"muscle": "Neck", "sets": 2, "secondary_sets": 0}]
+
+    # Editing the exercise invalidates the cached per-user index
+    await premium_client.put("/exercises/custom_1", json={"muscle": "Shoulders"})
+    split = (await premium_client.get("/analytics")).json()["charts"]["muscle_split"]
+    assert split == [{"muscle": "Shoulders", "sets": 2, "secondary_sets": 0}]
+
+
+@pytest.mark.asyncio
+async def test_basic_analytics_window(client: AsyncClient):
+    await _seed(client)
+
+    r = await client.get(
+        "/analytics/basic",
+        params={"from": "2026-03-03T00:00:00", "to": "2026-03-31T00:00:00"},
+    )
+    assert r.status_code == 200
+    assert r.json() == {
+        "total_workouts": 2,
+        "total_sets": 3,
+        "avg_duration": 45,
+        "total_minutes": 45,
+    }
+
+
+@pytest.mark.asyncio
+async def test_full_analytics_window(premium_client: AsyncClient):
+    await _seed(premium_client)
+
+    r = await premium_client.get("/analytics", params={"to": "2026-03-05T00:00:00"})
+    data = r.json()
+    assert data["stats"]["total_workouts"] == 2
+    assert [p["sets"] for p in data["charts"]["sets"]] == [3, 1]
+    assert data["charts"]["frequency"] == [{"week": "2026-W10", "count": 2}]
+
+
+@pytest.mark.asyncio
+async def test_range_window_excludes_old_sessions(client: AsyncClient):
+    await _seed(client)
+
+    r = await client.get("/analytics/basic", params={"range": "1W"})
+    assert r.status_code == 200
+    assert r.json()["total_workouts"] == 0
+
+
+@pytest.mark.asyncio
+async def test_invalid_range_rejected(client: AsyncClient):
+    r = await client.get("/analytics/basic", params={"range": "2W"})
+    assert r.status_code == 422
+    r = await client.get("/analytics/basic", params={"from": "2026-03-10", "to": "2026-03-01"})
+    assert r.status_code == 422
+
+
+def _weekday(weeks_back: int, weekday: int) -> str:
+    today = datetime.now(timezone.utc).date()
+    monday = today - timedelta(days=today.weekday(), weeks=weeks_back)
+    day = min(monday + timedelta(days=weekday), today)
+    return datetime.combine(day, time(10), tzinfo=timezone.utc).isoformat()
+
+
+@pytest.mark.asyncio
+async def test_streak_fav_exercise_and_weekly_progress(premium_client: AsyncClient):
+    await premium_client.put("/preferences", json={"weekly_goal": 2})
+    squat = {"sen": [{"weight": "100", "reps": "5"}] * 3}
+    bench = {"bp": [{"weight": "60", "reps": "8"}]}
+    for weeks_back, weekday, logs in [
+        (2, 0, squat), (2, 2, bench),   # goal met
+        (1, 0, bench), (1, 1, squat),   # goal met
+        (0, 0, bench),                  # current week, in progress
+    ]:
+        r = await premium_client.post(
+            "/sessions", json=_session(_weekday(weeks_back, weekday), 30, logs)
+        )
+        assert r.status_code == 201
+    # Second session on an already-counted day
+    r = await premium_client.post(
+        "/sessions", json=_session(_weekday(1, 1), 30, bench)
+    )
+    duplicate_id = r.json()["id"]
+
+    stats = (await premium_client.get("/analytics")).json()["stats"]
+    assert stats["streak"] == 2
+    assert stats["this_week_unique_days"] == 1
+    assert stats["weekly_goal"] == 2
+    assert stats["fav_exercise_id"] == "sen"
+
+    # Removing one of two sessions on the same day keeps that day counted
+    await premium_client.delete(f"/sessions/{duplicate_id}")
+    assert (await premium_client.get("/analytics")).json()["stats"]["streak"] == 2
+
+
+@pytest.mark.asyncio
+async def test_streak_empty_history(premium_client: AsyncClient):
+    stats = (await premium_client.get("/analytics")).json()["stats"]
+    assert stats["streak"] == 0
+    assert stats["fav_exercise_id"] is None
+    assert stats["this_week_unique_days"] == 0
+    assert stats["weekly_goal"] == 4
+
+
+@pytest.mark.asyncio
+async def test_weekly_goal_of_zero_is_kept(premium_client: AsyncClient, db_session: AsyncSession):
+    from app.models.preference import UserPreference
+
+    db_session.add(UserPreference(user_id="00000000-0000-0000-0000-000000000001", weekly_goal=0))
+    await db_session.commit()
+    stats = (await premium_client.get("/analytics")).json()["stats"]
+    assert stats["weekly_goal"] == 0
+
+
+@pytest.mark.asyncio
+async def test_personal_records_track_creates(client: AsyncClient):
+    ids = await _seed(client)
+
+    r = await client.get("/analytics/prs")
+    assert r.status_code == 200
+    prs = {p["exercise_id"]: p for p in r.json()}
+    assert set(prs) == {"bp", "jal", "sen"}
+    assert prs["bp"]["weight"] == 72.5
+    assert prs["bp"]["reps"] == 6
+    assert prs["bp"]["session_id"] == ids[1]
+    # 70 x 8 beats the heavier 72.5 x 6 on estimated 1RM
+    assert prs["bp"]["e1rm"] == pytest.approx(70 * (1 + 8 / 30))
+    assert prs["sen"]["weight"] == 100.0
+
+    r = await client.get("/analytics/prs/sen")
+    assert r.status_code == 200
+    assert r.json()["session_id"] == ids[2]
+
+
+@pytest.mark.asyncio
+async def test_personal_record_more_reps_at_same_weight(client: AsyncClient):
+    first = await client.post("/sessions", json=_session(
+        "2026-03-02T10:00:00+00:00", 30, {"sen": [{"weight": "100", "reps": "5"}]}
+    ))
+    await client.post("/sessions", json=_session(
+        "2026-03-09T10:00:00+00:00", 30, {"sen": [{"weight": "100", "reps": "7"}]}
+    ))
+
+    pr = (await client.get("/analytics/prs/sen")).json()
+    assert pr["weight"] == 100.0
+    assert pr["reps"] == 7
+    # The weight was first reached in the earlier session
+    assert pr["session_id"] == first.json()["id"]
+
+
+def test_parse_reps_out_of_range():
+    from app.modules.analytics.records import parse_reps
+
+    assert [parse_reps(v) for v in ("8", "7.9", "1e400", "3000000000", "-3000000000", "x", None)] == [
+        8, 7, 0, 0, 0, 0, 0,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_deleting_record_session_recomputes(client: AsyncClient):
+    ids = await _seed(client)
+
+    await client.delete(f"/sessions/{ids[1]}")
+    pr = (await client.get("/analytics/prs/bp")).json()
+    assert pr["weight"] == 70.0
+    assert pr["session_id"] == ids[0]
+
+    await client.delete(f"/sessions/{ids[0]}")
+    assert (await client.get("/analytics/prs/bp")).status_code == 404
+    assert [p["exercise_id"] for p in (await client.get("/analytics/prs")).json()] == ["sen"]
+
+
+@pytest.mark.asyncio
+async def test_personal_record_not_found(client: AsyncClient):
+    r = await client.get("/analytics/prs/bp")
+    assert r.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_exercise_progression(premium_client: AsyncClient):
+    ids = await _seed(premium_client)
+
+    r = await premium_client.get("/analytics/exercises/bp")
+    assert r.status_code == 200
+    data = r.json()
+    assert data["total_points"] == 2
+    assert [p["session_id"] for p in data["points"]] == ids[:2]
+    assert [p["top_weight"] for p in data["points"]] == [70.0, 72.5]
+    assert [p["volume"] for p in data["points"]] == [1160.0, 435.0]
+    assert data["points"][1]["e1rm"] == pytest.approx(72.5 * (1 + 6 / 30))
+
+    r = await premium_client.get("/analytics/exercises/bp", params={"from": "2026-03-03T00:00:00"})
+    assert r.json()["total_points"] == 1
+
+
+@pytest.mark.asyncio
+async def test_exercise_progression_downsampled(premium_client: AsyncClient):
+    start = datetime(2026, 1, 1, 10, tzinfo=timezone.utc)
+    for day in range(20):
+        weight = 100 if day == 7 else 50 + day  # one spike that must survive
+        await premium_client.post("/sessions", json=_session(
+            (start + timedelta(days=day)).isoformat(), 30,
+            {"sen": [{"weight": str(weight), "reps": "1"}]},
+        ))
+
+    r = await premium_client.get(
+        "/analytics/exercises/sen", params={"max_points": 5, "metric": "top_weight"}
+    )
+    data = r.json()
+    assert data["total_points"] == 20
+    weights = [p["top_weight"] for p in data["points"]]
+    assert len(weights) == 5
+    assert weights[0] == 50.0 and weights[-1] == 69.0
+    assert 100.0 in weights
+
+
+@pytest.mark.asyncio
+async def test_exercise_progression_requires_premium(client: AsyncClient):
+    r = await client.get("/analytics/exercises/bp")
+    assert r.status_code == 403
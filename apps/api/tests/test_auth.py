@@ -0,0 +1,293 @@
+import asyncio
+import json
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from fastapi import HTTPException
+from jose import jwk, jwt
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import dependencies
+from app.cache import TokenCache, profile_cache
+from app.config import settings
+from app.jwks import JWKSManager
+from app.models.profile import Profile
+from app.modules.stripe.router import _set_plan
+
+USER = "00000000-0000-0000-0000-000000000001"
+
+
+@pytest.fixture
+def hs256(monkeypatch: pytest.MonkeyPatch) -> TokenCache:
+    monkeypatch.setattr(settings, "supabase_jwt_secret", "test-secret")
+    cache = TokenCache(max_entries=2)
+    monkeypatch.setattr(dependencies, "token_cache", cache)
+    return cache
+
+
+def _token(exp: float, sub: str = USER) -> str:
+    return jwt.encode({"sub": sub, "exp": int(exp)}, "test-secret", algorithm="HS256")
+
+
+@pytest.mark.asyncio
+async def test_verified_token_is_cached_until_exp(hs256: TokenCache, monkeypatch: pytest.MonkeyPatch):
+    token = _token(time.time() + 60)
+    assert (await dependencies._verify_token(f"Bearer {token}"))["sub"] == USER
+    assert (await dependencies._verify_token(f"Bearer {token}"))["sub"] == USER
+    assert (hs256.hits, hs256.misses) == (1, 1)
+
+    # Past `exp` the entry is dropped and the token verified (and rejected) again
+    later = time.time() + 120
+    monkeypatch.setattr("app.cache.time.time", lambda: later)
+    assert hs256.get(token) is None
+    assert hs256.misses == 2
+
+
+@pytest.mark.asyncio
+async def test_invalid_tokens_are_not_cached(hs256: TokenCache):
+    forged = jwt.encode({"sub": USER, "exp": int(time.time()) + 60}, "other", algorithm="HS256")
+    for _ in range(2):
+        with pytest.raises(HTTPException):
+            await dependencies._verify_token(f"Bearer {forged}")
+    assert hs256.hits == 0
+
+
+def test_token_cache_limits():
+    exp = time.time() + 60
+    cache = TokenCache(max_entries=2)
+    for i in range(3):
+        cache.put(f"t{i}", {"sub": f"u{i}", "exp": exp})
+    # Least recently used token evicted; tokens without exp never stored
+    assert [(cache.get(f"t{i}") or {}).get("sub") for i in range(3)] == [None, "u1", "u2"]
+    cache.put("no-exp", {"sub": "u"})
+    assert cache.get("no-exp") is None
+
+    disabled = TokenCache(max_entries=0)
+    disabled.put("t", {"sub": "u", "exp": exp})
+    assert disabled.get("t") is None
+
+
+@pytest.mark.asyncio
+async def test_profile_created_once_then_cached(db_session: AsyncSession):
+    for _ in range(3):
+        profile = await dependencies.get_or_create_profile(USER, db_session)
+        assert (profile.id, profile.plan, profile.is_admin) == (USER, "free", False)
+    assert await db_session.scalar(select(func.count()).select_from(Profile)) == 1
+    assert (profile_cache.hits, profile_cache.misses) == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_stripe_plan_change_invalidates_cached_profile(db_session: AsyncSession):
+    db_session.add(Profile(id=USER, stripe_customer_id="cus_1"))
+    await db_session.commit()
+    assert (await dependencies.get_or_create_profile(USER, db_session)).plan == "free"
+
+    await _set_plan(db_session, "cus_1", "premium")
+    assert (await dependencies.get_or_create_profile(USER, db_session)).plan == "premium"
+
+
+@pytest.mark.asyncio
+async def test_current_user_from_fresh_claims_skips_db(db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(settings, "jwt_profile_claims", True)
+    now = time.time()
+    claims = {"sub": USER, "iat": now, "plan": "premium", "is_admin": True}
+    user = await dependencies.get_current_user(claims, db_session)
+    assert (user.id, user.plan, user.is_admin) == (USER, "premium", True)
+    assert await db_session.scalar(select(func.count()).select_from(Profile)) == 0
+
+    # Missing or stale claims fall back to the profile (created here)
+    stale = {**claims, "iat": now - settings.jwt_claims_max_age_seconds - 1}
+    for fallback in ({"sub": USER, "iat": now}, stale):
+        user = await dependencies.get_current_user(fallback, db_session)
+        assert (user.plan, user.is_admin) == ("free", False)
+    assert await db_session.scalar(select(func.count()).select_from(Profile)) == 1
+
+    # Claims are ignored unless the mode is on
+    monkeypatch.setattr(settings, "jwt_profile_claims", False)
+    assert (await dependencies.get_current_user(claims, db_session)).plan == "free"
+
+
+# ── JWKS against a local stub server ───────────────────────────────────────────
+
+
+class _SigningKey:
+    def __init__(self, kid: str) -> None:
+        key = ec.generate_private_key(ec.SECP256R1())
+        self.kid = kid
+        self.pem = key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        ).decode()
+        public = key.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode()
+        self.jwk = {**jwk.construct(public, "ES256").to_dict(), "kid": kid}
+
+    def token(self, sub: str = USER) -> str:
+        claims = {"sub": sub, "exp": int(time.time()) + 60}
+        return jwt.encode(claims, self.pem, algorithm="ES256", headers={"kid": self.kid})
+
+
+class _StubJWKS(ThreadingHTTPServer):
+    keys: list[dict]
+    status = 200
+    delay = 0.0
+    body: bytes | None = None  # served as-is instead of {"keys": keys}
+    requests = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/auth/v1/.well-known/jwks.json"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: _StubJWKS
+
+    def do_GET(self) -> None:
+        self.server.requests += 1
+        time.sleep(self.server.delay)
+        body = self.server.body or json.dumps({"keys": self.server.keys}).encode()
+        self.send_response(self.server.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def jwks_server() -> Iterator[_StubJWKS]:
+    server = _StubJWKS(("127.0.0.1", 0), _Handler)
+    server.keys = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.asyncio
+async def test_jwks_cold_start_is_single_flight(jwks_server: _StubJWKS, monkeypatch: pytest.MonkeyPatch):
+    signing = _SigningKey("k1")
+    jwks_server.keys = [signing.jwk]
+    jwks_server.delay = 0.2
+    manager = JWKSManager(jwks_server.url, ttl_seconds=600, min_refresh_seconds=30)
+    monkeypatch.setattr(dependencies, "jwks_manager", manager)
+    monkeypatch.setattr(dependencies, "token_cache", TokenCache(max_entries=0))
+    try:
+        token = signing.token()
+        claims = await asyncio.gather(*(dependencies._verify_token(f"Bearer {token}") for _ in range(20)))
+        assert [c["sub"] for c in claims] == [USER] * 20
+        assert jwks_server.requests == 1
+    finally:
+        await manager.aclose()
+
+
+@pytest.mark.asyncio
+async def test_jwks_refreshes_on_unknown_kid_rate_limited(jwks_server: _StubJWKS):
+    old, new = _SigningKey("old"), _SigningKey("new")
+    jwks_server.keys = [old.jwk]
+    manager = JWKSManager(jwks_server.url, ttl_seconds=600, min_refresh_seconds=0.2)
+    try:
+        assert await manager.get_key("old") == old.jwk
+        # Rotation: the new kid is fetched on demand...
+        jwks_server.keys = [new.jwk, old.jwk]
+        await asyncio.sleep(0.25)
+        assert await manager.get_key("new") == new.jwk
+        assert jwks_server.requests == 2
+        # ...but unknown kids can't trigger another fetch inside the interval
+        assert await manager.get_key("forged") is None
+        assert await manager.get_key(None) == new.jwk
+        assert jwks_server.requests == 2
+    finally:
+        await manager.aclose()
+
+
+@pytest.mark.asyncio
+async def test_jwks_stale_keys_served_while_refreshing(jwks_server: _StubJWKS):
+    signing = _SigningKey("k1")
+    jwks_server.keys = [signing.jwk]
+    manager = JWKSManager(jwks_server.url, ttl_seconds=0.1, min_refresh_seconds=0)
+    try:
+        assert await manager.get_key("k1") == signing.jwk
+        await asyncio.sleep(0.15)
+        # Expired: served from memory while a background refresh runs — even a failing one
+        jwks_server.status = 500
+        assert await manager.get_key("k1") == signing.jwk
+        for _ in range(50):
+            if manager._inflight is None:
+                break
+            await asyncio.sleep(0.01)
+        assert jwks_server.requests == 2
+        assert await manager.get_key("k1") == signing.jwk
+    finally:
+        await manager.aclose()
+
+
+@pytest.mark.asyncio
+async def test_jwks_fetch_failures(jwks_server: _StubJWKS, monkeypatch: pytest.MonkeyPatch):
+    signing = _SigningKey("k1")
+    jwks_server.keys = [signing.jwk]
+    jwks_server.status = 503
+    manager = JWKSManager(jwks_server.url, ttl_seconds=600, min_refresh_seconds=0.2)
+    monkeypatch.setattr(dependencies, "jwks_manager", manager)
+    monkeypatch.setattr(dependencies, "token_cache", TokenCache(max_entries=0))
+    try:
+        # No key set yet: 503, and retries are rate limited rather than hammering the endpoint
+        for _ in range(3):
+            with pytest.raises(HTTPException) as exc:
+                await dependencies._verify_token(f"Bearer {signing.token()}")
+            assert exc.value.status_code == 503
+        assert jwks_server.requests == 1
+
+        await asyncio.sleep(0.25)
+        jwks_server.status = 200
+        assert (await dependencies._verify_token(f"Bearer {signing.token()}"))["sub"] == USER
+
+        # Once loaded, a failing refresh (here on an unknown kid) keeps the last good keys
+        jwks_server.status = 500
+        await asyncio.sleep(0.25)
+        with pytest.raises(HTTPException) as exc:
+            await dependencies._verify_token(f"Bearer {_SigningKey('rotated').token()}")
+        assert exc.value.status_code == 401
+        assert jwks_server.requests == 3
+        assert (await dependencies._verify_token(f"Bearer {signing.token()}"))["sub"] == USER
+    finally:
+        await manager.aclose()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("body", [b"[1,2]", b'{"keys": null}', b'{"keys": 5}', b'"str"', b'{"keys": [1]}', b"{"])
+async def test_jwks_malformed_body(
+    jwks_server: _StubJWKS, monkeypatch: pytest.MonkeyPatch, body: bytes
+):
+    signing = _SigningKey("k1")
+    jwks_server.body = body
+    manager = JWKSManager(jwks_server.url, ttl_seconds=600, min_refresh_seconds=0)
+    monkeypatch.setattr(dependencies, "jwks_manager", manager)
+    monkeypatch.setattr(dependencies, "token_cache", TokenCache(max_entries=0))
+    try:
+        # Never loaded: 503
+        with pytest.raises(HTTPException) as exc:
+            await dependencies._verify_token(f"Bearer {signing.token()}")
+        assert exc.value.status_code == 503
+
+        jwks_server.body = None
+        jwks_server.keys = [signing.jwk]
+        assert (await dependencies._verify_token(f"Bearer {signing.token()}"))["sub"] == USER
+
+        # Loaded: a malformed refresh keeps the last good keys
+        jwks_server.body = body
+        with pytest.raises(HTTPException) as exc:
+            await dependencies._verify_token(f"Bearer {_SigningKey('rotated').token()}")
+        assert exc.value.status_code == 401
+        assert (await dependencies._verify_token(f"Bearer {signing.token()}"))["sub"] == USER
+    finally:
+        await manager.aclose()
@@ -0,0 +1,23 @@
+from pathlib import Path
+
+import pytest
+
+from app.modules.exercises.catalog import CATALOG, parse_ts
+
+TS_CATALOG = Path(__file__).parents[3] / "packages/shared/src/constants/exercises.ts"
+
+
+def test_catalog_entries():
+    assert CATALOG["bp"].muscle == "Chest"
+    assert CATALOG["bp"].secondary == ("Arms", "Shoulders")
+    assert CATALOG["ext"].secondary == ()
+    with pytest.raises(TypeError):
+        CATALOG["x"] = CATALOG["bp"]  # type: ignore[index]
+
+
+@pytest.mark.skipif(not TS_CATALOG.exists(), reason="shared package not checked out")
+def test_catalog_matches_shared_package():
+    entries = parse_ts(TS_CATALOG.read_text())
+    assert {e["id"]: (e["name"], e["muscle"], tuple(e["secondary"])) for e in entries} == {
+        e.id: (e.name, e.muscle, e.secondary) for e in CATALOG.values()
+    }
@@ -0,0 +1,105 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.main import app
+from conftest import _FakeProfile, _make_client
+
+SESSION = {
+    "routine_name": "Push Day",
+    "started_at": "2026-03-02T10:00:00+00:00",
+    "finished_at": "2026-03-02T11:00:00+00:00",
+    "duration_minutes": 60,
+    "logs": {"bp": [{"weight": "60", "reps": "10"}]},
+}
+
+
+async def _etag(client: AsyncClient, path: str) -> str:
+    r = await client.get(path)
+    assert r.status_code == 200
+    return r.headers["etag"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/routines", "/sessions", "/exercises", "/preferences"])
+async def test_matching_etag_returns_304(client: AsyncClient, path: str):
+    etag = await _etag(client, path)
+    assert etag.startswith('W/"')
+
+    r = await client.get(path, headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers["etag"] == etag
+
+    r = await client.get(path, headers={"If-None-Match": 'W/"stale", ' + etag.removeprefix("W/")})
+    assert r.status_code == 304
+    assert r.headers["vary"] == "Authorization"
+    assert r.headers["cache-control"] == "private, no-cache"
+
+
+@pytest.mark.asyncio
+async def test_users_at_the_same_version_get_different_etags(db_session: AsyncSession):
+    """A browser or shared cache holding user A's body must not 304 user B."""
+    etags = []
+    for user_id in ("00000000-0000-0000-0000-00000000000a", "00000000-0000-0000-0000-00000000000b"):
+        async with _make_client(db_session, _FakeProfile(user_id)) as ac:
+            r = await ac.get("/routines")
+            assert r.headers["vary"] == "Authorization"
+            assert r.headers["cache-control"] == "private, no-cache"
+            etags.append(r.headers["etag"])
+            if len(etags) == 2:
+                r = await ac.get("/routines", headers={"If-None-Match": etags[0]})
+                assert r.status_code == 200
+        app.dependency_overrides.clear()
+    assert etags[0] != etags[1]
+
+
+@pytest.mark.asyncio
+async def test_every_write_path_changes_etag(client: AsyncClient):
+    etags = [await _etag(client, "/routines")]
+
+    async def write(method: str, path: str, **kwargs) -> dict:
+        r = await client.request(method, path, **kwargs)
+        assert r.status_code < 300
+        etags.append(await _etag(client, "/routines"))
+        return r.json() if r.content else {}
+
+    routine = await write("POST", "/routines", json={"name": "Push", "exercises": []})
+    await write("PUT", f"/routines/{routine['id']}", json={"name": "Pull"})
+    await write("DELETE", f"/routines/{routine['id']}")
+    session = await write("POST", "/sessions", json=SESSION)
+    await write("DELETE", f"/sessions/{session['id']}")
+    await write("POST", "/exercises", json={"id": "custom_1", "name": "Row", "muscle": "back"})
+    await write("PUT", "/exercises/custom_1", json={"name": "Cable Row"})
+    await write("DELETE", "/exercises/custom_1")
+    await write("PUT", "/preferences", json={"weekly_goal": 3})
+    await write("POST", "/auth/migrate", json={"routines": [], "sessions": [], "custom_exercises": []})
+
+    assert len(set(etags)) == len(etags)
+
+
+@pytest.mark.asyncio
+async def test_failed_write_keeps_etag(client: AsyncClient):
+    etag = await _etag(client, "/sessions")
+    r = await client.delete("/sessions/00000000-0000-0000-0000-00000000dead")
+    assert r.status_code == 404
+    assert await _etag(client, "/sessions") == etag
+
+
+@pytest.mark.asyncio
+async def test_analytics_etag(premium_client: AsyncClient):
+    etag = await _etag(premium_client, "/analytics")
+    r = await premium_client.get("/analytics", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+
+    await premium_client.post("/sessions", json=SESSION)
+    r = await premium_client.get("/analytics", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.json()["stats"]["total_workouts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_premium_check_precedes_304(client: AsyncClient):
+    etag = await _etag(client, "/analytics/basic")
+    r = await client.get("/analytics", headers={"If-None-Match": etag})
+    assert r.status_code == 403
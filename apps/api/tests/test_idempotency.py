@@ -0,0 +1,122 @@
+import time
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from jose import jwt
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.idempotency import DatabaseIdempotencyStore, MemoryIdempotencyStore, StoredResponse
+
+USER = "00000000-0000-0000-0000-000000000001"  # the fake profile's id
+
+
+@pytest.fixture(autouse=True)
+def _hs256(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "supabase_jwt_secret", "test-secret")
+
+
+def _auth(sub: str = USER, exp_offset: int = 60) -> dict:
+    """A freshly signed token: the middleware scopes keys to its verified `sub`."""
+    token = jwt.encode({"sub": sub, "exp": int(time.time()) + exp_offset}, "test-secret", algorithm="HS256")
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _session() -> dict:
+    return {
+        "routine_name": "Push Day",
+        "started_at": "2026-03-01T10:00:00+00:00",
+        "finished_at": "2026-03-01T10:00:00+00:00",
+        "duration_minutes": 30,
+        "logs": {"bp": [{"weight": "60", "reps": "10"}]},
+    }
+
+
+@pytest.mark.asyncio
+async def test_retry_replays_response(client: AsyncClient):
+    headers = {"Idempotency-Key": str(uuid4()), **_auth()}
+    first = await client.post("/sessions", json=_session(), headers=headers)
+    retry = await client.post("/sessions", json=_session(), headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+    assert len((await client.get("/sessions")).json()["items"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_key_reused_for_different_request(client: AsyncClient):
+    headers = {"Idempotency-Key": str(uuid4()), **_auth()}
+    await client.post("/routines", json={"name": "Push", "exercises": []}, headers=headers)
+    r = await client.post("/routines", json={"name": "Pull", "exercises": []}, headers=headers)
+    assert r.status_code == 422
+    assert [x["name"] for x in (await client.get("/routines")).json()] == ["Push"]
+
+
+@pytest.mark.asyncio
+async def test_without_key_every_request_runs(client: AsyncClient):
+    await client.post("/sessions", json=_session())
+    await client.post("/sessions", json=_session())
+    assert len((await client.get("/sessions")).json()["items"]) == 2
+    assert (await client.post("/sessions", json=_session(), headers={"Idempotency-Key": "", **_auth()})).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_key_scoped_to_user_not_token(client: AsyncClient):
+    key = str(uuid4())
+    first = await client.post("/sessions", json=_session(), headers={"Idempotency-Key": key, **_auth()})
+    # A refreshed token for the same user replays; another user's key space is separate
+    retry = await client.post(
+        "/sessions", json=_session(), headers={"Idempotency-Key": key, **_auth(exp_offset=120)}
+    )
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.json() == first.json()
+    other = await client.post(
+        "/sessions", json=_session(), headers={"Idempotency-Key": key, **_auth(str(uuid4()))}
+    )
+    assert "idempotent-replayed" not in other.headers
+
+
+@pytest.mark.asyncio
+async def test_unauthenticated_requests_are_not_stored(client: AsyncClient):
+    # The handlers' auth is faked in tests, so both requests run
+    headers = {"Idempotency-Key": str(uuid4()), "Authorization": "Bearer not-a-jwt"}
+    for _ in range(2):
+        r = await client.post("/sessions", json=_session(), headers=headers)
+        assert "idempotent-replayed" not in r.headers
+    assert len((await client.get("/sessions")).json()["items"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_memory_store_ttl_and_size():
+    store = MemoryIdempotencyStore(ttl_seconds=60, max_entries=2)
+    for key in ("a", "b", "c"):
+        assert await store.reserve(key, "fp")
+    assert await store.get("a") is None  # evicted
+    assert not await store.reserve("b", "fp")  # in flight
+    await store.save("b", StoredResponse("fp", 201, [], b"{}"))
+    assert (await store.get("b")).status_code == 201
+
+    expired = MemoryIdempotencyStore(ttl_seconds=0, max_entries=10)
+    await expired.save("a", StoredResponse("fp", 201))
+    assert await expired.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_database_store(db_session: AsyncSession):
+    store = DatabaseIdempotencyStore(async_sessionmaker(db_session.bind), ttl_seconds=60)
+    assert await store.reserve("k", "fp")
+    assert not await store.reserve("k", "fp")
+    assert (await store.get("k")).status_code is None
+
+    await store.save("k", StoredResponse("fp", 201, [("content-type", "application/json")], b"{}"))
+    stored = await store.get("k")
+    assert (stored.status_code, stored.headers, stored.body) == (
+        201, [("content-type", "application/json")], b"{}"
+    )
+
+    await store.release("k")
+    assert await store.get("k") is None
+    assert await store.reserve("k", "fp")
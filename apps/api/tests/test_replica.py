@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app import database
+from app.database import ReplicaMonitor
+
+
+class _ScriptedMonitor(ReplicaMonitor):
+    """Replica lag taken from a list instead of pg_last_xact_replay_timestamp()."""
+
+    def __init__(self, lags: list[float | None], **kwargs) -> None:
+        super().__init__(sessionmaker=object(), **kwargs)  # type: ignore[arg-type]
+        self.lags = lags
+        self.checks = 0
+
+    async def _measure_lag(self) -> float | None:
+        self.checks += 1
+        return self.lags.pop(0)
+
+
+@pytest.mark.asyncio
+async def test_replica_used_within_lag_tolerance():
+    monitor = _ScriptedMonitor([0.5, 30.0], max_lag_seconds=5, check_interval_seconds=0)
+    assert await monitor.usable()
+    assert not await monitor.usable()
+    assert monitor.lag == 30.0
+
+
+@pytest.mark.asyncio
+async def test_replica_checked_once_per_interval():
+    monitor = _ScriptedMonitor([0.0], max_lag_seconds=5, check_interval_seconds=60)
+    for _ in range(3):
+        assert await monitor.usable()
+    assert monitor.checks == 1
+    # A failed request marks it down until the next check
+    monitor.mark_down()
+    assert not await monitor.usable()
+    assert monitor.checks == 1
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_replica_falls_back_to_primary(monkeypatch: pytest.MonkeyPatch):
+    replica = create_async_engine("sqlite+aiosqlite:///:memory:")
+    sessionmaker = async_sessionmaker(replica, class_=AsyncSession, expire_on_commit=False)
+    # Not PostgreSQL: the lag query fails, so the replica counts as down
+    monitor = ReplicaMonitor(sessionmaker, max_lag_seconds=5, check_interval_seconds=60)
+    assert not await monitor.usable()
+    assert ReplicaMonitor(None, max_lag_seconds=5, check_interval_seconds=60).healthy is False
+
+    monkeypatch.setattr(database, "ReplicaSessionLocal", sessionmaker)
+    for healthy, expected in ((True, replica), (False, database.engine)):
+        monitor = _ScriptedMonitor(
+            [0.0 if healthy else None], max_lag_seconds=5, check_interval_seconds=60
+        )
+        monkeypatch.setattr(database, "replica_monitor", monitor)
+        async for session in database.get_read_db():
+            assert session.bind is expected
+    await replica.dispose()
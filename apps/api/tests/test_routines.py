@@ -1,5 +1,6 @@
 import pytest
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 @pytest.mark.asyncio
@@ -78,3 +79,154 @@ async def test_premium_bypasses_routine_limit(premium_client: AsyncClient):
     for i in range(4):
         r = await premium_client.post("/routines", json={"name": f"Routine {i}", "exercises": []})
         assert r.status_code == 201
+
+
+@pytest.mark.asyncio
+async def test_reorder_routines(premium_client: AsyncClient):
+    ids = []
+    for name in ("A", "B", "C"):
+        r = await premium_client.post("/routines", json={"name": name, "exercises": []})
+        ids.append(r.json()["id"])
+
+    r = await premium_client.put("/routines/order", json={"routine_ids": [ids[2], ids[0], ids[1]]})
+    assert r.status_code == 204
+    listed = (await premium_client.get("/routines")).json()
+    assert [(x["name"], x["position"]) for x in listed] == [("C", 0), ("A", 1), ("B", 2)]
+
+
+@pytest.mark.asyncio
+async def test_reorder_rejects_unknown_or_duplicate_ids(premium_client: AsyncClient):
+    a = (await premium_client.post("/routines", json={"name": "A", "exercises": []})).json()["id"]
+    b = (await premium_client.post("/routines", json={"name": "B", "exercises": [], "position": 1})).json()["id"]
+
+    other = "00000000-0000-0000-0000-0000000000ff"
+    r = await premium_client.put("/routines/order", json={"routine_ids": [b, other, a]})
+    assert r.status_code == 404
+    # Nothing was moved
+    listed = (await premium_client.get("/routines")).json()
+    assert [(x["name"], x["position"]) for x in listed] == [("A", 0), ("B", 1)]
+
+    r = await premium_client.put("/routines/order", json={"routine_ids": [a, a]})
+    assert r.status_code == 422
+    r = await premium_client.put("/routines/order", json={"routine_ids": [a, "not-a-uuid"]})
+    assert r.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_cached_repository_serves_reads_until_a_write():
+    from app.cache import UserCache
+    from app.models.routine import Routine
+    from app.modules.routines.repository import CachedRoutineRepository, InMemoryRoutineRepository
+
+    cache = UserCache(ttl_seconds=60, max_users=10, max_rows=10)
+    repo = CachedRoutineRepository(InMemoryRoutineRepository(), cache)
+    user = "u1"
+    await repo.create(Routine(user_id=user, name="A", exercises=[]))
+
+    first = await repo.list(user)
+    assert [r.name for r in first] == ["A"]
+    assert await repo.count(user) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+    # Cached rows come back as fresh objects, not shared instances
+    first[0].name = "mutated"
+    assert (await repo.list(user))[0].name == "A"
+
+    await repo.create(Routine(user_id=user, name="B", exercises=[], position=1))
+    assert [r.name for r in await repo.list(user)] == ["A", "B"]
+    assert cache.misses == 2
+
+
+@pytest.mark.asyncio
+async def test_cached_repository_sees_writes_from_other_workers(db_session: AsyncSession):
+    from functools import partial
+
+    from app.cache import UserCache
+    from app.models.routine import Routine
+    from app.modules.routines.repository import CachedRoutineRepository, PostgresRoutineRepository
+    from app.versioning import get_data_version
+
+    # Two workers: separate process caches over the same database
+    workers = [
+        CachedRoutineRepository(
+            PostgresRoutineRepository(db_session),
+            UserCache(ttl_seconds=60, max_users=10, max_rows=10),
+            version=partial(get_data_version, db_session),
+        )
+        for _ in range(2)
+    ]
+    user = "00000000-0000-0000-0000-000000000001"
+    await workers[0].create(Routine(user_id=user, name="A", exercises=[]))
+    assert [r.name for r in await workers[1].list(user)] == ["A"]
+    assert [r.name for r in await workers[1].list(user)] == ["A"]  # served from its cache
+
+    await workers[0].create(Routine(user_id=user, name="B", exercises=[], position=1))
+    assert [r.name for r in await workers[1].list(user)] == ["A", "B"]
+
+
+@pytest.mark.asyncio
+async def test_cached_repository_limits():
+    from app.cache import UserCache
+    from app.models.routine import Routine
+    from app.modules.routines.repository import CachedRoutineRepository, InMemoryRoutineRepository
+
+    cache = UserCache(ttl_seconds=60, max_users=1, max_rows=1)
+    repo = CachedRoutineRepository(InMemoryRoutineRepository(), cache)
+    for user in ("u1", "u2"):
+        await repo.create(Routine(user_id=user, name="A", exercises=[]))
+    await repo.create(Routine(user_id="u2", name="B", exercises=[], position=1))
+
+    await repo.list("u1")
+    await repo.list("u1")
+    assert cache.hits == 1
+    # u2's two rows exceed max_rows, and caching u2 at all evicts u1
+    await repo.list("u2")
+    await repo.list("u2")
+    await repo.list("u1")
+    assert (cache.hits, cache.misses) == (1, 4)
+
+
+@pytest.mark.asyncio
+async def test_share_routine_snapshot(premium_client: AsyncClient):
+    payload = {"name": "Push Day", "exercises": ["bench_press", "overhead_press"]}
+    first = (await premium_client.post("/routines", json=payload)).json()["id"]
+    second = (await premium_client.post("/routines", json=payload)).json()["id"]
+
+    r = await premium_client.post(f"/routines/{first}/share")
+    assert r.status_code == 201
+    digest = r.json()["hash"]
+    assert r.json()["path"] == f"/shared/{digest}"
+    # Identical content is deduplicated onto the same snapshot
+    r = await premium_client.post(f"/routines/{second}/share")
+    assert r.status_code == 200
+    assert r.json()["hash"] == digest
+
+    r = await premium_client.get(f"/shared/{digest}")
+    assert r.status_code == 200
+    assert r.json() == {"hash": digest, **payload}
+    assert r.headers["etag"] == f'"{digest}"'
+    assert "immutable" in r.headers["cache-control"]
+
+    # Editing the routine does not touch the snapshot; sharing again gives a new hash
+    await premium_client.put(f"/routines/{first}", json={"name": "Push Day v2"})
+    r = await premium_client.post(f"/routines/{first}/share")
+    assert r.status_code == 201
+    assert r.json()["hash"] != digest
+    assert (await premium_client.get(f"/shared/{digest}")).json()["name"] == "Push Day"
+
+
+@pytest.mark.asyncio
+async def test_shared_routine_conditional_and_missing(premium_client: AsyncClient):
+    routine = (await premium_client.post("/routines", json={"name": "Push", "exercises": []})).json()["id"]
+    digest = (await premium_client.post(f"/routines/{routine}/share")).json()["hash"]
+    for tag in (f'"{digest}"', "*"):
+        r = await premium_client.get(f"/shared/{digest}", headers={"If-None-Match": tag})
+        assert r.status_code == 304
+        assert r.headers["etag"] == f'"{digest}"'
+
+    # A tag never turns a missing snapshot into a 304
+    missing = "0" * 64
+    for tag in (None, f'"{missing}"', "*"):
+        r = await premium_client.get(f"/shared/{missing}", headers={"If-None-Match": tag} if tag else {})
+        assert r.status_code == 404
+    assert (await premium_client.get("/shared/not-a-hash")).status_code == 422
+    assert (await premium_client.post("/routines/does-not-exist/share")).status_code == 404
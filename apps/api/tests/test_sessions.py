@@ -0,0 +1,205 @@
+import csv
+import io
+import json
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.set_log import SetLog
+from app.modules.sessions.set_logs import PostgresSetLogRepository
+
+
+def _session(finished_at: str) -> dict:
+    return {
+        "routine_name": "Push Day",
+        "started_at": finished_at,
+        "finished_at": finished_at,
+        "duration_minutes": 30,
+        "logs": {"bp": [{"weight": "60", "reps": "10"}]},
+    }
+
+
+async def _create(client: AsyncClient, finished_at: str) -> str:
+    r = await client.post("/sessions", json=_session(finished_at))
+    assert r.status_code == 201
+    return r.json()["id"]
+
+
+@pytest.mark.asyncio
+async def test_list_sessions_single_page(client: AsyncClient):
+    await _create(client, "2026-03-01T10:00:00+00:00")
+    await _create(client, "2026-03-03T10:00:00+00:00")
+
+    r = await client.get("/sessions")
+    assert r.status_code == 200
+    page = r.json()
+    assert [s["finished_at"][:10] for s in page["items"]] == ["2026-03-03", "2026-03-01"]
+    assert page["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_list_sessions_default_page_size(client: AsyncClient):
+    r = await client.post("/sessions/batch", json={"sessions": [
+        _session(f"2026-01-01T10:{m:02d}:00+00:00") for m in range(55)
+    ]})
+    assert r.json()["created"] == 55
+
+    page = (await client.get("/sessions")).json()
+    assert len(page["items"]) == 50
+    assert page["next_cursor"] is not None
+    rest = (await client.get("/sessions", params={"cursor": page["next_cursor"]})).json()
+    assert len(rest["items"]) == 5
+    assert rest["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_list_sessions_keyset_pages(client: AsyncClient):
+    # Two sessions share a finished_at, so pages must tie-break on id
+    for day in ["01", "02", "02", "03", "04"]:
+        await _create(client, f"2026-03-{day}T10:00:00+00:00")
+    expected = [s["id"] for s in (await client.get("/sessions")).json()["items"]]
+
+    seen: list[str] = []
+    params: dict = {"limit": 2}
+    while True:
+        r = await client.get("/sessions", params=params)
+        assert r.status_code == 200
+        page = r.json()
+        assert len(page["items"]) <= 2
+        seen += [s["id"] for s in page["items"]]
+        if page["next_cursor"] is None:
+            break
+        params = {"limit": 2, "cursor": page["next_cursor"]}
+
+    assert seen == expected
+    assert len(seen) == 5
+
+
+@pytest.mark.asyncio
+async def test_list_sessions_invalid_cursor(client: AsyncClient):
+    r = await client.get("/sessions", params={"limit": 2, "cursor": "not-a-cursor"})
+    assert r.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_delete_unknown_session(client: AsyncClient):
+    r = await client.delete("/sessions/00000000-0000-0000-0000-00000000beef")
+    assert r.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_batch_create_sessions(client: AsyncClient):
+    r = await client.post("/sessions/batch", json={"sessions": [
+        _session("2026-03-01T10:00:00+00:00"),
+        {**_session("2026-03-02T10:00:00+00:00"), "duration_minutes": -5},
+        _session("2026-03-03T10:00:00+00:00"),
+    ]})
+    assert r.status_code == 200
+    data = r.json()
+    assert data["created"] == 2
+    assert [(item["index"], item["status"]) for item in data["results"]] == [
+        (0, 201), (1, 422), (2, 201),
+    ]
+    assert data["results"][1]["errors"][0]["loc"] == ["duration_minutes"]
+
+    listed = [s["id"] for s in (await client.get("/sessions")).json()["items"]]
+    assert listed == [data["results"][2]["session"]["id"], data["results"][0]["session"]["id"]]
+
+    # Derived tables are updated for the whole batch
+    stats = (await client.get("/analytics/basic")).json()
+    assert stats["total_workouts"] == 2
+    assert stats["total_sets"] == 2
+    pr = (await client.get("/analytics/prs/bp")).json()
+    assert pr["session_id"] == data["results"][0]["session"]["id"]
+
+
+@pytest.mark.asyncio
+async def test_batch_unlinks_unknown_routines(client: AsyncClient):
+    routine_id = (await client.post("/routines", json={"name": "Push Day", "exercises": []})).json()["id"]
+    routine_ids = [routine_id, "00000000-0000-0000-0000-00000000beef", "local-123"]
+    r = await client.post("/sessions/batch", json={"sessions": [
+        {**_session(f"2026-03-0{i + 1}T10:00:00+00:00"), "routine_id": rid}
+        for i, rid in enumerate(routine_ids)
+    ]})
+    assert r.status_code == 200
+    data = r.json()
+    assert data["created"] == 3
+    assert [item["session"]["routine_id"] for item in data["results"]] == [routine_id, None, None]
+
+
+@pytest.mark.asyncio
+async def test_batch_all_invalid(client: AsyncClient):
+    r = await client.post("/sessions/batch", json={"sessions": [{"routine_name": ""}]})
+    assert r.status_code == 200
+    assert r.json()["created"] == 0
+    assert (await client.get("/sessions")).json()["items"] == []
+
+
+@pytest.mark.asyncio
+async def test_batch_size_limits(client: AsyncClient):
+    assert (await client.post("/sessions/batch", json={"sessions": []})).status_code == 422
+    too_many = [_session("2026-03-01T10:00:00+00:00")] * 101
+    assert (await client.post("/sessions/batch", json={"sessions": too_many})).status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_set_logs_follow_session_writes(client: AsyncClient, db_session: AsyncSession):
+    body = _session("2026-03-01T10:00:00+00:00")
+    body["logs"] = {
+        "bp": [{"weight": "60", "reps": "10"}, {"weight": "65", "reps": "8", "isPR": True}],
+        "sq": [{"weight": "bw", "reps": "12"}],
+    }
+    session_id = (await client.post("/sessions", json=body)).json()["id"]
+    await _create(client, "2026-03-05T10:00:00+00:00")
+
+    rows = (await db_session.execute(
+        select(SetLog).where(SetLog.session_id == session_id).order_by(SetLog.exercise_id, SetLog.set_index)
+    )).scalars().all()
+    assert [(r.exercise_id, r.set_index, r.weight, r.reps, r.is_pr) for r in rows] == [
+        ("bp", 0, 60.0, 10.0, False),
+        ("bp", 1, 65.0, 8.0, True),
+        ("sq", 0, None, 12.0, False),
+    ]
+
+    history = await PostgresSetLogRepository(db_session).exercise_history(
+        "00000000-0000-0000-0000-000000000001", "bp"
+    )
+    assert [(h.finished_at.day, h.set_index) for h in history] == [(1, 0), (1, 1), (5, 0)]
+
+    await client.delete(f"/sessions/{session_id}")
+    remaining = (await db_session.execute(select(SetLog.session_id))).scalars().all()
+    assert session_id not in remaining and len(remaining) == 1
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson(client: AsyncClient):
+    second = await _create(client, "2026-03-02T10:00:00+00:00")
+    first = await _create(client, "2026-03-01T10:00:00+00:00")
+
+    r = await client.get("/sessions/export")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert [s["id"] for s in lines] == [first, second]
+    assert lines[0]["logs"] == {"bp": [{"weight": "60", "reps": "10", "isPR": None}]}
+
+
+@pytest.mark.asyncio
+async def test_export_csv_one_row_per_set(client: AsyncClient):
+    body = _session("2026-03-01T10:00:00+00:00")
+    body["logs"] = {"bp": [{"weight": "60", "reps": "10"}, {"weight": "65", "reps": "8", "isPR": True}]}
+    with_sets = (await client.post("/sessions", json=body)).json()["id"]
+    empty = (await client.post("/sessions", json={**_session("2026-03-02T10:00:00+00:00"), "logs": {}})).json()["id"]
+
+    r = await client.get("/sessions/export", params={"format": "csv"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(r.text)))
+    assert [(row["session_id"], row["exercise_id"], row["set_index"], row["weight"], row["is_pr"]) for row in rows] == [
+        (with_sets, "bp", "0", "60", "False"),
+        (with_sets, "bp", "1", "65", "True"),
+        (empty, "", "", "", ""),
+    ]
+    assert (await client.get("/sessions/export", params={"format": "xml"})).status_code == 422
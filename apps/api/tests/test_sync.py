@@ -0,0 +1,85 @@
+import pytest
+from httpx import AsyncClient
+
+
+def _session(finished_at: str) -> dict:
+    return {
+        "routine_name": "Push Day",
+        "started_at": finished_at,
+        "finished_at": finished_at,
+        "duration_minutes": 30,
+        "logs": {"bp": [{"weight": "60", "reps": "10"}]},
+    }
+
+
+@pytest.mark.asyncio
+async def test_full_sync(client: AsyncClient):
+    await client.post("/routines", json={"name": "Push", "exercises": ["bp"]})
+    await client.post("/sessions", json=_session("2026-03-01T10:00:00+00:00"))
+    await client.put("/preferences", json={"weekly_goal": 3})
+
+    r = await client.get("/sync")
+    assert r.status_code == 200
+    data = r.json()
+    assert data["full"] is True
+    assert data["token"] == "3"
+    assert [x["name"] for x in data["routines"]] == ["Push"]
+    assert len(data["sessions"]) == 1
+    assert data["preferences"]["weekly_goal"] == 3
+    assert data["deleted"] == {"routines": [], "sessions": [], "exercises": []}
+
+
+@pytest.mark.asyncio
+async def test_delta_sync_with_tombstones(client: AsyncClient):
+    routine = (await client.post("/routines", json={"name": "Push", "exercises": []})).json()
+    kept = (await client.post("/sessions", json=_session("2026-03-01T10:00:00+00:00"))).json()
+    gone = (await client.post("/sessions", json=_session("2026-03-02T10:00:00+00:00"))).json()
+    await client.post("/exercises", json={"id": "custom_1", "name": "Curl", "muscle": "biceps"})
+    token = (await client.get("/sync")).json()["token"]
+
+    # Nothing changed since the token
+    r = await client.get("/sync", params={"since": token})
+    assert r.json()["full"] is False
+    assert r.json()["sessions"] == [] and r.json()["preferences"] is None
+
+    await client.delete(f"/sessions/{gone['id']}")
+    await client.delete("/exercises/custom_1")
+    await client.put(f"/routines/{routine['id']}", json={"name": "Push A"})
+    new = (await client.post("/sessions", json=_session("2026-03-03T10:00:00+00:00"))).json()
+
+    data = (await client.get("/sync", params={"since": token})).json()
+    assert data["full"] is False
+    assert [x["name"] for x in data["routines"]] == ["Push A"]
+    assert [x["id"] for x in data["sessions"]] == [new["id"]]
+    assert data["exercises"] == []
+    assert data["deleted"] == {"routines": [], "sessions": [gone["id"]], "exercises": ["custom_1"]}
+    assert kept["id"] not in [x["id"] for x in data["sessions"]]
+
+    # The new token is caught up
+    caught_up = (await client.get("/sync", params={"since": data["token"]})).json()
+    assert caught_up["sessions"] == [] and caught_up["deleted"]["sessions"] == []
+
+
+@pytest.mark.asyncio
+async def test_routine_delete_unlinks_sessions_for_sync(client: AsyncClient):
+    routine = (await client.post("/routines", json={"name": "Push", "exercises": []})).json()
+    session = (await client.post(
+        "/sessions", json={**_session("2026-03-01T10:00:00+00:00"), "routine_id": routine["id"]}
+    )).json()
+    token = (await client.get("/sync")).json()["token"]
+
+    assert (await client.delete(f"/routines/{routine['id']}")).status_code == 204
+    data = (await client.get("/sync", params={"since": token})).json()
+    assert data["deleted"]["routines"] == [routine["id"]]
+    assert [(s["id"], s["routine_id"]) for s in data["sessions"]] == [(session["id"], None)]
+
+    # A failed delete changes nothing
+    assert (await client.delete(f"/routines/{routine['id']}")).status_code == 404
+    assert (await client.get("/sync")).json()["token"] == data["token"]
+
+
+@pytest.mark.asyncio
+async def test_sync_token_validation(client: AsyncClient):
+    assert (await client.get("/sync", params={"since": "abc"})).status_code == 400
+    # A token ahead of the server (e.g. after a restore) forces a full sync
+    assert (await client.get("/sync", params={"since": "99"})).json()["full"] is True
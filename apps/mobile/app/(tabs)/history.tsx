@@ -17,9 +17,12 @@ import { useStorage } from '../../hooks/useStorage';
 
 export default function HistoryScreen() {
   const { theme } = useTheme();
-  const { getSessions, deleteSession, getCustomExercises, getPreferences } = useStorage();
+  const { getSessionsPage, deleteSession, getCustomExercises, getPreferences } = useStorage();
 
   const [history, setHistory] = useState<Session[]>([]);
+  // Cursor of the next (older) page; null once everything is loaded
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [customExercises, setCustomExercises] = useState<Exercise[]>([]);
   const [lang, setLang] = useState<Lang>('en');
 
@@ -31,16 +34,29 @@ export default function HistoryScreen() {
   useFocusEffect(
     useCallback(() => {
       let cancelled = false;
-      Promise.all([getSessions(), getCustomExercises(), getPreferences()]).then(([s, e, p]) => {
+      Promise.all([getSessionsPage(), getCustomExercises(), getPreferences()]).then(([page, e, p]) => {
         if (cancelled) return;
-        setHistory(s);
+        setHistory(page.items);
+        setNextCursor(page.nextCursor);
         setCustomExercises(e);
         setLang(p.lang);
       });
       return () => { cancelled = true; };
-    }, [getSessions, getCustomExercises, getPreferences]),
+    }, [getSessionsPage, getCustomExercises, getPreferences]),
   );
 
+  const loadMore = useCallback(async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const page = await getSessionsPage(nextCursor);
+      setHistory(prev => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } finally {
+      setLoadingMore(false);
+    }
+  }, [getSessionsPage, nextCursor, loadingMore]);
+
   const allExercises = useMemo(() => [...EXERCISE_CATALOG, ...customExercises], [customExercises]);
 
   const getExName = (id: string): string => {
@@ -82,6 +98,8 @@ export default function HistoryScreen() {
       <FlatList
         data={history}
         keyExtractor={s => s.id}
+        onEndReached={loadMore}
+        onEndReachedThreshold={0.5}
         contentContainerStyle={{ paddingHorizontal: 16, paddingTop: 4, paddingBottom: 32, gap: 12 }}
         renderItem={({ item: s }) => (
           <View className="rounded-2xl p-5" style={{ backgroundColor: theme.bgCard, borderWidth: 1, borderColor: theme.border }}>
@@ -21,6 +21,15 @@ const KEYS = {
   EXERCISE_BTNS: 'gym_exercise_btns',
 };
 
+/** History screen page size; the API caps pages at SESSION_PAGE_MAX. */
+export const SESSION_PAGE_SIZE = 50;
+const SESSION_PAGE_MAX = 200;
+
+export interface SessionPage {
+  items: Session[];
+  nextCursor: string | null;
+}
+
 export interface ExerciseButtons {
   routineForm: { video: boolean; image: boolean; anatomy: boolean };
   workoutView: { video: boolean; image: boolean; anatomy: boolean };
@@ -69,10 +78,34 @@ export function useStorage() {
     await asSet(KEYS.ROUTINES, routines.filter(r => r.id !== id));
   }, [isAuth]);
 
+  /** One page of history, newest first; pass `nextCursor` back for the next one. */
+  const getSessionsPage = useCallback(
+    async (cursor: string | null = null, limit = SESSION_PAGE_SIZE): Promise<SessionPage> => {
+      if (isAuth) {
+        const qs = `limit=${limit}` + (cursor ? `&cursor=${encodeURIComponent(cursor)}` : '');
+        const page = await api.get<{ items: Session[]; next_cursor: string | null }>(`/sessions?${qs}`);
+        return { items: page.items, nextCursor: page.next_cursor };
+      }
+      // Local history: the cursor is an offset
+      const all = await asGet<Session[]>(KEYS.HISTORY, []);
+      const start = cursor ? Number(cursor) : 0;
+      const end = start + limit;
+      return { items: all.slice(start, end), nextCursor: end < all.length ? String(end) : null };
+    },
+    [isAuth],
+  );
+
+  /** The whole history — only for views that aggregate over all of it. */
   const getSessions = useCallback(async (): Promise<Session[]> => {
-    if (isAuth) return api.get<Session[]>('/sessions');
-    return asGet(KEYS.HISTORY, []);
-  }, [isAuth]);
+    const sessions: Session[] = [];
+    let cursor: string | null = null;
+    do {
+      const page: SessionPage = await getSessionsPage(cursor, SESSION_PAGE_MAX);
+      sessions.push(...page.items);
+      cursor = page.nextCursor;
+    } while (cursor);
+    return sessions;
+  }, [getSessionsPage]);
 
   const saveSession = useCallback(async (s: Session): Promise<Session> => {
     if (isAuth) return api.post<Session>('/sessions', s);
@@ -190,7 +223,7 @@ export function useStorage() {
 
   return {
     getRoutines, saveRoutine, deleteRoutine,
-    getSessions, saveSession, deleteSession,
+    getSessions, getSessionsPage, saveSession, deleteSession,
     getCustomExercises, saveCustomExercise, deleteCustomExercise,
     getPreferences, savePreferences,
     getExerciseButtons, saveExerciseButtons,
@@ -2,7 +2,7 @@
  * HistoryPage — list of past workout sessions.
  * Reference: FEATURES.md §9 History View
  */
-import React, { useCallback, useEffect, useMemo, useState } from 'react';
+import React, { useCallback, useEffect, useMemo, useRef, useState } from 'react';
 import { Calendar, History, Trash2, Trophy } from 'lucide-react';
 import { EXERCISE_CATALOG } from '@shared/constants/exercises';
 import { TRANSLATIONS } from '@shared/i18n/translations';
@@ -13,9 +13,13 @@ import { Card, ConfirmationModal } from '@/components/ui';
 import { useStorage } from '@/hooks/useStorage';
 
 export default function HistoryPage() {
-  const { getSessions, deleteSession, getCustomExercises, getPreferences } = useStorage();
+  const { getSessionsPage, deleteSession, getCustomExercises, getPreferences } = useStorage();
 
   const [history, setHistory] = useState<Session[]>([]);
+  // Cursor of the next (older) page; null once everything is loaded
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const sentinelRef = useRef<HTMLDivElement>(null);
   const [customExercises, setCustomExercises] = useState<Exercise[]>([]);
   const [lang, setLang] = useState<Lang>('en');
   const [deleteConfirm, setDeleteConfirm] = useState<string | null>(null);
@@ -29,10 +33,39 @@ export default function HistoryPage() {
   );
 
   useEffect(() => {
-    getSessions().then(setHistory);
+    getSessionsPage().then((page) => {
+      setHistory(page.items);
+      setNextCursor(page.nextCursor);
+    });
     getCustomExercises().then(setCustomExercises);
     getPreferences().then((p) => setLang(p.lang));
-  }, [getSessions, getCustomExercises, getPreferences]);
+  }, [getSessionsPage, getCustomExercises, getPreferences]);
+
+  const loadMore = useCallback(async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const page = await getSessionsPage(nextCursor);
+      setHistory((prev) => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } finally {
+      setLoadingMore(false);
+    }
+  }, [getSessionsPage, nextCursor, loadingMore]);
+
+  // Fetch the next page when the end of the list scrolls into view
+  useEffect(() => {
+    const sentinel = sentinelRef.current;
+    if (!sentinel || !nextCursor) return;
+    const observer = new IntersectionObserver(
+      (entries) => {
+        if (entries.some((e) => e.isIntersecting)) loadMore();
+      },
+      { rootMargin: '400px' },
+    );
+    observer.observe(sentinel);
+    return () => observer.disconnect();
+  }, [loadMore, nextCursor]);
 
   const allExercises = useMemo(
     () => [...EXERCISE_CATALOG, ...customExercises],
@@ -125,6 +158,7 @@ export default function HistoryPage() {
               </div>
             </Card>
           ))}
+          {nextCursor && <div ref={sentinelRef} className="h-1 lg:col-span-2" />}
         </div>
       )}
 
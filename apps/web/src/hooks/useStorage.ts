@@ -19,6 +19,15 @@ import { DEFAULT_PREFERENCES } from '@shared/types/user';
 import { api } from '@/services/api';
 import { useAuth } from '@/context/AuthContext';
 
+/** History view page size; the API caps pages at SESSION_PAGE_MAX. */
+export const SESSION_PAGE_SIZE = 50;
+const SESSION_PAGE_MAX = 200;
+
+export interface SessionPage {
+  items: Session[];
+  nextCursor: string | null;
+}
+
 function lsGet<T>(key: string, fallback: T): T {
   try {
     const v = localStorage.getItem(key);
@@ -62,25 +71,53 @@ export function useStorage() {
   }, [isAuth]);
 
   // ── Sessions ──────────────────────────────────────────────────────────────
+  /** One page of history, newest first; pass `nextCursor` back for the next one. */
+  const getSessionsPage = useCallback(
+    async (cursor: string | null = null, limit = SESSION_PAGE_SIZE): Promise<SessionPage> => {
+      if (isAuth) {
+        const params = new URLSearchParams({ limit: String(limit) });
+        if (cursor) params.set('cursor', cursor);
+        const page = await api.get<{
+          items: Array<{
+            id: string;
+            routine_name: string;
+            started_at: string;
+            duration_minutes: number;
+            logs: Session['logs'];
+          }>;
+          next_cursor: string | null;
+        }>(`/sessions?${params}`);
+        return {
+          items: page.items.map((s) => ({
+            id: s.id,
+            date: s.started_at,
+            routineName: s.routine_name,
+            duration: s.duration_minutes,
+            logs: s.logs,
+          })),
+          nextCursor: page.next_cursor,
+        };
+      }
+      // Local history: the cursor is an offset
+      const all = lsGet<Session[]>(STORAGE_KEYS.HISTORY, []);
+      const start = cursor ? Number(cursor) : 0;
+      const end = start + limit;
+      return { items: all.slice(start, end), nextCursor: end < all.length ? String(end) : null };
+    },
+    [isAuth],
+  );
+
+  /** The whole history — only for views that aggregate over all of it. */
   const getSessions = useCallback(async (): Promise<Session[]> => {
-    if (isAuth) {
-      const raw = await api.get<Array<{
-        id: string;
-        routine_name: string;
-        started_at: string;
-        duration_minutes: number;
-        logs: Session['logs'];
-      }>>('/sessions');
-      return raw.map((s) => ({
-        id: s.id,
-        date: s.started_at,
-        routineName: s.routine_name,
-        duration: s.duration_minutes,
-        logs: s.logs,
-      }));
-    }
-    return lsGet<Session[]>(STORAGE_KEYS.HISTORY, []);
-  }, [isAuth]);
+    const sessions: Session[] = [];
+    let cursor: string | null = null;
+    do {
+      const page: SessionPage = await getSessionsPage(cursor, SESSION_PAGE_MAX);
+      sessions.push(...page.items);
+      cursor = page.nextCursor;
+    } while (cursor);
+    return sessions;
+  }, [getSessionsPage]);
 
   const saveSession = useCallback(async (s: Session): Promise<Session> => {
     if (isAuth) {
@@ -210,7 +247,7 @@ export function useStorage() {
 
   return {
     getRoutines, saveRoutine, deleteRoutine,
-    getSessions, saveSession, deleteSession,
+    getSessions, getSessionsPage, saveSession, deleteSession,
     getCustomExercises, saveCustomExercise, deleteCustomExercise,
     getPreferences, savePreferences,
     migrateToRemote,